@@ -0,0 +1,58 @@
+"""partial_active_search_indexes
+
+Revision ID: 3c7d2a9e51b4
+Revises: be9dde59f8f0
+Create Date: 2026-10-17 10:12:40.118532
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c7d2a9e51b4'
+down_revision: Union[str, Sequence[str], None] = 'be9dde59f8f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently so live writes to the ride tables are not blocked
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_ride_offers_search_active', 'ride_offers',
+            ['start_location', 'end_location', 'travel_start_date', 'travel_start_time', 'id'],
+            unique=False,
+            postgresql_where=sa.text('is_active'),
+            postgresql_include=['free_seats'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_ride_requests_search_active', 'ride_requests',
+            ['start_location', 'end_location', 'travel_start_date', 'travel_start_time', 'id'],
+            unique=False,
+            postgresql_where=sa.text('is_active'),
+            postgresql_concurrently=True,
+        )
+        op.drop_index('ix_ride_offers_search', table_name='ride_offers', postgresql_concurrently=True)
+        op.drop_index('ix_ride_requests_search', table_name='ride_requests', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_ride_offers_search', 'ride_offers',
+            ['start_location', 'end_location', 'travel_start_date'],
+            unique=False, postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_ride_requests_search', 'ride_requests',
+            ['start_location', 'end_location', 'travel_start_date'],
+            unique=False, postgresql_concurrently=True,
+        )
+        op.drop_index('ix_ride_requests_search_active', table_name='ride_requests', postgresql_concurrently=True)
+        op.drop_index('ix_ride_offers_search_active', table_name='ride_offers', postgresql_concurrently=True)
@@ -0,0 +1,113 @@
+"""partition_rides_by_travel_date
+
+Revision ID: 5a9c3e1f7b24
+Revises: 7e4f0b6d2a13
+Create Date: 2026-10-17 14:12:37.204519
+
+"""
+from datetime import date, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a9c3e1f7b24'
+down_revision: Union[str, Sequence[str], None] = '7e4f0b6d2a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen at this revision; departs_at is generated and so never copied
+TABLES = {
+    'ride_offers': {
+        'owner': 'driver_id',
+        'columns': [
+            'id', 'driver_id', 'request_source', 'travel_start_date', 'travel_start_time',
+            'start_location', 'end_location', 'car_model', 'total_seat_amount', 'free_seats',
+            'price', 'is_active', 'created_at', 'updated_at',
+        ],
+        'search_include': ['free_seats'],
+    },
+    'ride_requests': {
+        'owner': 'passenger_id',
+        'columns': [
+            'id', 'passenger_id', 'request_source', 'travel_start_date', 'travel_start_time',
+            'start_location', 'end_location', 'seat_amount', 'is_active', 'created_at', 'updated_at',
+        ],
+        'search_include': [],
+    },
+}
+
+# Weeks created ahead of today; the partition maintenance task keeps this up from here on
+WEEKS_AHEAD = 8
+
+
+def _weeks(first: date, last: date) -> list[date]:
+    week, weeks = first - timedelta(days=first.weekday()), []
+    while week <= last:
+        weeks.append(week)
+        week += timedelta(days=7)
+    return weeks
+
+
+def _create_indexes(table: str, spec: dict) -> None:
+    op.create_index(op.f(f'ix_{table}_id'), table, ['id'], unique=False)
+    op.create_index(op.f(f'ix_{table}_{spec["owner"]}'), table, [spec['owner']], unique=False)
+    op.create_index(op.f(f'ix_{table}_is_active'), table, ['is_active'], unique=False)
+    op.create_index(
+        f'ix_{table}_search_departs', table,
+        ['start_location', 'end_location', 'departs_at', 'id'],
+        unique=False,
+        postgresql_where=sa.text('is_active'),
+        postgresql_include=spec['search_include'],
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Postgres cannot partition a table in place: each one is rebuilt as a partitioned
+    # copy and swapped in, holding an exclusive lock on it until the copy commits
+    bind = op.get_bind()
+    today = date.today()
+    for table, spec in TABLES.items():
+        columns = ', '.join(spec['columns'])
+        staging = f'{table}_partitioned'
+        op.execute(
+            f'CREATE TABLE {staging} (LIKE {table} INCLUDING DEFAULTS INCLUDING GENERATED) '
+            f'PARTITION BY RANGE (travel_start_date)'
+        )
+        # Catches rides dated beyond the newest weekly partition
+        op.execute(f'CREATE TABLE {table}_default PARTITION OF {staging} DEFAULT')
+
+        first = bind.scalar(sa.text(f'SELECT min(travel_start_date) FROM {table}')) or today
+        for week in _weeks(min(first, today), today + timedelta(weeks=WEEKS_AHEAD)):
+            op.execute(
+                f"CREATE TABLE {table}_w{week:%Y%m%d} PARTITION OF {staging} "
+                f"FOR VALUES FROM ('{week.isoformat()}') TO ('{(week + timedelta(days=7)).isoformat()}')"
+            )
+
+        op.execute(f'INSERT INTO {staging} ({columns}) SELECT {columns} FROM {table}')
+        op.drop_table(table)
+        op.rename_table(staging, table)
+
+        # Unique constraints on a partitioned table must include the partition key
+        op.create_primary_key(f'{table}_pkey', table, ['id', 'travel_start_date'])
+        op.create_foreign_key(f'{table}_{spec["owner"]}_fkey', table, 'users', [spec['owner']], ['id'])
+        _create_indexes(table, spec)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Only attached partitions are copied back; archived weeks stay in the archive schema
+    for table, spec in TABLES.items():
+        columns = ', '.join(spec['columns'])
+        staging = f'{table}_unpartitioned'
+        op.execute(f'CREATE TABLE {staging} (LIKE {table} INCLUDING DEFAULTS INCLUDING GENERATED)')
+        op.execute(f'INSERT INTO {staging} ({columns}) SELECT {columns} FROM {table}')
+        op.drop_table(table)
+        op.rename_table(staging, table)
+
+        op.create_primary_key(f'{table}_pkey', table, ['id'])
+        op.create_foreign_key(f'{table}_{spec["owner"]}_fkey', table, 'users', [spec['owner']], ['id'])
+        _create_indexes(table, spec)
@@ -0,0 +1,72 @@
+"""add_departs_at_to_rides
+
+Revision ID: 7e4f0b6d2a13
+Revises: 3c7d2a9e51b4
+Create Date: 2026-10-17 11:40:05.532907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e4f0b6d2a13'
+down_revision: Union[str, Sequence[str], None] = '3c7d2a9e51b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same expression as app.domain.models.ride.DEPARTS_AT, frozen at this revision
+DEPARTS_AT = "(travel_start_date + travel_start_time) AT TIME ZONE 'Asia/Bishkek'"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Adding a stored generated column rewrites each table once
+    op.add_column('ride_offers', sa.Column('departs_at', sa.TIMESTAMP(timezone=True), sa.Computed(DEPARTS_AT, persisted=True), nullable=False))
+    op.add_column('ride_requests', sa.Column('departs_at', sa.TIMESTAMP(timezone=True), sa.Computed(DEPARTS_AT, persisted=True), nullable=False))
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_ride_offers_search_departs', 'ride_offers',
+            ['start_location', 'end_location', 'departs_at', 'id'],
+            unique=False,
+            postgresql_where=sa.text('is_active'),
+            postgresql_include=['free_seats'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_ride_requests_search_departs', 'ride_requests',
+            ['start_location', 'end_location', 'departs_at', 'id'],
+            unique=False,
+            postgresql_where=sa.text('is_active'),
+            postgresql_concurrently=True,
+        )
+        op.drop_index('ix_ride_offers_search_active', table_name='ride_offers', postgresql_concurrently=True)
+        op.drop_index('ix_ride_requests_search_active', table_name='ride_requests', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_ride_offers_search_active', 'ride_offers',
+            ['start_location', 'end_location', 'travel_start_date', 'travel_start_time', 'id'],
+            unique=False,
+            postgresql_where=sa.text('is_active'),
+            postgresql_include=['free_seats'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_ride_requests_search_active', 'ride_requests',
+            ['start_location', 'end_location', 'travel_start_date', 'travel_start_time', 'id'],
+            unique=False,
+            postgresql_where=sa.text('is_active'),
+            postgresql_concurrently=True,
+        )
+        op.drop_index('ix_ride_requests_search_departs', table_name='ride_requests', postgresql_concurrently=True)
+        op.drop_index('ix_ride_offers_search_departs', table_name='ride_offers', postgresql_concurrently=True)
+
+    op.drop_column('ride_requests', 'departs_at')
+    op.drop_column('ride_offers', 'departs_at')
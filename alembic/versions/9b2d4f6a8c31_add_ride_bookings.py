@@ -0,0 +1,45 @@
+"""add_ride_bookings
+
+Revision ID: 9b2d4f6a8c31
+Revises: 5a9c3e1f7b24
+Create Date: 2026-10-17 16:03:52.118406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b2d4f6a8c31'
+down_revision: Union[str, Sequence[str], None] = '5a9c3e1f7b24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # No foreign key to ride_offers, which would block archiving its partitions
+    op.create_table('ride_bookings',
+    sa.Column('offer_id', sa.UUID(), nullable=False),
+    sa.Column('travel_start_date', sa.Date(), nullable=False),
+    sa.Column('passenger_id', sa.UUID(), nullable=False),
+    sa.Column('seats', sa.Integer(), nullable=False),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['passenger_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_ride_bookings_id'), 'ride_bookings', ['id'], unique=False)
+    op.create_index(op.f('ix_ride_bookings_offer_id'), 'ride_bookings', ['offer_id'], unique=False)
+    op.create_index(op.f('ix_ride_bookings_passenger_id'), 'ride_bookings', ['passenger_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_ride_bookings_passenger_id'), table_name='ride_bookings')
+    op.drop_index(op.f('ix_ride_bookings_offer_id'), table_name='ride_bookings')
+    op.drop_index(op.f('ix_ride_bookings_id'), table_name='ride_bookings')
+    op.drop_table('ride_bookings')
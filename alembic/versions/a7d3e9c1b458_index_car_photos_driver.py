@@ -0,0 +1,28 @@
+"""index_car_photos_driver
+
+Revision ID: a7d3e9c1b458
+Revises: f5c3a9e7b216
+Create Date: 2026-10-17 20:31:47.902315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3e9c1b458'
+down_revision: Union[str, Sequence[str], None] = 'f5c3a9e7b216'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A driver's photos are listed, and their version computed, on every bot poll
+    op.create_index(op.f('ix_car_photos_driver_id'), 'car_photos', ['driver_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_car_photos_driver_id'), table_name='car_photos')
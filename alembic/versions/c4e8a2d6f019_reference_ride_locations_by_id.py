@@ -0,0 +1,343 @@
+"""reference_ride_locations_by_id
+
+Revision ID: c4e8a2d6f019
+Revises: 9b2d4f6a8c31
+Create Date: 2026-10-17 17:21:09.503817
+
+"""
+import re
+import unicodedata
+from datetime import datetime, timezone
+from typing import Dict, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8a2d6f019'
+down_revision: Union[str, Sequence[str], None] = '9b2d4f6a8c31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = {
+    'ride_offers': {'search_include': ['free_seats']},
+    'ride_requests': {'search_include': []},
+}
+
+locations = sa.table(
+    'locations',
+    sa.column('name', sa.String),
+    sa.column('created_at', sa.TIMESTAMP(timezone=True)),
+)
+location_aliases = sa.table(
+    'location_aliases',
+    sa.column('key', sa.String),
+    sa.column('location_id', sa.Integer),
+)
+backfill = sa.table(
+    'location_backfill',
+    sa.column('spelling', sa.String),
+    sa.column('location_id', sa.Integer),
+    sa.column('name', sa.String),
+)
+
+
+# --- Location normalization, frozen at this revision ---
+# A copy of app.utils.normalization, so later changes to the live normalizer or
+# city mapping do not change what this migration writes on a fresh database.
+CITY_MAPPING: Dict[str, str] = {
+    # Russian
+    "нарын": "Naryn",
+    "бишкек": "Bishkek",
+    "ош": "Osh",
+    "каракол": "Karakol",
+    "балыкчы": "Balykchy",
+    "чолпон-ата": "Cholpon-Ata",
+    "джалал-абад": "Jalal-Abad",
+    "джалал абад": "Jalal-Abad",
+    "манас": "Manas",
+    "талас": "Talas",
+    "баткен": "Batken",
+
+    # Kyrgyz (Cyrillic)
+    "нарын": "Naryn",
+    "бишкек": "Bishkek",
+    "ош": "Osh",
+    "каракол": "Karakol",
+    "балыкчы": "Balykchy",
+    "чолпон-ата": "Cholpon-Ata",
+    "жалал-абад": "Jalal-Abad",
+    "талас": "Talas",
+    "баткен": "Batken",
+    "манас": "Manas",
+
+    # Common variations
+    "issykkul": "Issyk-Kul",
+    "issyk-kul": "Issyk-Kul",
+    "ыссык-кол": "Issyk-Kul",
+    "ысык-көл": "Issyk-Kul",
+
+    # Kara-Köl (Jalal-Abad region) folds to the same letters as Karakol (Issyk-Kul
+    # region) and is a typo away from it; listing it keeps the two towns apart
+    "кара-көл": "Kara-Kul",
+    "кара-куль": "Kara-Kul",
+    "кара-кул": "Kara-Kul",
+    "кара-кол": "Kara-Kul",
+    "karakul": "Kara-Kul",
+    "kara-kol": "Kara-Kul",
+}
+
+# Cyrillic (Russian + Kyrgyz letters) to the Latin spelling used by canonical names
+TRANSLITERATION: Dict[str, str] = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e",
+    "ж": "zh", "з": "z", "и": "i", "й": "y", "к": "k", "л": "l", "м": "m",
+    "н": "n", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t", "у": "u",
+    "ф": "f", "х": "kh", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "sch", "ъ": "",
+    "ы": "y", "ь": "", "э": "e", "ю": "yu", "я": "ya", "ө": "o", "ү": "u",
+    "ң": "n",
+}
+
+# Spellings that differ between transliteration schemes, folded to one form
+LATIN_FOLDS = (("dzh", "j"), ("zh", "j"), ("kh", "h"), ("yy", "y"))
+
+_TRANSLATE = str.maketrans(TRANSLITERATION)
+
+
+def fold(text: str) -> str:
+    """
+    Reduces a place name to a comparison key: lowercase Latin letters and
+    digits only, Cyrillic transliterated and diacritics stripped.
+    """
+    text = text.lower().translate(_TRANSLATE)
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if c.isascii() and c.isalnum())
+    for source, target in LATIN_FOLDS:
+        text = text.replace(source, target)
+    return text
+
+
+def location_key(text: str) -> str:
+    """
+    Key a spelling is stored under in location_aliases: its fold(), or the
+    trimmed lowercase text for scripts fold() has no transliteration for.
+    """
+    return fold(text) or text.lower().strip()
+
+
+def spelling(text: str) -> str:
+    """Lowercase text with runs of spaces and hyphens as one hyphen: a spelling as written, script kept."""
+    return "-".join(re.split(r"[\s\-]+", text.lower().strip())).strip("-")
+
+
+def max_typos(key: str, multi_part: bool = False) -> int:
+    """
+    Edit distance tolerated for a key of this length; short names must match
+    exactly. Multi-part names (Kara-Balta, Kara-Suu, Kara-Kul) share whole
+    words with other places, so they allow one edit at most.
+    """
+    if len(key) <= 3:
+        return 0
+    if len(key) <= 6 or multi_part:
+        return 1
+    return 2
+
+
+class _TrieNode:
+    __slots__ = ("children", "cities")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.cities: set[str] = set()
+
+
+class CityMatcher:
+    """
+    Trie of folded city names and aliases. Spellings listed in the mapping and
+    unambiguous folded keys resolve with one dict lookup; anything else runs a
+    Levenshtein search that abandons every branch whose best distance already
+    exceeds the budget.
+    """
+
+    def __init__(self, mapping: Dict[str, str]) -> None:
+        self.root = _TrieNode()
+        self.spellings: Dict[str, str] = {}
+        self.folded: Dict[str, set[str]] = {}
+        self.multi_part = {city for city in mapping.values() if "-" in spelling(city)}
+        for alias, city in mapping.items():
+            self._add(alias, city)
+            self._add(city, city)
+
+    def _add(self, name: str, city: str) -> None:
+        self.spellings[spelling(name)] = city
+        key = fold(name)
+        if not key:
+            return
+        self.folded.setdefault(key, set()).add(city)
+        node = self.root
+        for char in key:
+            node = node.children.setdefault(char, _TrieNode())
+        node.cities.add(city)
+
+    def exact(self, text: str) -> str | None:
+        """The city `text` is a listed spelling of, or folds to without ambiguity."""
+        city = self.spellings.get(spelling(text))
+        if city is not None:
+            return city
+        cities = self.folded.get(fold(text), ())
+        return next(iter(cities)) if len(cities) == 1 else None
+
+    def closest(self, text: str) -> str | None:
+        """The one city within the typo budget of `text`, or None when none or several are."""
+        key = fold(text)
+        multi_part = "-" in spelling(text)
+        budget = max_typos(key, multi_part)
+        if budget == 0:
+            return None
+
+        distances: Dict[str, int] = {}
+        first_row = list(range(len(key) + 1))
+        stack = [(child, char, first_row) for char, child in self.root.children.items()]
+        while stack:
+            node, char, previous = stack.pop()
+            row = [previous[0] + 1]
+            for i in range(1, len(key) + 1):
+                row.append(min(
+                    row[i - 1] + 1,
+                    previous[i] + 1,
+                    previous[i - 1] + (key[i - 1] != char),
+                ))
+            for city in node.cities:
+                if row[-1] <= max_typos(key, multi_part or city in self.multi_part):
+                    distances[city] = min(row[-1], distances.get(city, row[-1]))
+            if min(row) <= budget:
+                stack.extend((child, c, row) for c, child in node.children.items())
+
+        if not distances:
+            return None
+        best_distance = min(distances.values())
+        best = [city for city, distance in distances.items() if distance == best_distance]
+        # Two different cities equally close is a guess, not a match
+        return best[0] if len(best) == 1 else None
+
+    def match(self, text: str) -> str | None:
+        if not fold(text):
+            return None
+        return self.exact(text) or self.closest(text)
+
+
+_matcher = CityMatcher(CITY_MAPPING)
+
+
+def normalize_location(text: str) -> str:
+    if not text:
+        return text
+    return _matcher.match(text) or text.strip()
+
+
+def _canonical(text: str) -> tuple[str, str]:
+    # Same rule as LocationResolver.canonical at the time of this revision
+    name = normalize_location(text).strip()
+    return name, location_key(name)
+
+
+def _backfill_locations(bind) -> None:
+    """Creates a location per distinct canonical spelling and points every ride at it."""
+    spellings = bind.scalars(sa.text(' UNION '.join(
+        f'SELECT {column} FROM {table}'
+        for table in TABLES for column in ('start_location', 'end_location')
+    ))).all()
+
+    # Known cities first, so their canonical spelling names the location
+    names: dict[str, str] = {}
+    for text in [*sorted(set(CITY_MAPPING.values())), *spellings]:
+        name, key = _canonical(text)
+        names.setdefault(key, name)
+
+    now = datetime.now(timezone.utc)
+    op.bulk_insert(locations, [{'name': name, 'created_at': now} for name in names.values()])
+    ids = dict(bind.execute(sa.text('SELECT name, id FROM locations')).all())
+    op.bulk_insert(location_aliases, [{'key': key, 'location_id': ids[name]} for key, name in names.items()])
+
+    op.execute(
+        'CREATE TEMPORARY TABLE location_backfill '
+        '(spelling varchar(255) PRIMARY KEY, location_id integer NOT NULL, name varchar(255) NOT NULL) '
+        'ON COMMIT DROP'
+    )
+    rows = []
+    for spelling in spellings:
+        name = names[_canonical(spelling)[1]]
+        rows.append({'spelling': spelling, 'location_id': ids[name], 'name': name})
+    if rows:
+        op.bulk_insert(backfill, rows)
+
+    # Names are rewritten to the canonical spelling too, so display matches the location
+    for table in TABLES:
+        for side in ('start', 'end'):
+            op.execute(
+                f'UPDATE {table} SET {side}_location_id = b.location_id, {side}_location = b.name '
+                f'FROM location_backfill b WHERE {table}.{side}_location = b.spelling'
+            )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('locations',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.create_table('location_aliases',
+    sa.Column('key', sa.String(length=255), nullable=False),
+    sa.Column('location_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['location_id'], ['locations.id'], ),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index(op.f('ix_location_aliases_location_id'), 'location_aliases', ['location_id'], unique=False)
+
+    for table in TABLES:
+        op.add_column(table, sa.Column('start_location_id', sa.Integer(), nullable=True))
+        op.add_column(table, sa.Column('end_location_id', sa.Integer(), nullable=True))
+
+    _backfill_locations(op.get_bind())
+
+    for table, spec in TABLES.items():
+        op.alter_column(table, 'start_location_id', nullable=False)
+        op.alter_column(table, 'end_location_id', nullable=False)
+        op.create_foreign_key(f'{table}_start_location_id_fkey', table, 'locations', ['start_location_id'], ['id'])
+        op.create_foreign_key(f'{table}_end_location_id_fkey', table, 'locations', ['end_location_id'], ['id'])
+        # Two integers instead of two strings in front of departs_at: a smaller index and
+        # cheaper comparisons. Built on the parent, which cascades to every partition
+        op.create_index(
+            f'ix_{table}_search_route', table,
+            ['start_location_id', 'end_location_id', 'departs_at', 'id'],
+            unique=False,
+            postgresql_where=sa.text('is_active'),
+            postgresql_include=spec['search_include'],
+        )
+        op.drop_index(f'ix_{table}_search_departs', table_name=table)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, spec in TABLES.items():
+        # Searches on the string columns compared lowercased names
+        op.execute(f'UPDATE {table} SET start_location = lower(start_location), end_location = lower(end_location)')
+        op.create_index(
+            f'ix_{table}_search_departs', table,
+            ['start_location', 'end_location', 'departs_at', 'id'],
+            unique=False,
+            postgresql_where=sa.text('is_active'),
+            postgresql_include=spec['search_include'],
+        )
+        op.drop_index(f'ix_{table}_search_route', table_name=table)
+        op.drop_constraint(f'{table}_end_location_id_fkey', table, type_='foreignkey')
+        op.drop_constraint(f'{table}_start_location_id_fkey', table, type_='foreignkey')
+        op.drop_column(table, 'end_location_id')
+        op.drop_column(table, 'start_location_id')
+
+    op.drop_index(op.f('ix_location_aliases_location_id'), table_name='location_aliases')
+    op.drop_table('location_aliases')
+    op.drop_table('locations')
@@ -0,0 +1,53 @@
+"""add_ride_coordinates
+
+Revision ID: e2a7c5b9d184
+Revises: c4e8a2d6f019
+Create Date: 2026-10-17 18:40:26.771940
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a7c5b9d184'
+down_revision: Union[str, Sequence[str], None] = 'c4e8a2d6f019'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = {
+    'ride_offers': {'search_include': ['free_seats']},
+    'ride_requests': {'search_include': []},
+}
+
+# Geohash length at this revision (app.utils.geo.GEOHASH_PRECISION)
+CELL_LENGTH = 5
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # All nullable and without defaults, so adding them rewrites no rows
+    for table, spec in TABLES.items():
+        op.add_column(table, sa.Column('start_lat', sa.Float(), nullable=True))
+        op.add_column(table, sa.Column('start_lon', sa.Float(), nullable=True))
+        op.add_column(table, sa.Column('end_lat', sa.Float(), nullable=True))
+        op.add_column(table, sa.Column('end_lon', sa.Float(), nullable=True))
+        op.add_column(table, sa.Column('start_cell', sa.String(length=CELL_LENGTH), nullable=True))
+        op.add_column(table, sa.Column('end_cell', sa.String(length=CELL_LENGTH), nullable=True))
+        op.create_index(
+            f'ix_{table}_search_cells', table,
+            ['start_cell', 'end_cell', 'departs_at', 'id'],
+            unique=False,
+            postgresql_where=sa.text('is_active'),
+            postgresql_include=spec['search_include'],
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        op.drop_index(f'ix_{table}_search_cells', table_name=table)
+        for column in ('end_cell', 'start_cell', 'end_lon', 'end_lat', 'start_lon', 'start_lat'):
+            op.drop_column(table, column)
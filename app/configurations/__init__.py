@@ -1,8 +1,26 @@
 from .database import postgres_settings
 from .cloudinary import cloudinary_settings
+from .redis import redis_settings
+from .matching import matching_settings
+from .notifications import notification_settings
+from .logging import logging_settings
+from .cache import cache_settings
+from .partitions import partition_settings
+from .outbox import outbox_settings
+from .compression import compression_settings
+from .feed import feed_settings
 
 
 __all__ = [
     "postgres_settings",
     "cloudinary_settings",
+    "redis_settings",
+    "matching_settings",
+    "notification_settings",
+    "logging_settings",
+    "cache_settings",
+    "partition_settings",
+    "outbox_settings",
+    "compression_settings",
+    "feed_settings",
 ]
@@ -0,0 +1,13 @@
+from .base import Settings
+
+
+class CacheSettings(Settings):
+    CACHE_BACKEND: str = "memory"  # memory, redis or none
+    CACHE_MAX_ENTRIES: int = 10_000  # in-process backend only
+    SEARCH_CACHE_TTL: float = 30.0  # seconds
+    USER_CACHE_TTL: float = 300.0  # seconds, redis backend
+    # Seconds a process keeps its own copy of a user record; other processes may serve a changed record this long
+    USER_CACHE_LOCAL_TTL: float = 10.0
+
+
+cache_settings = CacheSettings()  # type: ignore[call-arg]
@@ -0,0 +1,10 @@
+from .base import Settings
+
+
+class CompressionSettings(Settings):
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # bytes; smaller responses are sent as they are
+    COMPRESSION_GZIP_LEVEL: int = 6  # 1-9
+    COMPRESSION_BROTLI_QUALITY: int = 4  # 0-11; used only when the brotli package is installed
+
+
+compression_settings = CompressionSettings()  # type: ignore[call-arg]
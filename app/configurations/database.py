@@ -10,11 +10,41 @@ class PostgresSettings(Settings):
     POSTGRES_PORT: int
     POSTGRES_DB: str
 
+    # asyncpg prepared statements kept per connection (0 disables, e.g. behind pgbouncer in transaction mode)
+    POSTGRES_STATEMENT_CACHE_SIZE: int = 500
+    # Compiled SQL strings kept per engine by SQLAlchemy
+    POSTGRES_QUERY_CACHE_SIZE: int = 1200
+
+    # Connection pool, per process and per engine (primary and replica each get one)
+    POSTGRES_POOL_SIZE: int = 5
+    # Extra connections opened under load, closed again once returned
+    POSTGRES_MAX_OVERFLOW: int = 10
+    # Seconds a checkout waits for a free connection before failing
+    POSTGRES_POOL_TIMEOUT: float = 30.0
+    # Connections older than this many seconds are replaced on checkout (-1 keeps them)
+    POSTGRES_POOL_RECYCLE: int = 1800
+    # Seconds /ready waits for each database to answer
+    POSTGRES_READY_TIMEOUT: float = 2.0
+
+    # Optional streaming replica for read-only traffic; unset sends every query to the primary
+    POSTGRES_REPLICA_HOST: str | None = None
+    POSTGRES_REPLICA_PORT: int | None = None
+    # After a user writes, their reads stay on the primary this long to cover replication lag
+    POSTGRES_REPLICA_PIN_SECONDS: float = 5.0
+
     @property
     def dsn(self) -> str:
         password = quote_plus(self.POSTGRES_PASSWORD)
         return f"postgresql+asyncpg://{self.POSTGRES_USER}:{password}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
 
+    @property
+    def replica_dsn(self) -> str | None:
+        if not self.POSTGRES_REPLICA_HOST:
+            return None
+        password = quote_plus(self.POSTGRES_PASSWORD)
+        port = self.POSTGRES_REPLICA_PORT or self.POSTGRES_PORT
+        return f"postgresql+asyncpg://{self.POSTGRES_USER}:{password}@{self.POSTGRES_REPLICA_HOST}:{port}/{self.POSTGRES_DB}"
+
     @property
     def dns_alembic(self) -> str:
         password = quote_plus(self.POSTGRES_PASSWORD)
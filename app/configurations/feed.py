@@ -0,0 +1,11 @@
+from .base import Settings
+
+
+class FeedSettings(Settings):
+    FEED_ENABLED: bool = True  # workers publish matches and new rides for the live feed
+    FEED_CHANNEL_PREFIX: str = "gogogo:feed"
+    FEED_QUEUE_SIZE: int = 100  # events buffered per client before a slow one is disconnected
+    FEED_HEARTBEAT_INTERVAL: float = 15.0  # seconds between keep-alive comments on an idle stream
+
+
+feed_settings = FeedSettings()  # type: ignore[call-arg]
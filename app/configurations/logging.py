@@ -0,0 +1,20 @@
+from .base import Settings
+
+
+class LoggingSettings(Settings):
+    LOG_LEVEL: str = "INFO"
+    # Per-module overrides, e.g. "app.services.tasks=DEBUG,sqlalchemy.engine=WARNING"
+    LOG_LEVELS: str = ""
+    LOG_JSON: bool = False
+
+    @property
+    def module_levels(self) -> dict[str, str]:
+        levels = {}
+        for item in self.LOG_LEVELS.split(","):
+            if "=" in item:
+                module, level = item.split("=", 1)
+                levels[module.strip()] = level.strip().upper()
+        return levels
+
+
+logging_settings = LoggingSettings()  # type: ignore[call-arg]
@@ -0,0 +1,10 @@
+from .base import Settings
+
+
+class MatchingSettings(Settings):
+    MATCHING_INDEX_ENABLED: bool = True
+    MATCHING_INDEX_CHANNEL: str = "gogogo:matching-index"
+    MATCHING_COALESCE_WINDOW: float = 2.0  # seconds, 0 matches every ride on its own
+
+
+matching_settings = MatchingSettings()  # type: ignore[call-arg]
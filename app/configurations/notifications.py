@@ -0,0 +1,16 @@
+from .base import Settings
+
+
+class NotificationSettings(Settings):
+    BOT_WEBHOOK_URL: str | None = None
+    WEBHOOK_MAX_CONCURRENCY: int = 10
+    WEBHOOK_RATE_LIMIT_PER_HOST: float = 20.0  # requests per second, 0 disables the limiter
+    WEBHOOK_MAX_KEEPALIVE: int = 20
+    WEBHOOK_TIMEOUT: float = 10.0
+    WEBHOOK_HTTP2: bool = False  # requires the optional `h2` package
+    WEBHOOK_MAX_RETRIES: int = 5  # resends of a webhook that failed or got a 429/5xx, with exponential backoff
+    # One `new_offers_found` (version 2) per passenger for a coalesced group, instead of a `new_offer_found` per offer
+    WEBHOOK_GROUPED_OFFERS: bool = False
+
+
+notification_settings = NotificationSettings()  # type: ignore[call-arg]
@@ -0,0 +1,9 @@
+from .base import Settings
+
+
+class OutboxSettings(Settings):
+    OUTBOX_BATCH_SIZE: int = 100  # messages the relay publishes per transaction
+    OUTBOX_POLL_INTERVAL: float = 0.5  # seconds the relay sleeps once the outbox is drained
+
+
+outbox_settings = OutboxSettings()  # type: ignore[call-arg]
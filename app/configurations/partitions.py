@@ -0,0 +1,11 @@
+from .base import Settings
+
+
+class PartitionSettings(Settings):
+    PARTITION_WEEKS_AHEAD: int = 8  # weekly partitions kept created ahead of today
+    PARTITION_RETAIN_WEEKS: int = 4  # past weeks kept attached before archiving
+    PARTITION_ARCHIVE_SCHEMA: str = "archive"
+    PARTITION_MAINTENANCE_HOUR: int = 3  # UTC hour of the daily maintenance run
+
+
+partition_settings = PartitionSettings()  # type: ignore[call-arg]
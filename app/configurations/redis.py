@@ -0,0 +1,8 @@
+from .base import Settings
+
+
+class RedisSettings(Settings):
+    REDIS_URL: str = "redis://localhost:6379/0"
+
+
+redis_settings = RedisSettings()  # type: ignore[call-arg]
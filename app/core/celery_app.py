@@ -1,7 +1,11 @@
 from celery import Celery
+from celery.schedules import crontab
+from celery.signals import setup_logging
 import os
 from dotenv import load_dotenv
 
+from app.configurations.partitions import partition_settings
+
 load_dotenv(".env.local")
 
 redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
@@ -19,5 +23,20 @@ celery_app.conf.update(
     },
 )
 
+# Run by the beat scheduler embedded in the worker (celery worker -B)
+celery_app.conf.beat_schedule = {
+    "maintain-ride-partitions": {
+        "task": "app.services.tasks.maintain_ride_partitions",
+        "schedule": crontab(minute=0, hour=partition_settings.PARTITION_MAINTENANCE_HOUR),
+    },
+}
+
+@setup_logging.connect
+def configure_worker_logging(**kwargs):
+    # Connecting this signal stops Celery from installing its own handlers
+    from app.core.logging import configure_logging
+    configure_logging("worker")
+
+
 # Auto-discover tasks
 celery_app.autodiscover_tasks(["app.services"])
@@ -0,0 +1,87 @@
+import inspect
+import logging
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from loguru import logger
+
+
+TEXT_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | "
+    "<cyan>{name}</cyan>:<cyan>{line}</cyan> | {message} | {extra}"
+)
+
+
+class InterceptHandler(logging.Handler):
+    """Routes records from stdlib loggers (uvicorn, celery, sqlalchemy) into loguru."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            level: str | int = logger.level(record.levelname).name
+        except ValueError:
+            level = record.levelno
+
+        frame, depth = inspect.currentframe(), 0
+        while frame and (depth == 0 or frame.f_code.co_filename == logging.__file__):
+            frame = frame.f_back
+            depth += 1
+
+        logger.opt(depth=depth, exception=record.exc_info).log(level, record.getMessage())
+
+
+def lowest_level(levels: dict[str | None, str]) -> int:
+    """The most verbose of the configured levels; stdlib records below it would only be filtered out."""
+    numbers = []
+    for level in levels.values():
+        try:
+            numbers.append(logger.level(level).no)
+        except ValueError:
+            # Unknown to loguru too, let every record through rather than guess
+            return 0
+    return min(numbers, default=0)
+
+
+def configure_logging(service: str) -> None:
+    """
+    Installs the process-wide log sink.
+
+    Records are handed to a queue and written by a background thread
+    (`enqueue=True`), so logging never blocks a request or a task on I/O.
+    Forked Celery children inherit the sink and share the parent's writer.
+    """
+    from app.configurations.logging import logging_settings
+
+    levels: dict[str | None, str | bool] = {"": logging_settings.LOG_LEVEL.upper()}
+    levels.update(logging_settings.module_levels)
+
+    logger.remove()
+    logger.configure(extra={"service": service})
+    logger.add(
+        sys.stderr,
+        level=0,
+        filter=levels,
+        format=TEXT_FORMAT,
+        serialize=logging_settings.LOG_JSON,
+        enqueue=True,
+        backtrace=False,
+        diagnose=False,
+    )
+    # Stdlib loggers skip building (and InterceptHandler skips frame-walking) records below this
+    logging.basicConfig(handlers=[InterceptHandler()], level=lowest_level(levels), force=True)
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access", "celery"):
+        std_logger = logging.getLogger(name)
+        std_logger.handlers = []
+        std_logger.propagate = True
+
+
+@contextmanager
+def log_timing(event: str, **fields: Any) -> Iterator[None]:
+    """Logs `event` with its structured fields and duration once the block finishes."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration_ms = round((time.perf_counter() - started) * 1000, 2)
+        logger.bind(duration_ms=duration_ms, **fields).info(event)
@@ -0,0 +1,127 @@
+import math
+from abc import ABC, abstractmethod
+from typing import Callable, Iterable, Iterator
+
+# One set of metrics per process. The API runs several uvicorn workers, and each
+# serves its own numbers on /metrics; the scraper sums them.
+
+Labels = dict[str, str]
+Sample = tuple[str, Labels, float]
+
+# Seconds, spaced for connection checkouts: most are instant, a saturated pool waits up to its timeout
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Metrics served on /metrics; each one adds itself when created
+REGISTRY: list["Metric"] = []
+
+
+class Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, registry: list["Metric"] | None = None) -> None:
+        self.name = name
+        self.documentation = documentation
+        (REGISTRY if registry is None else registry).append(self)
+
+    @abstractmethod
+    def samples(self) -> Iterable[Sample]: ...
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, registry: list[Metric] | None = None) -> None:
+        super().__init__(f"{name}_total", documentation, registry)
+        self._values: dict[tuple[tuple[str, str], ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(tuple(sorted(labels.items())), 0.0)
+
+    def samples(self) -> Iterable[Sample]:
+        for key, value in self._values.items():
+            yield self.name, dict(key), value
+
+
+class Gauge(Metric):
+    """Read when scraped from `collect`, which yields (labels, value) pairs."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        collect: Callable[[], Iterable[tuple[Labels, float]]],
+        registry: list[Metric] | None = None,
+    ) -> None:
+        super().__init__(name, documentation, registry)
+        self.collect = collect
+
+    def samples(self) -> Iterable[Sample]:
+        for labels, value in self.collect():
+            yield self.name, labels, value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+        registry: list[Metric] | None = None,
+    ) -> None:
+        super().__init__(name, documentation, registry)
+        self.buckets = (*sorted(buckets), math.inf)
+        # labels -> (count per bucket, sum)
+        self._values: dict[tuple[tuple[str, str], ...], tuple[list[int], float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        counts, total = self._values.get(key) or ([0] * len(self.buckets), 0.0)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        self._values[key] = counts, total + value
+
+    def count(self, **labels: str) -> int:
+        counts, _ = self._values.get(tuple(sorted(labels.items())), ([], 0.0))
+        return sum(counts)
+
+    def samples(self) -> Iterable[Sample]:
+        for key, (counts, total) in self._values.items():
+            labels, cumulative = dict(key), 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": _format(bound)}, cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, cumulative
+
+
+def _format(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _lines(registry: list[Metric]) -> Iterator[str]:
+    for metric in registry:
+        yield f"# HELP {metric.name} {metric.documentation}"
+        yield f"# TYPE {metric.name} {metric.kind}"
+        for name, labels, value in metric.samples():
+            label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+            yield f"{name}{{{label_text}}} {_format(value)}" if label_text else f"{name} {_format(value)}"
+
+
+def render(registry: list[Metric] | None = None) -> str:
+    """Every registered metric in the Prometheus text exposition format."""
+    return "\n".join(_lines(REGISTRY if registry is None else registry)) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
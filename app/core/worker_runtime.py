@@ -0,0 +1,68 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Coroutine, TypeVar
+
+from celery.signals import worker_process_init, worker_process_shutdown
+from loguru import logger
+
+
+T = TypeVar("T")
+
+
+class WorkerRuntime:
+    """
+    One event loop per Celery worker process.
+
+    Tasks run their coroutines with `run` instead of `asyncio.run`, so the
+    pooled database engine and HTTP clients created on the loop survive
+    between tasks. Assumes the prefork (or solo) pool, where a process runs
+    one task at a time.
+    """
+
+    def __init__(self) -> None:
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._shutdown_hooks: list[Callable[[], Awaitable[Any]]] = []
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+        return self._loop
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        return self.loop.run_until_complete(coro)
+
+    def on_shutdown(self, hook: Callable[[], Awaitable[Any]]) -> None:
+        self._shutdown_hooks.append(hook)
+
+    def stop(self) -> None:
+        if self._loop is None or self._loop.is_closed():
+            return
+        for hook in reversed(self._shutdown_hooks):
+            try:
+                self._loop.run_until_complete(hook())
+            except Exception as e:
+                logger.error(f"Worker shutdown hook failed: {e}")
+        self._loop.run_until_complete(self._loop.shutdown_asyncgens())
+        self._loop.close()
+        self._loop = None
+
+
+worker_runtime = WorkerRuntime()
+
+
+@worker_process_init.connect
+def start_worker_runtime(**kwargs):
+    from app.infrastructure.connections.database.session import engine
+    from app.infrastructure.services.webhook import get_webhook_dispatcher
+
+    # Connections opened by the parent must never be shared with a forked child
+    engine.sync_engine.dispose(close=False)
+    worker_runtime.on_shutdown(engine.dispose)
+    worker_runtime.on_shutdown(get_webhook_dispatcher().close)
+    _ = worker_runtime.loop
+
+
+@worker_process_shutdown.connect
+def stop_worker_runtime(**kwargs):
+    worker_runtime.stop()
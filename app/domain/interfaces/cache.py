@@ -0,0 +1,17 @@
+from typing import Protocol, Any
+
+
+class ICache(Protocol):
+    """
+    Key/value cache grouped in namespaces, so a write can drop every
+    variant cached under the namespace it touches in one call.
+    """
+
+    async def get(self, namespace: str, key: str) -> Any | None:
+        ...
+
+    async def set(self, namespace: str, key: str, value: Any, ttl: float | None = None) -> None:
+        ...
+
+    async def invalidate(self, *namespaces: str) -> None:
+        ...
@@ -1,5 +1,7 @@
 from .user import User, TelegramUser
-from .ride import RideOffer, RideRequest, CarPhoto
+from .ride import RideOffer, RideRequest, CarPhoto, RideBooking
+from .location import Location, LocationAlias
+from .outbox import OutboxMessage
 
 
 __all__ = [
@@ -8,4 +10,8 @@ __all__ = [
     "RideOffer",
     "RideRequest",
     "CarPhoto",
+    "RideBooking",
+    "Location",
+    "LocationAlias",
+    "OutboxMessage",
 ]
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from sqlalchemy import String, Integer, ForeignKey, TIMESTAMP
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.infrastructure.connections.database import Base
+from .base import utc_now
+
+
+class Location(Base):
+    """A canonical place rides start or end at; rides reference it by its integer id."""
+
+    __tablename__ = "locations"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String(255), nullable=False, unique=True)
+    created_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), default=utc_now, nullable=False)
+
+
+class LocationAlias(Base):
+    """A spelling of a location, stored under app.utils.normalization.location_key."""
+
+    __tablename__ = "location_aliases"
+
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    location_id: Mapped[int] = mapped_column(ForeignKey("locations.id"), nullable=False, index=True)
@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import BigInteger, Identity, Integer, String, Text, TIMESTAMP
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.infrastructure.connections.database import Base
+from .base import utc_now
+
+
+class OutboxMessage(Base):
+    """
+    A Celery task to send, written in the same transaction as the change that
+    calls for it and published by the outbox relay once that commits.
+    """
+
+    __tablename__ = "task_outbox"
+
+    # Increasing, so the relay publishes in commit order (roughly; ids are taken before commit)
+    id: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+    task: Mapped[str] = mapped_column(String(255), nullable=False)
+    args: Mapped[list[Any]] = mapped_column(JSONB, nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), default=utc_now, nullable=False)
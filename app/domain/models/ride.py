@@ -1,13 +1,19 @@
 import uuid
 import enum
-from datetime import date, time
+from datetime import date, datetime, time
 from typing import List
 
-from sqlalchemy import String, Integer, Date, Time, ForeignKey, Enum, Index, Boolean
+from sqlalchemy import String, Integer, Float, Date, Time, ForeignKey, Enum, Index, Boolean, Computed, PrimaryKeyConstraint, TIMESTAMP, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 
 from .base import BaseModel
+from app.utils.departure import RIDE_TIMEZONE_NAME
+from app.utils.geo import GEOHASH_PRECISION
+
+
+# Date and time combined in local time, kept by Postgres so searches can range-scan one column
+DEPARTS_AT = f"(travel_start_date + travel_start_time) AT TIME ZONE '{RIDE_TIMEZONE_NAME}'"
 
 
 class RequestSource(enum.Enum):
@@ -18,24 +24,55 @@ class RequestSource(enum.Enum):
 class CarPhoto(BaseModel):
     __tablename__ = "car_photos"
 
-    driver_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), type_=UUID(as_uuid=True), nullable=False)
+    driver_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), type_=UUID(as_uuid=True), nullable=False, index=True)
     url: Mapped[str] = mapped_column(String(2048), nullable=False)
 
 
 class RideOffer(BaseModel):
     __tablename__ = "ride_offers"
     __table_args__ = (
-        Index('ix_ride_offers_search', 'start_location', 'end_location', 'travel_start_date'),
+        # Unique constraints on a partitioned table must include the partition key
+        PrimaryKeyConstraint('id', 'travel_start_date', name='ride_offers_pkey'),
+        # Active rides only, in search order, so a page is one range scan with no sort
+        Index(
+            'ix_ride_offers_search_route',
+            'start_location_id', 'end_location_id', 'departs_at', 'id',
+            postgresql_where=text('is_active'),
+            postgresql_include=['free_seats'],
+        ),
+        # Proximity search: geohash cells of both ends narrow the candidates before the exact distance
+        Index(
+            'ix_ride_offers_search_cells',
+            'start_cell', 'end_cell', 'departs_at', 'id',
+            postgresql_where=text('is_active'),
+            postgresql_include=['free_seats'],
+        ),
+        # Weekly partitions, created and archived by app.infrastructure.connections.database.partitions
+        {'postgresql_partition_by': 'RANGE (travel_start_date)'},
     )
 
     driver_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), type_=UUID(as_uuid=True), nullable=False, index=True)
     request_source: Mapped[RequestSource] = mapped_column(Enum(RequestSource, name="request_source_enum"), nullable=False)
     
-    travel_start_date: Mapped[date] = mapped_column(Date, nullable=False)
+    travel_start_date: Mapped[date] = mapped_column(Date, primary_key=True)
     travel_start_time: Mapped[time] = mapped_column(Time, nullable=False)
+    departs_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        Computed(DEPARTS_AT, persisted=True),
+    )
     
+    # Searched by id; the names are the locations' canonical names, kept for display
+    start_location_id: Mapped[int] = mapped_column(ForeignKey("locations.id"), nullable=False)
+    end_location_id: Mapped[int] = mapped_column(ForeignKey("locations.id"), nullable=False)
     start_location: Mapped[str] = mapped_column(String(255), nullable=False)
     end_location: Mapped[str] = mapped_column(String(255), nullable=False)
+    # Optional pickup and drop-off points, with the geohash cell of each
+    start_lat: Mapped[float | None] = mapped_column(Float, nullable=True)
+    start_lon: Mapped[float | None] = mapped_column(Float, nullable=True)
+    end_lat: Mapped[float | None] = mapped_column(Float, nullable=True)
+    end_lon: Mapped[float | None] = mapped_column(Float, nullable=True)
+    start_cell: Mapped[str | None] = mapped_column(String(GEOHASH_PRECISION), nullable=True)
+    end_cell: Mapped[str | None] = mapped_column(String(GEOHASH_PRECISION), nullable=True)
     
     car_model: Mapped[str] = mapped_column(String(100), nullable=False)
     total_seat_amount: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -50,18 +87,42 @@ class RideOffer(BaseModel):
 class RideRequest(BaseModel):
     __tablename__ = "ride_requests"
     __table_args__ = (
-        Index('ix_ride_requests_search', 'start_location', 'end_location', 'travel_start_date'),
+        PrimaryKeyConstraint('id', 'travel_start_date', name='ride_requests_pkey'),
+        Index(
+            'ix_ride_requests_search_route',
+            'start_location_id', 'end_location_id', 'departs_at', 'id',
+            postgresql_where=text('is_active'),
+        ),
+        Index(
+            'ix_ride_requests_search_cells',
+            'start_cell', 'end_cell', 'departs_at', 'id',
+            postgresql_where=text('is_active'),
+        ),
+        {'postgresql_partition_by': 'RANGE (travel_start_date)'},
     )
 
     passenger_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), type_=UUID(as_uuid=True), nullable=False, index=True)
     request_source: Mapped[RequestSource] = mapped_column(Enum(RequestSource, name="request_source_enum"), nullable=False)
     
-    travel_start_date: Mapped[date] = mapped_column(Date, nullable=False)
+    travel_start_date: Mapped[date] = mapped_column(Date, primary_key=True)
     travel_start_time: Mapped[time] = mapped_column(Time, nullable=False)
+    departs_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        Computed(DEPARTS_AT, persisted=True),
+    )
     
+    start_location_id: Mapped[int] = mapped_column(ForeignKey("locations.id"), nullable=False)
+    end_location_id: Mapped[int] = mapped_column(ForeignKey("locations.id"), nullable=False)
     # locations might be pure string like Bishkek or GPS coordinates
     start_location: Mapped[str] = mapped_column(String(255), nullable=False)
     end_location: Mapped[str] = mapped_column(String(255), nullable=False)
+    # Optional pickup and drop-off points, with the geohash cell of each
+    start_lat: Mapped[float | None] = mapped_column(Float, nullable=True)
+    start_lon: Mapped[float | None] = mapped_column(Float, nullable=True)
+    end_lat: Mapped[float | None] = mapped_column(Float, nullable=True)
+    end_lon: Mapped[float | None] = mapped_column(Float, nullable=True)
+    start_cell: Mapped[str | None] = mapped_column(String(GEOHASH_PRECISION), nullable=True)
+    end_cell: Mapped[str | None] = mapped_column(String(GEOHASH_PRECISION), nullable=True)
     
     # "Any" or specific number. 'full' option.
     seat_amount: Mapped[str] = mapped_column(String(20), nullable=False)
@@ -76,3 +137,15 @@ class RideRequest(BaseModel):
     @property
     def seats(self) -> int:
         return int(self.seat_amount)
+
+
+class RideBooking(BaseModel):
+    __tablename__ = "ride_bookings"
+
+    # No foreign key to ride_offers: it would keep the offer's week partition from being
+    # archived. Bookings are only written by the reservation statement, for the offer
+    # row it has just updated (see RideOfferRepository.reserve_seats)
+    offer_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False, index=True)
+    travel_start_date: Mapped[date] = mapped_column(Date, nullable=False)
+    passenger_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), type_=UUID(as_uuid=True), nullable=False, index=True)
+    seats: Mapped[int] = mapped_column(Integer, nullable=False)
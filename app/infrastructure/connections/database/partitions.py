@@ -0,0 +1,142 @@
+import re
+from datetime import date, timedelta
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+__all__ = [
+    'PARTITIONED_TABLES',
+    'week_start',
+    'partition_name',
+    'partition_week',
+    'weeks_between',
+    'ensure_partition',
+    'archive_partition',
+    'maintain_partitions',
+]
+
+# Tables range-partitioned by travel_start_date, one partition per ISO week
+PARTITIONED_TABLES = ('ride_offers', 'ride_requests')
+
+_PARTITION_NAME = re.compile(r'^(?P<table>\w+)_w(?P<week>\d{8})$')
+
+
+def week_start(day: date) -> date:
+    """The Monday of the week `day` falls in; weekly partitions start on it."""
+    return day - timedelta(days=day.weekday())
+
+
+def partition_name(table: str, week: date) -> str:
+    return f'{table}_w{week_start(week):%Y%m%d}'
+
+
+def partition_week(name: str) -> date | None:
+    """The first day covered by a weekly partition, or None for any other table (e.g. the default partition)."""
+    match = _PARTITION_NAME.match(name)
+    if match is None:
+        return None
+    week = match.group('week')
+    return date(int(week[:4]), int(week[4:6]), int(week[6:]))
+
+
+def weeks_between(first: date, last: date) -> list[date]:
+    """Mondays of every week from the one holding `first` to the one holding `last`, inclusive."""
+    weeks, week = [], week_start(first)
+    while week <= last:
+        weeks.append(week)
+        week += timedelta(days=7)
+    return weeks
+
+
+async def _partitions(conn: AsyncConnection, table: str) -> list[str]:
+    result = await conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = CAST(CAST(:table AS text) AS regclass)"
+    ), {'table': table})
+    return list(result.scalars().all())
+
+
+async def ensure_partition(conn: AsyncConnection, table: str, week: date) -> bool:
+    """
+    Creates the partition for `week` unless it exists. Rows already sitting in the
+    default partition for that week are moved into it first, since Postgres refuses
+    to attach a range the default partition still holds rows for.
+    """
+    name = partition_name(table, week)
+    if await conn.scalar(text("SELECT to_regclass(:name)"), {'name': name}) is not None:
+        return False
+    lower, upper = week_start(week), week_start(week) + timedelta(days=7)
+    bounds = f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+    in_range = "travel_start_date >= :lower AND travel_start_date < :upper"
+    default = f'{table}_default'
+    params = {'lower': lower, 'upper': upper}
+
+    stranded = False
+    if await conn.scalar(text("SELECT to_regclass(:name)"), {'name': default}) is not None:
+        stranded = await conn.scalar(text(f'SELECT EXISTS (SELECT 1 FROM "{default}" WHERE {in_range})'), params)
+    if not stranded:
+        await conn.execute(text(f'CREATE TABLE "{name}" PARTITION OF "{table}" {bounds}'))
+        return True
+
+    columns = ', '.join(f'"{c}"' for c in (await conn.execute(text(
+        "SELECT attname FROM pg_attribute WHERE attrelid = CAST(CAST(:table AS text) AS regclass) "
+        "AND attnum > 0 AND NOT attisdropped AND attgenerated = '' ORDER BY attnum"
+    ), {'table': table})).scalars())
+    await conn.execute(text(f'CREATE TABLE "{name}" (LIKE "{table}" INCLUDING DEFAULTS INCLUDING GENERATED)'))
+    await conn.execute(text(f'INSERT INTO "{name}" ({columns}) SELECT {columns} FROM "{default}" WHERE {in_range}'), params)
+    await conn.execute(text(f'DELETE FROM "{default}" WHERE {in_range}'), params)
+    await conn.execute(text(f'ALTER TABLE "{table}" ATTACH PARTITION "{name}" {bounds}'))
+    logger.info(f'Moved rows for {name} out of {default}')
+    return True
+
+
+async def archive_partition(conn: AsyncConnection, table: str, name: str, schema: str) -> None:
+    """Detaches a partition and moves it into `schema`: the rows are kept, but no query on `table` sees them."""
+    await conn.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"'))
+    await conn.execute(text(f'ALTER TABLE "{name}" SET SCHEMA "{schema}"'))
+
+
+async def maintain_partitions(
+    engine: AsyncEngine,
+    today: date,
+    weeks_ahead: int,
+    retain_weeks: int,
+    archive_schema: str,
+    lock_timeout: str = '5s',
+) -> dict[str, list[str]]:
+    """
+    Creates partitions through `weeks_ahead` weeks from `today` and archives those
+    that ended more than `retain_weeks` weeks ago, keeping the attached partitions,
+    and so every query on the parent, down to the current few weeks.
+
+    Each table is handled in its own transaction with a lock timeout, so a busy
+    table fails this run and is picked up by the next instead of queueing traffic.
+    """
+    current = week_start(today)
+    cutoff = current - timedelta(weeks=retain_weeks)
+    changes: dict[str, list[str]] = {'created': [], 'archived': []}
+
+    async with engine.begin() as conn:
+        await conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{archive_schema}"'))
+
+    for table in PARTITIONED_TABLES:
+        created, archived = [], []
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(text(f"SET LOCAL lock_timeout = '{lock_timeout}'"))
+                for week in weeks_between(current, current + timedelta(weeks=weeks_ahead)):
+                    if await ensure_partition(conn, table, week):
+                        created.append(partition_name(table, week))
+                for name in sorted(await _partitions(conn, table)):
+                    week = partition_week(name)
+                    if week is not None and week + timedelta(days=7) <= cutoff:
+                        await archive_partition(conn, table, name, archive_schema)
+                        archived.append(name)
+        except Exception:
+            logger.bind(table=table).exception('Partition maintenance failed')
+            continue
+        changes['created'] += created
+        changes['archived'] += archived
+
+    return changes
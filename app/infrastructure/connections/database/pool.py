@@ -0,0 +1,94 @@
+import asyncio
+import time
+
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.metrics import Counter, Gauge, Histogram
+
+__all__ = [
+    'InstrumentedPool',
+    'instrumented_pool',
+    'watch_engine',
+    'ping',
+]
+
+
+checkout_seconds = Histogram('db_pool_checkout_seconds', 'Time to get a connection from the pool, including opening one')
+checkout_timeouts = Counter('db_pool_checkout_timeouts', 'Checkouts that gave up after the pool timeout')
+
+# Engines whose pools the gauges report, by role ("primary", "replica")
+_engines: dict[str, AsyncEngine] = {}
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    The asyncio QueuePool, timing every checkout and counting callers still
+    waiting for a connection. Subclassed per role by `instrumented_pool`, so a
+    pool recreated on dispose keeps reporting under the same label.
+    """
+
+    role = 'primary'
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.waiting = 0
+
+    def connect(self):
+        self.waiting += 1
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            checkout_timeouts.inc(role=self.role)
+            raise
+        finally:
+            self.waiting -= 1
+            checkout_seconds.observe(time.perf_counter() - started, role=self.role)
+
+
+def instrumented_pool(role: str) -> type[InstrumentedPool]:
+    return type(f'{role.title()}InstrumentedPool', (InstrumentedPool,), {'role': role})
+
+
+def watch_engine(engine: AsyncEngine, role: str) -> None:
+    """Reports `engine`'s pool in the db_pool_* gauges."""
+    _engines[role] = engine
+
+
+def _pools():
+    for role, engine in _engines.items():
+        pool = engine.sync_engine.pool
+        if isinstance(pool, QueuePool):
+            yield role, pool
+
+
+Gauge('db_pool_size', 'Connections the pool keeps open', lambda: (
+    ({'role': role}, pool.size()) for role, pool in _pools()
+))
+Gauge('db_pool_checked_out', 'Connections currently in use', lambda: (
+    ({'role': role}, pool.checkedout()) for role, pool in _pools()
+))
+# QueuePool counts overflow from -pool_size; only connections beyond pool_size are overflow here
+Gauge('db_pool_overflow', 'Connections open beyond pool_size', lambda: (
+    ({'role': role}, max(pool.overflow(), 0)) for role, pool in _pools()
+))
+Gauge('db_pool_waiting', 'Checkouts in progress, waiting for a free or new connection', lambda: (
+    ({'role': role}, getattr(pool, 'waiting', 0)) for role, pool in _pools()
+))
+
+
+async def ping(engine: AsyncEngine, timeout: float) -> str | None:
+    """None when `engine` answers a trivial query within `timeout` seconds, else what went wrong."""
+    async def _select_one() -> None:
+        async with engine.connect() as conn:
+            await conn.execute(text('SELECT 1'))
+
+    try:
+        await asyncio.wait_for(_select_one(), timeout)
+    except TimeoutError:
+        return f'no answer within {timeout:g}s'
+    except Exception as e:
+        return f'{type(e).__name__}: {e}'
+    return None
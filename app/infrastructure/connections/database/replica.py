@@ -0,0 +1,80 @@
+import time
+import typing
+
+import redis.asyncio as redis
+from loguru import logger
+
+__all__ = [
+    'ReplicaPins',
+    'get_replica_pins',
+]
+
+
+class ReplicaPins:
+    """
+    Read-your-writes for replica routing: keys (user ids) that wrote recently are
+    pinned to the primary for `seconds`, long enough to cover replication lag.
+
+    Pins are remembered in-process and, with a Redis client, shared with the other
+    API workers. A Redis error counts as pinned, since the primary is always correct.
+    """
+
+    def __init__(self, seconds: float, client: redis.Redis | None = None, prefix: str = 'gogogo:pin') -> None:
+        self.seconds = seconds
+        self.client = client
+        self.prefix = prefix
+        self._local: dict[str, float] = {}
+
+    def _key(self, key: str) -> str:
+        return f'{self.prefix}:{key}'
+
+    async def pin(self, *keys: typing.Any) -> None:
+        if not keys:
+            return
+        deadline = time.monotonic() + self.seconds
+        for key in keys:
+            self._local[str(key)] = deadline
+        if len(self._local) > 10_000:
+            now = time.monotonic()
+            self._local = {k: d for k, d in self._local.items() if d > now}
+        if self.client is None:
+            return
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for key in keys:
+                pipe.set(self._key(str(key)), 1, px=int(self.seconds * 1000))
+            await pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f'Replica pin failed: {e}')
+
+    async def is_pinned(self, *keys: typing.Any) -> bool:
+        now = time.monotonic()
+        if any(self._local.get(str(key), 0) > now for key in keys):
+            return True
+        if self.client is None or not keys:
+            return False
+        try:
+            return await self.client.exists(*(self._key(str(key)) for key in keys)) > 0
+        except redis.RedisError as e:
+            logger.warning(f'Replica pin lookup failed: {e}')
+            return True
+
+
+_replica_pins: ReplicaPins | None = None
+
+
+def get_replica_pins() -> ReplicaPins | None:
+    """Returns the pin registry, or None when no replica is configured."""
+    global _replica_pins
+    from app.configurations.database import postgres_settings
+
+    if not postgres_settings.replica_dsn:
+        return None
+    if _replica_pins is None:
+        from app.configurations.redis import redis_settings
+
+        _replica_pins = ReplicaPins(
+            postgres_settings.POSTGRES_REPLICA_PIN_SECONDS,
+            redis.Redis.from_url(redis_settings.REDIS_URL),
+        )
+    return _replica_pins
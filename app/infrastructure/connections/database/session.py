@@ -1,20 +1,43 @@
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
-from sqlalchemy.pool import NullPool, QueuePool
+from sqlalchemy.pool import NullPool
 import os
 
 from app.configurations.database import postgres_settings
+from app.infrastructure.connections.database.pool import instrumented_pool, watch_engine
 
-# Determine Pool Class based on App Context (App vs Worker)
-# Celery Workers using asyncio.run() MUST use NullPool because connections are tied to the event loop.
+# Pooled connections are tied to the event loop that opened them. The API and the
+# Celery workers (see app.core.worker_runtime) each keep one loop per process, so
+# both use a QueuePool, instrumented for /metrics. NullPool stays available for one-off scripts.
 pool_class_name = os.getenv("DB_POOL_CLASS", "QueuePool")
-pool_class = NullPool if pool_class_name == "NullPool" else None # None defaults to QueuePool in create_async_engine
+
+
+def pool_options(role: str) -> dict:
+    if pool_class_name == "NullPool":
+        return {"poolclass": NullPool}
+    return {
+        "poolclass": instrumented_pool(role),
+        "pool_size": postgres_settings.POSTGRES_POOL_SIZE,
+        "max_overflow": postgres_settings.POSTGRES_MAX_OVERFLOW,
+        "pool_timeout": postgres_settings.POSTGRES_POOL_TIMEOUT,
+        "pool_recycle": postgres_settings.POSTGRES_POOL_RECYCLE,
+    }
+
+
+def engine_url(dsn: str):
+    # The asyncpg dialect reads its prepared statement cache size from the URL
+    return make_url(dsn).update_query_dict({
+        "prepared_statement_cache_size": str(postgres_settings.POSTGRES_STATEMENT_CACHE_SIZE),
+    })
 
 engine = create_async_engine(
-    postgres_settings.dsn,
+    engine_url(postgres_settings.dsn),
     echo=False,
     future=True,
-    poolclass=pool_class,
+    query_cache_size=postgres_settings.POSTGRES_QUERY_CACHE_SIZE,
+    **pool_options("primary"),
 )
+watch_engine(engine, "primary")
 
 async_session_maker = async_sessionmaker(
     engine,
@@ -22,6 +45,23 @@ async_session_maker = async_sessionmaker(
     expire_on_commit=False,
 )
 
+# Read-only engine on the replica, None when no replica is configured
+read_engine = create_async_engine(
+    engine_url(postgres_settings.replica_dsn),
+    echo=False,
+    future=True,
+    query_cache_size=postgres_settings.POSTGRES_QUERY_CACHE_SIZE,
+    **pool_options("replica"),
+) if postgres_settings.replica_dsn else None
+if read_engine is not None:
+    watch_engine(read_engine, "replica")
+
+async_read_session_maker = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+) if read_engine else None
+
 async def get_session() -> AsyncSession:
     async with async_session_maker() as session:
         yield session
@@ -2,16 +2,35 @@ from typing import AsyncGenerator
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.infrastructure.connections.database.session import get_session
+from app.infrastructure.connections.database.session import get_session, async_read_session_maker
+from app.infrastructure.connections.database.replica import ReplicaPins, get_replica_pins
 from app.infrastructure.repositories.user import UserRepository, TelegramUserRepository
 from app.infrastructure.repositories.ride import RideOfferRepository, RideRequestRepository, CarPhotoRepository
+from app.infrastructure.repositories.location import LocationRepository
+from app.infrastructure.repositories.outbox import OutboxRepository
 from app.services.user_service import UserService
 from app.services.ride_service import RideService
+from app.services.locations import LocationResolver
+from app.services.feed import FeedHub, get_feed_hub
+from app.services.user_cache import TelegramUserCache, get_telegram_user_cache
 from app.domain.interfaces.media_service import IMediaService
+from app.domain.interfaces.cache import ICache
 from app.infrastructure.services.cloudinary import CloudinaryService
+from app.infrastructure.services.cache import get_search_cache
 
 
 
+async def get_read_session(
+    session: AsyncSession = Depends(get_session),
+) -> AsyncGenerator[AsyncSession, None]:
+    """A replica session, or the request's primary session when no replica is configured."""
+    if async_read_session_maker is None:
+        yield session
+        return
+    async with async_read_session_maker() as read_session:
+        yield read_session
+
+
 async def get_media_service() -> AsyncGenerator[IMediaService, None]:
     service = CloudinaryService()
     try:
@@ -20,6 +39,22 @@ async def get_media_service() -> AsyncGenerator[IMediaService, None]:
         await service.close()
 
 
+async def get_ride_search_cache() -> ICache | None:
+    return get_search_cache()
+
+
+async def get_telegram_account_cache() -> TelegramUserCache | None:
+    return get_telegram_user_cache()
+
+
+async def get_live_feed() -> FeedHub:
+    return get_feed_hub()
+
+
+async def get_read_pins() -> ReplicaPins | None:
+    return get_replica_pins()
+
+
 async def get_user_repository(
     session: AsyncSession = Depends(get_session),
 ) -> UserRepository:
@@ -28,37 +63,57 @@ async def get_user_repository(
 
 async def get_telegram_user_repository(
     session: AsyncSession = Depends(get_session),
+    read_session: AsyncSession = Depends(get_read_session),
 ) -> TelegramUserRepository:
-    return TelegramUserRepository(session)
+    return TelegramUserRepository(session, read_session)
 
 
 async def get_ride_offer_repository(
     session: AsyncSession = Depends(get_session),
+    read_session: AsyncSession = Depends(get_read_session),
 ) -> RideOfferRepository:
-    return RideOfferRepository(session)
+    return RideOfferRepository(session, read_session)
 
 
 async def get_ride_request_repository(
     session: AsyncSession = Depends(get_session),
+    read_session: AsyncSession = Depends(get_read_session),
 ) -> RideRequestRepository:
-    return RideRequestRepository(session)
+    return RideRequestRepository(session, read_session)
 
 
 async def get_car_photo_repository(
     session: AsyncSession = Depends(get_session),
+    read_session: AsyncSession = Depends(get_read_session),
 ) -> CarPhotoRepository:
-    return CarPhotoRepository(session)
+    return CarPhotoRepository(session, read_session)
+
+
+async def get_outbox_repository(
+    session: AsyncSession = Depends(get_session),
+) -> OutboxRepository:
+    return OutboxRepository(session)
+
+
+async def get_location_resolver(
+    session: AsyncSession = Depends(get_session),
+) -> LocationResolver:
+    return LocationResolver(LocationRepository(session))
 
 
 async def get_user_service(
     session: AsyncSession = Depends(get_session),
     user_repo: UserRepository = Depends(get_user_repository),
     telegram_user_repo: TelegramUserRepository = Depends(get_telegram_user_repository),
+    replica_pins: ReplicaPins | None = Depends(get_read_pins),
+    user_cache: TelegramUserCache | None = Depends(get_telegram_account_cache),
 ) -> UserService:
     return UserService(
         session=session,
         user_repo=user_repo,
         telegram_user_repo=telegram_user_repo,
+        replica_pins=replica_pins,
+        user_cache=user_cache,
     )
 
 
@@ -68,6 +123,10 @@ async def get_ride_service(
     request_repo: RideRequestRepository = Depends(get_ride_request_repository),
     photo_repo: CarPhotoRepository = Depends(get_car_photo_repository),
     media_service: IMediaService = Depends(get_media_service),
+    search_cache: ICache | None = Depends(get_ride_search_cache),
+    replica_pins: ReplicaPins | None = Depends(get_read_pins),
+    location_resolver: LocationResolver = Depends(get_location_resolver),
+    outbox: OutboxRepository = Depends(get_outbox_repository),
 ) -> RideService:
     return RideService(
         session=session,
@@ -75,6 +134,10 @@ async def get_ride_service(
         request_repo=request_repo,
         photo_repo=photo_repo,
         media_service=media_service,
+        search_cache=search_cache,
+        replica_pins=replica_pins,
+        location_resolver=location_resolver,
+        outbox=outbox,
     )
 
 
@@ -0,0 +1,35 @@
+from sqlalchemy import select, literal, lambda_stmt
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.models.location import Location, LocationAlias
+
+
+class LocationRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def find_by_key(self, key: str) -> tuple[int, str] | None:
+        query = lambda_stmt(lambda: select(Location.id, Location.name).join(
+            LocationAlias, LocationAlias.location_id == Location.id
+        ))
+        query += lambda q: q.where(LocationAlias.key == key)
+        result = await self.session.execute(query)
+        row = result.first()
+        return (row.id, row.name) if row else None
+
+    async def get_or_create(self, name: str, key: str) -> tuple[int, str]:
+        """
+        Returns the location `key` is an alias of, creating it under `name` first if
+        there is none. Safe against concurrent creators: the insert loses quietly to
+        an existing name or key and the lookup returns whichever row won.
+        """
+        await self.session.execute(
+            insert(Location).values(name=name).on_conflict_do_nothing(index_elements=[Location.name])
+        )
+        await self.session.execute(
+            insert(LocationAlias)
+            .from_select(["key", "location_id"], select(literal(key), Location.id).where(Location.name == name))
+            .on_conflict_do_nothing(index_elements=[LocationAlias.key])
+        )
+        return await self.find_by_key(key)
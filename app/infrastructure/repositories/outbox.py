@@ -0,0 +1,40 @@
+from typing import Any, Sequence
+
+from sqlalchemy import select, insert, update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.models.outbox import OutboxMessage
+
+
+class OutboxRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def add(self, task: str, *args: Any) -> None:
+        """Queues `task` for the relay; it is only published if the current transaction commits."""
+        await self.session.execute(insert(OutboxMessage).values(task=task, args=list(args)))
+
+    async def claim(self, limit: int) -> Sequence[OutboxMessage]:
+        """
+        The oldest `limit` messages, locked until the transaction ends. Rows another
+        relay has locked are skipped, so several relays can drain the outbox at once.
+        """
+        query = (
+            select(OutboxMessage)
+            .order_by(OutboxMessage.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.session.execute(query)
+        return result.scalars().all()
+
+    async def delete(self, message_ids: Sequence[int]) -> None:
+        if message_ids:
+            await self.session.execute(delete(OutboxMessage).where(OutboxMessage.id.in_(message_ids)))
+
+    async def record_failure(self, message_id: int, error: str) -> None:
+        await self.session.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.id == message_id)
+            .values(attempts=OutboxMessage.attempts + 1, last_error=error)
+        )
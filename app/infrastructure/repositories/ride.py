@@ -1,47 +1,146 @@
-from datetime import timedelta, datetime
-from typing import Sequence
-from uuid import UUID
-from sqlalchemy import select, delete, func, cast, Date
+import math
+from datetime import date, datetime, time
+from typing import AsyncIterator, Sequence
+from uuid import UUID, uuid4
+from sqlalchemy import select, delete, insert, update, func, cast, Date, String, Row, literal, literal_column, tuple_, lambda_stmt
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.orm import joinedload
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.domain.models.ride import RideOffer, RideRequest, CarPhoto
+from app.domain.models.ride import RideOffer, RideRequest, CarPhoto, RideBooking
 from app.representations.dtos.ride import (
-    CreateRideOfferDTO, CreateRideRequestDTO
+    BaseRideDTO, CreateRideOfferDTO, CreateRideRequestDTO, BulkRideOfferItemDTO, BulkRideRequestItemDTO,
+    RideOfferDTO, RideRequestDTO, selected_fields
 )
+from app.utils.pagination import Cursor
+from app.utils.departure import departure, offer_window, request_window, window_dates
+from app.utils.geo import EARTH_RADIUS_KM, Point, cells_within, geohash
+
+
+# Exactly the columns of the response DTOs, or of a sparse fieldset of them. Searches and
+# listings select these and return plain rows: no identity map, no relationship loading, nothing unused
+def offer_columns(fields: tuple[str, ...] | None = None) -> tuple:
+    return tuple(getattr(RideOffer, name) for name in selected_fields(RideOfferDTO, fields))
+
+
+def request_columns(fields: tuple[str, ...] | None = None) -> tuple:
+    return tuple(getattr(RideRequest, name) for name in selected_fields(RideRequestDTO, fields))
+
+
+OFFER_COLUMNS = offer_columns()
+REQUEST_COLUMNS = request_columns()
+
+
+def listing_version(model, *criteria):
+    """
+    A digest of the id and updated_at of every row matching `criteria`. Every write
+    bumps updated_at, so it changes whenever the listing of those rows would,
+    including deletes and writes stamped by a clock running behind, which a
+    max(updated_at) would miss.
+    """
+    stamps = func.string_agg(
+        cast(model.id, String) + "@" + cast(model.updated_at, String),
+        aggregate_order_by(literal_column("','"), model.id)
+    )
+    return select(func.md5(func.coalesce(stamps, ""))).where(*criteria)
+
+
+def geo_columns(dto: BaseRideDTO) -> dict:
+    """A new ride's coordinates and the geohash cells proximity searches look it up by."""
+    return {
+        "start_lat": dto.start_lat,
+        "start_lon": dto.start_lon,
+        "end_lat": dto.end_lat,
+        "end_lon": dto.end_lon,
+        "start_cell": geohash(dto.start_lat, dto.start_lon) if dto.start_lat is not None else None,
+        "end_cell": geohash(dto.end_lat, dto.end_lon) if dto.end_lat is not None else None,
+    }
+
+
+def within_radius(lat, lon, point: Point, radius_km: float):
+    """
+    Exact haversine test, evaluated by Postgres with built-in math only. Compares
+    the haversine term itself against its value at radius_km, which spares a
+    sqrt and an asin per candidate row.
+    """
+    point_lat, point_lon = point
+    term = (
+        func.power(func.sin(func.radians(lat - point_lat) / 2), 2)
+        + func.cos(func.radians(lat)) * math.cos(math.radians(point_lat))
+        * func.power(func.sin(func.radians(lon - point_lon) / 2), 2)
+    )
+    return term <= math.sin(radius_km / (2 * EARTH_RADIUS_KM)) ** 2
 
 
 class RideOfferRepository:
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, read_session: AsyncSession | None = None):
         self.session = session
+        # Replica session for read-only methods called with use_replica=True
+        self.read_session = read_session or session
 
-    async def create(self, driver_id: UUID, dto: CreateRideOfferDTO) -> RideOffer:
+    async def create(
+        self, driver_id: UUID, dto: CreateRideOfferDTO, start_location_id: int, end_location_id: int
+    ) -> RideOffer:
         ride_offer = RideOffer(
             driver_id=driver_id,
             request_source=dto.request_source,
             travel_start_date=dto.travel_start_date,
             travel_start_time=dto.travel_start_time,
-            start_location=dto.start_location.lower().strip(),
-            end_location=dto.end_location.lower().strip(),
+            start_location_id=start_location_id,
+            end_location_id=end_location_id,
+            start_location=dto.start_location,
+            end_location=dto.end_location,
             car_model=dto.car_model,
             total_seat_amount=dto.total_seat_amount,
             free_seats=dto.free_seats,
-            price=dto.price
+            price=dto.price,
+            **geo_columns(dto)
         )
         self.session.add(ride_offer)
         await self.session.flush()
         return ride_offer
 
+    async def create_many(self, items: Sequence[BulkRideOfferItemDTO], routes: Sequence[tuple[int, int]]) -> list[UUID]:
+        """
+        Inserts all offers in one multi-row INSERT and returns their ids in input order.
+        `routes` holds each item's (start_location_id, end_location_id).
+        """
+        rows = [
+            {**item.model_dump(), **geo_columns(item), "start_location_id": start_id, "end_location_id": end_id}
+            for item, (start_id, end_id) in zip(items, routes, strict=True)
+        ]
+        result = await self.session.execute(
+            insert(RideOffer).returning(RideOffer.id, sort_by_parameter_order=True), rows
+        )
+        return list(result.scalars().all())
+
     async def get_by_id(self, offer_id: UUID) -> RideOffer | None:
-        query = select(RideOffer).options(joinedload(RideOffer.driver)).where(RideOffer.id == offer_id)
+        # Lambda statements are built and cache-keyed once; later calls only swap parameters
+        query = lambda_stmt(lambda: select(RideOffer).options(joinedload(RideOffer.driver)))
+        query += lambda q: q.where(RideOffer.id == offer_id)
         result = await self.session.execute(query)
         return result.scalars().first()
 
-    async def get_all(self) -> Sequence[RideOffer]:
-        query = select(RideOffer).options(joinedload(RideOffer.driver)).order_by(RideOffer.created_at.desc())
+    async def get_by_ids(self, offer_ids: Sequence[UUID]) -> Sequence[RideOffer]:
+        query = select(RideOffer).where(
+            RideOffer.id.in_(offer_ids),
+            RideOffer.is_active == True
+        ).order_by(RideOffer.created_at.asc())
         result = await self.session.execute(query)
         return result.scalars().all()
 
+    async def stream_all(
+        self, include_inactive: bool = False, batch_size: int = 500, use_replica: bool = False
+    ) -> AsyncIterator[RideOffer]:
+        # Server-side cursor: rows arrive batch_size at a time instead of all at once
+        query = select(RideOffer).order_by(RideOffer.created_at.desc()).execution_options(yield_per=batch_size)
+        if not include_inactive:
+            query = query.where(RideOffer.is_active == True)
+        session = self.read_session if use_replica else self.session
+        result = await session.stream_scalars(query)
+        async for offer in result:
+            yield offer
+
     async def get_active_offers(self) -> Sequence[RideOffer]:
          current_date = datetime.utcnow().date()
          query = select(RideOffer).options(joinedload(RideOffer.driver)).where(
@@ -51,125 +150,361 @@ class RideOfferRepository:
          result = await self.session.execute(query)
          return result.scalars().all()
 
-    async def get_by_driver(self, driver_id: UUID) -> Sequence[RideOffer]:
+    @staticmethod
+    def _listed_by_driver(driver_id: UUID) -> tuple:
         current_date = datetime.utcnow().date()
-        query = select(RideOffer).options(joinedload(RideOffer.driver)).where(
+        return (
             RideOffer.driver_id == driver_id,
             RideOffer.is_active == True,
             RideOffer.travel_start_date >= current_date
-        ).order_by(RideOffer.created_at.desc())
-        result = await self.session.execute(query)
-        return result.scalars().all()
+        )
+
+    async def get_by_driver(
+        self, driver_id: UUID, fields: tuple[str, ...] | None = None, use_replica: bool = False
+    ) -> Sequence[Row]:
+        query = select(*offer_columns(fields)).where(*self._listed_by_driver(driver_id)).order_by(RideOffer.created_at.desc())
+        session = self.read_session if use_replica else self.session
+        result = await session.execute(query)
+        return result.all()
+
+    async def get_driver_version(self, driver_id: UUID, use_replica: bool = False) -> str:
+        """Changes whenever get_by_driver's result would."""
+        session = self.read_session if use_replica else self.session
+        result = await session.execute(listing_version(RideOffer, *self._listed_by_driver(driver_id)))
+        return result.scalar_one()
 
     async def delete(self, ride_offer: RideOffer) -> None:
         ride_offer.is_active = False
         self.session.add(ride_offer)
         await self.session.flush()
 
+    async def reserve_seats(self, offer_id: UUID, passenger_id: UUID, seats: int) -> Row | None:
+        """
+        Takes `seats` from an active offer and records the booking in one statement.
+
+        The conditional UPDATE is the whole check: Postgres re-evaluates
+        `free_seats >= :seats` on the latest row version once a concurrent booking
+        commits, so the count can never go negative, and a sold-out offer fails on
+        its snapshot without waiting for the row lock at all. Returns None when the
+        offer is missing, inactive or short of seats; the caller should commit right
+        away, since the row stays locked until then.
+        """
+        reserved = (
+            update(RideOffer)
+            .where(
+                RideOffer.id == offer_id,
+                RideOffer.is_active == True,
+                RideOffer.free_seats >= seats
+            )
+            .values(free_seats=RideOffer.free_seats - seats, updated_at=func.now())
+            .returning(
+                RideOffer.id, RideOffer.driver_id, RideOffer.travel_start_date,
+                RideOffer.start_location_id, RideOffer.end_location_id, RideOffer.free_seats
+            )
+            .cte("reserved")
+        )
+        booked = (
+            insert(RideBooking)
+            .from_select(
+                ["id", "offer_id", "travel_start_date", "passenger_id", "seats", "created_at", "updated_at"],
+                select(
+                    literal(uuid4()), reserved.c.id, reserved.c.travel_start_date,
+                    literal(passenger_id), literal(seats), func.now(), func.now()
+                )
+            )
+            .returning(RideBooking.id, RideBooking.offer_id, RideBooking.passenger_id, RideBooking.seats)
+            .cte("booked")
+        )
+        query = select(
+            booked,
+            reserved.c.driver_id,
+            reserved.c.travel_start_date,
+            reserved.c.start_location_id,
+            reserved.c.end_location_id,
+            reserved.c.free_seats
+        )
+        result = await self.session.execute(query)
+        return result.first()
+
     async def search_offers(
         self,
-        start_location: str,
-        end_location: str,
+        start_location_id: int,
+        end_location_id: int,
         seats_needed: int,
-        start_date: str, # string or date
+        start_date: str | date,
         limit: int = 10,
-        offset: int = 0
-    ) -> Sequence[RideOffer]:
-        # Calculate Date Window (+2 days)
+        offset: int = 0,
+        after: Cursor | None = None,
+        start_time: time | None = None,
+        fields: tuple[str, ...] | None = None,
+        use_replica: bool = False
+    ) -> Sequence[Row]:
         if isinstance(start_date, str):
-            start_date_obj = datetime.strptime(start_date, "%Y-%m-%d").date()
-        else:
-            start_date_obj = start_date
-            
-        end_date_limit = start_date_obj + timedelta(hours=4)
+            start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
+        # Departures within 4 hours of start_time, or all day
+        departs_from, departs_until = window = offer_window(start_date, start_time)
+        # The same range on the partition key lets Postgres skip every other week's partition
+        first_day, last_day = window_dates(window)
 
-        query = select(RideOffer).options(joinedload(RideOffer.driver)).where(
-            RideOffer.start_location == start_location.lower().strip(),
-            RideOffer.end_location == end_location.lower().strip(),
+        columns = offer_columns(fields)
+        query = lambda_stmt(lambda: select(*columns))
+        query += lambda q: q.where(
+            RideOffer.start_location_id == start_location_id,
+            RideOffer.end_location_id == end_location_id,
+            RideOffer.departs_at >= departs_from,
+            RideOffer.departs_at < departs_until,
+            RideOffer.travel_start_date >= first_day,
+            RideOffer.travel_start_date <= last_day,
             RideOffer.free_seats >= seats_needed,
-            RideOffer.travel_start_date >= start_date,
-            RideOffer.free_seats >= seats_needed,
-            RideOffer.travel_start_date >= start_date,
-            RideOffer.travel_start_date <= end_date_limit,
             RideOffer.is_active == True
         ).order_by(
-            RideOffer.travel_start_date.asc(),
-            RideOffer.travel_start_time.asc()
-        ).limit(limit).offset(offset)
-        
-        result = await self.session.execute(query)
-        return result.scalars().all()
+            RideOffer.departs_at.asc(),
+            RideOffer.id.asc()
+        ).limit(limit)
+
+        # Keyset pagination: every page is the same index range scan, however deep
+        if after is not None:
+            after_date, after_time, after_id = after
+            after_departs = departure(after_date, after_time)
+            query += lambda q: q.where(tuple_(RideOffer.departs_at, RideOffer.id) > tuple_(after_departs, after_id))
+        else:
+            query += lambda q: q.offset(offset)
+
+        session = self.read_session if use_replica else self.session
+        result = await session.execute(query)
+        return result.all()
+
+    async def search_offers_nearby(
+        self,
+        start: Point,
+        end: Point,
+        radius_km: float,
+        seats_needed: int,
+        start_date: date,
+        limit: int = 10,
+        offset: int = 0,
+        after: Cursor | None = None,
+        start_time: time | None = None,
+        fields: tuple[str, ...] | None = None,
+        use_replica: bool = False
+    ) -> Sequence[Row]:
+        """
+        Offers starting within radius_km of `start` and ending within radius_km of
+        `end`. The cells around each point bound an index scan; only the rows it
+        finds get the exact distance check.
+        """
+        departs_from, departs_until = window = offer_window(start_date, start_time)
+        first_day, last_day = window_dates(window)
+
+        query = select(*offer_columns(fields)).where(
+            RideOffer.start_cell.in_(cells_within(*start, radius_km)),
+            RideOffer.end_cell.in_(cells_within(*end, radius_km)),
+            RideOffer.departs_at >= departs_from,
+            RideOffer.departs_at < departs_until,
+            RideOffer.travel_start_date >= first_day,
+            RideOffer.travel_start_date <= last_day,
+            RideOffer.free_seats >= seats_needed,
+            RideOffer.is_active == True,
+            within_radius(RideOffer.start_lat, RideOffer.start_lon, start, radius_km),
+            within_radius(RideOffer.end_lat, RideOffer.end_lon, end, radius_km)
+        ).order_by(
+            RideOffer.departs_at.asc(),
+            RideOffer.id.asc()
+        ).limit(limit)
+
+        if after is not None:
+            after_date, after_time, after_id = after
+            query = query.where(tuple_(RideOffer.departs_at, RideOffer.id) > tuple_(departure(after_date, after_time), after_id))
+        else:
+            query = query.offset(offset)
+
+        session = self.read_session if use_replica else self.session
+        result = await session.execute(query)
+        return result.all()
 
 
 class RideRequestRepository:
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, read_session: AsyncSession | None = None):
         self.session = session
+        # Replica session for read-only methods called with use_replica=True
+        self.read_session = read_session or session
 
-    async def create(self, passenger_id: UUID, dto: CreateRideRequestDTO) -> RideRequest:
+    async def create(
+        self, passenger_id: UUID, dto: CreateRideRequestDTO, start_location_id: int, end_location_id: int
+    ) -> RideRequest:
         ride_request = RideRequest(
             passenger_id=passenger_id,
             request_source=dto.request_source,
             travel_start_date=dto.travel_start_date,
             travel_start_time=dto.travel_start_time,
-            start_location=dto.start_location.lower().strip(),
-            end_location=dto.end_location.lower().strip(),
-            seat_amount=dto.seat_amount
+            start_location_id=start_location_id,
+            end_location_id=end_location_id,
+            start_location=dto.start_location,
+            end_location=dto.end_location,
+            seat_amount=dto.seat_amount,
+            **geo_columns(dto)
         )
         self.session.add(ride_request)
         await self.session.flush()
         return ride_request
 
+    async def create_many(self, items: Sequence[BulkRideRequestItemDTO], routes: Sequence[tuple[int, int]]) -> list[UUID]:
+        """
+        Inserts all requests in one multi-row INSERT and returns their ids in input order.
+        `routes` holds each item's (start_location_id, end_location_id).
+        """
+        rows = [
+            {**item.model_dump(), **geo_columns(item), "start_location_id": start_id, "end_location_id": end_id}
+            for item, (start_id, end_id) in zip(items, routes, strict=True)
+        ]
+        result = await self.session.execute(
+            insert(RideRequest).returning(RideRequest.id, sort_by_parameter_order=True), rows
+        )
+        return list(result.scalars().all())
+
     async def get_by_id(self, request_id: UUID) -> RideRequest | None:
-        query = select(RideRequest).options(joinedload(RideRequest.passenger)).where(RideRequest.id == request_id)
+        query = lambda_stmt(lambda: select(RideRequest).options(joinedload(RideRequest.passenger)))
+        query += lambda q: q.where(RideRequest.id == request_id)
         result = await self.session.execute(query)
         return result.scalars().first()
 
-    async def get_all(self) -> Sequence[RideRequest]:
-        query = select(RideRequest).options(joinedload(RideRequest.passenger)).order_by(RideRequest.created_at.desc())
+    async def get_by_ids(self, request_ids: Sequence[UUID]) -> Sequence[RideRequest]:
+        query = select(RideRequest).where(
+            RideRequest.id.in_(request_ids),
+            RideRequest.is_active == True
+        ).order_by(RideRequest.created_at.asc())
         result = await self.session.execute(query)
         return result.scalars().all()
 
-    async def get_by_passenger(self, passenger_id: UUID) -> Sequence[RideRequest]:
+    async def stream_all(
+        self, include_inactive: bool = False, batch_size: int = 500, use_replica: bool = False
+    ) -> AsyncIterator[RideRequest]:
+        query = select(RideRequest).order_by(RideRequest.created_at.desc()).execution_options(yield_per=batch_size)
+        if not include_inactive:
+            query = query.where(RideRequest.is_active == True)
+        session = self.read_session if use_replica else self.session
+        result = await session.stream_scalars(query)
+        async for request in result:
+            yield request
+
+    async def get_active_requests(self) -> Sequence[RideRequest]:
         current_date = datetime.utcnow().date()
-        query = select(RideRequest).options(joinedload(RideRequest.passenger)).where(
-            RideRequest.passenger_id == passenger_id,
+        query = select(RideRequest).where(
             RideRequest.is_active == True,
             RideRequest.travel_start_date >= current_date
         ).order_by(RideRequest.created_at.desc())
         result = await self.session.execute(query)
         return result.scalars().all()
 
+    @staticmethod
+    def _listed_by_passenger(passenger_id: UUID) -> tuple:
+        current_date = datetime.utcnow().date()
+        return (
+            RideRequest.passenger_id == passenger_id,
+            RideRequest.is_active == True,
+            RideRequest.travel_start_date >= current_date
+        )
+
+    async def get_by_passenger(
+        self, passenger_id: UUID, fields: tuple[str, ...] | None = None, use_replica: bool = False
+    ) -> Sequence[Row]:
+        query = select(*request_columns(fields)).where(*self._listed_by_passenger(passenger_id)).order_by(RideRequest.created_at.desc())
+        session = self.read_session if use_replica else self.session
+        result = await session.execute(query)
+        return result.all()
+
+    async def get_passenger_version(self, passenger_id: UUID, use_replica: bool = False) -> str:
+        """Changes whenever get_by_passenger's result would."""
+        session = self.read_session if use_replica else self.session
+        result = await session.execute(listing_version(RideRequest, *self._listed_by_passenger(passenger_id)))
+        return result.scalar_one()
+
     async def search_requests(
         self,
-        start_location: str,
-        end_location: str,
-        start_date: str,
+        start_location_id: int,
+        end_location_id: int,
+        start_date: str | date,
         limit: int = 10,
-        offset: int = 0
-    ) -> Sequence[RideRequest]:
-        # Calculate Date Window (+2 days)
+        offset: int = 0,
+        after: Cursor | None = None,
+        start_time: time | None = None,
+        fields: tuple[str, ...] | None = None,
+        use_replica: bool = False
+    ) -> Sequence[Row]:
         if isinstance(start_date, str):
-            start_date_obj = datetime.strptime(start_date, "%Y-%m-%d").date()
-        else:
-            start_date_obj = start_date
-            
-        end_date_limit = start_date_obj + timedelta(days=2)
-
-        query = select(RideRequest).options(joinedload(RideRequest.passenger)).where(
-            RideRequest.start_location == start_location.lower().strip(),
-            RideRequest.end_location == end_location.lower().strip(),
-            RideRequest.travel_start_date >= start_date,
-            RideRequest.travel_start_date >= start_date,
-            RideRequest.travel_start_date <= end_date_limit,
+            start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
+        # From start_time (or midnight) to the end of the 2-day window
+        departs_from, departs_until = window = request_window(start_date, start_time)
+        # The same range on the partition key lets Postgres skip every other week's partition
+        first_day, last_day = window_dates(window)
+
+        columns = request_columns(fields)
+        query = lambda_stmt(lambda: select(*columns))
+        query += lambda q: q.where(
+            RideRequest.start_location_id == start_location_id,
+            RideRequest.end_location_id == end_location_id,
+            RideRequest.departs_at >= departs_from,
+            RideRequest.departs_at < departs_until,
+            RideRequest.travel_start_date >= first_day,
+            RideRequest.travel_start_date <= last_day,
             RideRequest.is_active == True
         ).order_by(
-            RideRequest.travel_start_date.asc(),
-            RideRequest.travel_start_time.asc()
-        ).limit(limit).offset(offset)
-        
-        result = await self.session.execute(query)
-        return result.scalars().all()
-        
+            RideRequest.departs_at.asc(),
+            RideRequest.id.asc()
+        ).limit(limit)
+
+        if after is not None:
+            after_date, after_time, after_id = after
+            after_departs = departure(after_date, after_time)
+            query += lambda q: q.where(tuple_(RideRequest.departs_at, RideRequest.id) > tuple_(after_departs, after_id))
+        else:
+            query += lambda q: q.offset(offset)
+
+        session = self.read_session if use_replica else self.session
+        result = await session.execute(query)
+        return result.all()
+
+    async def search_requests_nearby(
+        self,
+        start: Point,
+        end: Point,
+        radius_km: float,
+        start_date: date,
+        limit: int = 10,
+        offset: int = 0,
+        after: Cursor | None = None,
+        start_time: time | None = None,
+        fields: tuple[str, ...] | None = None,
+        use_replica: bool = False
+    ) -> Sequence[Row]:
+        departs_from, departs_until = window = request_window(start_date, start_time)
+        first_day, last_day = window_dates(window)
+
+        query = select(*request_columns(fields)).where(
+            RideRequest.start_cell.in_(cells_within(*start, radius_km)),
+            RideRequest.end_cell.in_(cells_within(*end, radius_km)),
+            RideRequest.departs_at >= departs_from,
+            RideRequest.departs_at < departs_until,
+            RideRequest.travel_start_date >= first_day,
+            RideRequest.travel_start_date <= last_day,
+            RideRequest.is_active == True,
+            within_radius(RideRequest.start_lat, RideRequest.start_lon, start, radius_km),
+            within_radius(RideRequest.end_lat, RideRequest.end_lon, end, radius_km)
+        ).order_by(
+            RideRequest.departs_at.asc(),
+            RideRequest.id.asc()
+        ).limit(limit)
+
+        if after is not None:
+            after_date, after_time, after_id = after
+            query = query.where(tuple_(RideRequest.departs_at, RideRequest.id) > tuple_(departure(after_date, after_time), after_id))
+        else:
+            query = query.offset(offset)
+
+        session = self.read_session if use_replica else self.session
+        result = await session.execute(query)
+        return result.all()
+
     async def delete(self, ride_request: RideRequest) -> None:
         ride_request.is_active = False
         self.session.add(ride_request)
@@ -177,8 +512,10 @@ class RideRequestRepository:
 
 
 class CarPhotoRepository:
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, read_session: AsyncSession | None = None):
         self.session = session
+        # Replica session for read-only methods called with use_replica=True
+        self.read_session = read_session or session
 
     async def create(self, driver_id: UUID, url: str) -> CarPhoto:
         photo = CarPhoto(
@@ -189,11 +526,18 @@ class CarPhotoRepository:
         await self.session.flush()
         return photo
 
-    async def get_by_driver(self, driver_id: UUID) -> Sequence[CarPhoto]:
+    async def get_by_driver(self, driver_id: UUID, use_replica: bool = False) -> Sequence[CarPhoto]:
         query = select(CarPhoto).where(CarPhoto.driver_id == driver_id)
-        result = await self.session.execute(query)
+        session = self.read_session if use_replica else self.session
+        result = await session.execute(query)
         return result.scalars().all()
 
+    async def get_driver_version(self, driver_id: UUID, use_replica: bool = False) -> str:
+        """Changes whenever get_by_driver's result would."""
+        session = self.read_session if use_replica else self.session
+        result = await session.execute(listing_version(CarPhoto, CarPhoto.driver_id == driver_id))
+        return result.scalar_one()
+
     async def get_by_id(self, photo_id: UUID) -> CarPhoto | None:
         return await self.session.get(CarPhoto, photo_id)
         
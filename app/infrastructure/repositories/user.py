@@ -1,5 +1,5 @@
 from uuid import UUID
-from sqlalchemy import select
+from sqlalchemy import select, lambda_stmt
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.domain.models.user import User, TelegramUser
@@ -31,16 +31,22 @@ class UserRepository:
         return user
 
 class TelegramUserRepository:
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, read_session: AsyncSession | None = None):
         self.session = session
+        # Replica session for read-only methods called with use_replica=True
+        self.read_session = read_session or session
 
-    async def find_by_telegram_id(self, telegram_id: int) -> TelegramUser | None:
-        query = select(TelegramUser).where(TelegramUser.telegram_id == telegram_id)
-        result = await self.session.execute(query)
+    async def find_by_telegram_id(self, telegram_id: int, use_replica: bool = False) -> TelegramUser | None:
+        # Lambda statements are built and cache-keyed once; later calls only swap parameters
+        query = lambda_stmt(lambda: select(TelegramUser))
+        query += lambda q: q.where(TelegramUser.telegram_id == telegram_id)
+        session = self.read_session if use_replica else self.session
+        result = await session.execute(query)
         return result.scalar_one_or_none()
 
     async def find_by_user_id(self, user_id: UUID) -> TelegramUser | None:
-        query = select(TelegramUser).where(TelegramUser.user_id == user_id)
+        query = lambda_stmt(lambda: select(TelegramUser))
+        query += lambda q: q.where(TelegramUser.user_id == user_id)
         result = await self.session.execute(query)
         return result.scalar_one_or_none()
 
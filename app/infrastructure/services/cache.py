@@ -0,0 +1,194 @@
+import json
+import time
+import typing
+from collections import OrderedDict
+
+import redis.asyncio as redis
+from loguru import logger
+
+from app.domain.interfaces.cache import ICache
+
+__all__ = [
+    'InMemoryCache',
+    'RedisCache',
+    'TieredCache',
+    'get_search_cache',
+    'get_user_cache',
+]
+
+
+class InMemoryCache(ICache):
+    """Per-process LRU cache with per-entry expiry."""
+
+    def __init__(self, ttl: float, max_entries: int = 10_000) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str], tuple[float, typing.Any]] = OrderedDict()
+        self._namespaces: dict[str, set[str]] = {}
+
+    async def get(self, namespace: str, key: str) -> typing.Any | None:
+        entry = self._entries.get((namespace, key))
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._drop(namespace, key)
+            return None
+        self._entries.move_to_end((namespace, key))
+        return value
+
+    async def set(self, namespace: str, key: str, value: typing.Any, ttl: float | None = None) -> None:
+        self._entries[(namespace, key)] = (time.monotonic() + (ttl or self.ttl), value)
+        self._entries.move_to_end((namespace, key))
+        self._namespaces.setdefault(namespace, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            (old_namespace, old_key), _ = self._entries.popitem(last=False)
+            self._forget(old_namespace, old_key)
+
+    async def invalidate(self, *namespaces: str) -> None:
+        for namespace in namespaces:
+            for key in self._namespaces.pop(namespace, ()):
+                self._entries.pop((namespace, key), None)
+
+    def _drop(self, namespace: str, key: str) -> None:
+        self._entries.pop((namespace, key), None)
+        self._forget(namespace, key)
+
+    def _forget(self, namespace: str, key: str) -> None:
+        keys = self._namespaces.get(namespace)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._namespaces[namespace]
+
+
+class RedisCache(ICache):
+    """
+    Cache shared by every API process. Each namespace is one Redis hash, so
+    invalidating it is a single DEL. Redis errors are logged and treated as
+    misses so a cache outage never fails a request.
+    """
+
+    def __init__(self, client: redis.Redis, ttl: float, prefix: str = 'gogogo:cache') -> None:
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def _key(self, namespace: str) -> str:
+        return f'{self.prefix}:{namespace}'
+
+    async def get(self, namespace: str, key: str) -> typing.Any | None:
+        try:
+            raw = await self.client.hget(self._key(namespace), key)
+        except redis.RedisError as e:
+            logger.warning(f'Cache read failed: {e}')
+            return None
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        if entry['expires_at'] < time.time():
+            return None
+        return entry['value']
+
+    async def set(self, namespace: str, key: str, value: typing.Any, ttl: float | None = None) -> None:
+        ttl = ttl or self.ttl
+        entry = json.dumps({'expires_at': time.time() + ttl, 'value': value})
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.hset(self._key(namespace), key, entry)
+            pipe.expire(self._key(namespace), max(1, int(ttl)))
+            await pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f'Cache write failed: {e}')
+
+    async def invalidate(self, *namespaces: str) -> None:
+        if not namespaces:
+            return
+        try:
+            await self.client.delete(*(self._key(n) for n in namespaces))
+        except redis.RedisError as e:
+            logger.warning(f'Cache invalidation failed: {e}')
+
+
+class TieredCache(ICache):
+    """
+    A short-lived in-process cache in front of a shared one. Hits on the local
+    tier cost no round trip; its TTL bounds how long another process may keep
+    serving an entry after it was invalidated in the shared tier.
+    """
+
+    def __init__(self, local: ICache, shared: ICache) -> None:
+        self.local = local
+        self.shared = shared
+
+    async def get(self, namespace: str, key: str) -> typing.Any | None:
+        value = await self.local.get(namespace, key)
+        if value is None:
+            value = await self.shared.get(namespace, key)
+            if value is not None:
+                await self.local.set(namespace, key, value)
+        return value
+
+    async def set(self, namespace: str, key: str, value: typing.Any, ttl: float | None = None) -> None:
+        # The local tier keeps its own TTL, a longer one would outlive invalidations from other processes
+        await self.local.set(namespace, key, value)
+        await self.shared.set(namespace, key, value, ttl)
+
+    async def invalidate(self, *namespaces: str) -> None:
+        await self.local.invalidate(*namespaces)
+        await self.shared.invalidate(*namespaces)
+
+
+_search_cache: ICache | None = None
+_user_cache: ICache | None = None
+
+
+def get_search_cache() -> ICache | None:
+    global _search_cache
+    from app.configurations.cache import cache_settings
+
+    if cache_settings.CACHE_BACKEND == 'none':
+        return None
+    if _search_cache is None:
+        if cache_settings.CACHE_BACKEND == 'redis':
+            from app.configurations.redis import redis_settings
+
+            _search_cache = RedisCache(
+                redis.Redis.from_url(redis_settings.REDIS_URL),
+                ttl=cache_settings.SEARCH_CACHE_TTL,
+                prefix='gogogo:search',
+            )
+        else:
+            _search_cache = InMemoryCache(
+                ttl=cache_settings.SEARCH_CACHE_TTL,
+                max_entries=cache_settings.CACHE_MAX_ENTRIES,
+            )
+    return _search_cache
+
+
+def get_user_cache() -> ICache | None:
+    """
+    Cache for user records read on every bot interaction: in-process only with the
+    memory backend, and in-process in front of Redis with the redis backend.
+    """
+    global _user_cache
+    from app.configurations.cache import cache_settings
+
+    if cache_settings.CACHE_BACKEND == 'none':
+        return None
+    if _user_cache is None:
+        local = InMemoryCache(
+            ttl=cache_settings.USER_CACHE_LOCAL_TTL,
+            max_entries=cache_settings.CACHE_MAX_ENTRIES,
+        )
+        if cache_settings.CACHE_BACKEND == 'redis':
+            from app.configurations.redis import redis_settings
+
+            _user_cache = TieredCache(local, RedisCache(
+                redis.Redis.from_url(redis_settings.REDIS_URL),
+                ttl=cache_settings.USER_CACHE_TTL,
+                prefix='gogogo:users',
+            ))
+        else:
+            _user_cache = local
+    return _user_cache
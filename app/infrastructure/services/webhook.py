@@ -0,0 +1,148 @@
+import asyncio
+import importlib.util
+import time
+import typing
+from urllib.parse import urlsplit
+
+import httpx
+from loguru import logger
+
+__all__ = [
+    'HostRateLimiter',
+    'WebhookDispatcher',
+    'get_webhook_dispatcher',
+]
+
+
+class HostRateLimiter:
+    """Token bucket allowing `rate` requests per second with bursts of up to `burst`."""
+
+    def __init__(self, rate: float, burst: int | None = None) -> None:
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class WebhookDispatcher:
+    """
+    Process-wide sender for bot webhooks.
+
+    Keeps one keep-alive connection pool, caps the number of requests in flight
+    and rate limits every destination host. The pool belongs to the event loop
+    it was created on and is rebuilt if it is used from a different loop; the
+    previous pool is closed first so its sockets are not left open.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 10,
+        rate_per_host: float = 0,
+        max_keepalive: int = 20,
+        timeout: float = 10.0,
+        http2: bool = False,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        if http2 and importlib.util.find_spec('h2') is None:
+            logger.warning('WEBHOOK_HTTP2 is enabled but the `h2` package is missing, using HTTP/1.1')
+            http2 = False
+        self.max_concurrency = max_concurrency
+        self.rate_per_host = rate_per_host
+        self.max_keepalive = max_keepalive
+        self.timeout = timeout
+        self.http2 = http2
+        self.transport = transport
+        self._client: httpx.AsyncClient | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._limiters: dict[str, HostRateLimiter] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    async def _bind(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            if self._client is not None:
+                await self._discard(self._client)
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                transport=self.transport,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_keepalive,
+                ),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._limiters = {}
+            self._loop = loop
+        return self._client
+
+    @staticmethod
+    async def _discard(client: httpx.AsyncClient) -> None:
+        try:
+            await client.aclose()
+        except Exception as e:
+            # Connections tied to a loop that is already closed cannot shut down cleanly;
+            # the reference is dropped either way and the sockets go with the client
+            logger.debug(f'Closing the previous webhook client failed: {e}')
+
+    def _limiter(self, url: str) -> HostRateLimiter | None:
+        if self.rate_per_host <= 0:
+            return None
+        host = urlsplit(url).netloc
+        limiter = self._limiters.get(host)
+        if limiter is None:
+            limiter = self._limiters[host] = HostRateLimiter(self.rate_per_host)
+        return limiter
+
+    async def post(self, url: str, payload: dict[str, typing.Any]) -> httpx.Response:
+        client = await self._bind()
+        limiter = self._limiter(url)
+        async with self._semaphore:
+            if limiter:
+                await limiter.acquire()
+            return await client.post(url, json=payload)
+
+    async def post_many(
+        self,
+        url: str,
+        payloads: typing.Iterable[dict[str, typing.Any]],
+    ) -> list[httpx.Response | BaseException]:
+        return await asyncio.gather(
+            *(self.post(url, payload) for payload in payloads),
+            return_exceptions=True,
+        )
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+_dispatcher: WebhookDispatcher | None = None
+
+
+def get_webhook_dispatcher() -> WebhookDispatcher:
+    global _dispatcher
+    if _dispatcher is None:
+        from app.configurations.notifications import notification_settings
+
+        _dispatcher = WebhookDispatcher(
+            max_concurrency=notification_settings.WEBHOOK_MAX_CONCURRENCY,
+            rate_per_host=notification_settings.WEBHOOK_RATE_LIMIT_PER_HOST,
+            max_keepalive=notification_settings.WEBHOOK_MAX_KEEPALIVE,
+            timeout=notification_settings.WEBHOOK_TIMEOUT,
+            http2=notification_settings.WEBHOOK_HTTP2,
+        )
+    return _dispatcher
@@ -0,0 +1,58 @@
+import uuid
+from typing import Annotated, AsyncIterator
+
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.configurations.feed import feed_settings
+from app.infrastructure.connections.database.session import async_session_maker
+from app.infrastructure.dependencies.providers import get_live_feed
+from app.infrastructure.repositories.location import LocationRepository
+from app.representations.responses import event_stream, server_sent_events
+from app.services.feed import FeedHub, route_channel, user_channel
+from app.services.locations import LocationResolver, ResolvedLocation
+
+router = APIRouter(prefix="/feed", tags=["Feed"])
+
+
+async def _events(hub: FeedHub, channel: str) -> AsyncIterator[bytes]:
+    # Subscribed while the response streams; a client disconnect cancels this and unsubscribes
+    async with hub.subscribe(channel) as queue:
+        async for chunk in server_sent_events(queue, feed_settings.FEED_HEARTBEAT_INTERVAL):
+            yield chunk
+
+
+async def _find_route(start_location: str, end_location: str) -> tuple[ResolvedLocation, ResolvedLocation] | None:
+    # Its own short session rather than the request's: a yield dependency is only
+    # torn down after the response, and this one streams for as long as the client stays
+    async with async_session_maker() as session:
+        locations = LocationResolver(LocationRepository(session))
+        start = await locations.find(start_location)
+        end = await locations.find(end_location) if start else None
+    return (start, end) if start and end else None
+
+
+@router.get("/users/{user_id}")
+async def user_feed(
+    user_id: uuid.UUID,
+    hub: Annotated[FeedHub, Depends(get_live_feed)]
+):
+    """
+    Server-sent events for one user: the same match payloads the bot webhook
+    receives (`new_offer_found`, `new_offers_found`, `matches_found_for_request`).
+    """
+    return event_stream(_events(hub, user_channel(user_id)))
+
+
+@router.get("/routes")
+async def route_feed(
+    start_location: str,
+    end_location: str,
+    hub: Annotated[FeedHub, Depends(get_live_feed)]
+):
+    """Server-sent events for one route: `offer_created` and `request_created` with the new ride."""
+    route = await _find_route(start_location, end_location)
+    if route is None:
+        # No ride has ever used the place, so there is no channel to follow yet
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown location")
+    start, end = route
+    return event_stream(_events(hub, route_channel(start.id, end.id)))
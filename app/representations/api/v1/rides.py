@@ -1,20 +1,47 @@
 import uuid
+from datetime import time
 from typing import List, Annotated
 
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, status, Form
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, status, Form, Request, Response, Query, Header
 
 from app.representations.dtos.ride import (
     CreateRideOfferDTO, RideOfferDTO,
     CreateRideRequestDTO, RideRequestDTO,
     CarPhotoDTO,
-    RideOfferSearchDTO, RideRequestSearchDTO
+    RideOfferSearchDTO, RideRequestSearchDTO,
+    RideOfferNearbySearchDTO, RideRequestNearbySearchDTO,
+    BulkCreateRideOffersDTO, BulkCreateRideRequestsDTO, BulkCreatedDTO,
+    ReserveSeatsDTO, RideBookingDTO,
+    CarPhotoListAdapter, list_adapter, parse_fields
 )
 from app.services.ride_service import RideService
 from app.infrastructure.dependencies.providers import get_ride_service
-from app.infrastructure.dependencies.providers import get_ride_service
+from app.utils.pagination import encode_cursor
+from app.representations.responses import stream_models, list_response, IfNoneMatch, with_etag, not_modified
 
 router = APIRouter(tags=["Rides"])
 
+
+def set_next_cursor(response: Response, rides: List[RideOfferDTO] | List[RideRequestDTO], limit: int) -> None:
+    """A full page may have a successor; point the client just past its last ride."""
+    if rides and len(rides) >= limit:
+        last = rides[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.travel_start_date, last.travel_start_time, last.id)
+
+def offer_fields(fields: str | None = None) -> tuple[str, ...] | None:
+    # `fields=id,travel_start_time,price`: select and return only these RideOfferDTO fields
+    try:
+        return parse_fields(RideOfferDTO, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+def request_fields(fields: str | None = None) -> tuple[str, ...] | None:
+    try:
+        return parse_fields(RideRequestDTO, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
 # --- Ride Offers ---
 
 @router.post("/offers", response_model=RideOfferDTO, status_code=status.HTTP_201_CREATED)
@@ -26,6 +53,15 @@ async def create_ride_offer(
     new_offer = await service.create_ride_offer(driver_id, dto)
     return new_offer
 
+@router.post("/offers/bulk", response_model=BulkCreatedDTO, status_code=status.HTTP_201_CREATED)
+async def create_ride_offers_bulk(
+    dto: BulkCreateRideOffersDTO,
+    service: Annotated[RideService, Depends(get_ride_service)]
+):
+    # Ids come back in the order of dto.offers
+    ids = await service.create_ride_offers_bulk(dto.offers)
+    return BulkCreatedDTO(ids=ids)
+
 @router.get("/offers/search", response_model=List[RideOfferDTO])
 async def search_ride_offers(
     # Query params mapping to DTO
@@ -33,8 +69,11 @@ async def search_ride_offers(
     end_location: str,
     seats_needed: int,
     start_time: str, # date string YYYY-MM-DD
+    start_time_time: time | None = None, # HH:MM local departure time
     limit: int = 10,
     offset: int = 0,
+    cursor: str | None = None, # X-Next-Cursor of the previous page
+    fields: Annotated[tuple[str, ...] | None, Depends(offer_fields)] = None,
     service: Annotated[RideService, Depends(get_ride_service)] = None
 ):
     dto = RideOfferSearchDTO(
@@ -42,23 +81,55 @@ async def search_ride_offers(
         end_location=end_location,
         seats_needed=seats_needed,
         start_time=start_time,
+        start_time_time=start_time_time,
         limit=limit,
-        offset=offset
+        offset=offset,
+        cursor=cursor
     )
-    return await service.search_ride_offers(dto)
+    try:
+        offers = await service.search_ride_offers(dto, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    response = list_response(offers, list_adapter(RideOfferDTO, fields), fields)
+    set_next_cursor(response, offers, limit)
+    return response
+
+@router.get("/offers/nearby", response_model=List[RideOfferDTO])
+async def search_ride_offers_nearby(
+    dto: Annotated[RideOfferNearbySearchDTO, Query()],
+    service: Annotated[RideService, Depends(get_ride_service)]
+):
+    # Rides posted with coordinates whose both ends lie within radius_km of the given points
+    fields = offer_fields(dto.fields)
+    try:
+        offers = await service.search_ride_offers_nearby(dto, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    response = list_response(offers, list_adapter(RideOfferDTO, fields), fields)
+    set_next_cursor(response, offers, dto.limit)
+    return response
 
 @router.get("/offers", response_model=List[RideOfferDTO])
 async def get_ride_offers(
-    service: Annotated[RideService, Depends(get_ride_service)]
+    request: Request,
+    service: Annotated[RideService, Depends(get_ride_service)],
+    include_inactive: bool = False
 ):
-    return await service.get_ride_offers()
+    # Streamed as a JSON array, or as NDJSON with `Accept: application/x-ndjson`
+    return stream_models(service.stream_ride_offers(include_inactive), request.headers.get("accept"))
 
 @router.get("/drivers/{driver_id}/offers", response_model=List[RideOfferDTO])
 async def get_driver_offers(
     driver_id: uuid.UUID,
-    service: Annotated[RideService, Depends(get_ride_service)]
+    service: Annotated[RideService, Depends(get_ride_service)],
+    fields: Annotated[tuple[str, ...] | None, Depends(offer_fields)] = None,
+    if_none_match: Annotated[str | None, Header()] = None
 ):
-    return await service.get_driver_offers(driver_id)
+    # Polled on every bot screen: an unchanged listing costs one aggregate query and a 304
+    version, offers = await service.get_driver_offers_if_changed(driver_id, IfNoneMatch(if_none_match), fields)
+    if offers is None:
+        return not_modified(version)
+    return with_etag(list_response(offers, list_adapter(RideOfferDTO, fields), fields), version)
 
 @router.delete("/offers/{offer_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_ride_offer(
@@ -71,6 +142,17 @@ async def delete_ride_offer(
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
 
+@router.post("/offers/{offer_id}/reservations", response_model=RideBookingDTO, status_code=status.HTTP_201_CREATED)
+async def reserve_seats(
+    offer_id: uuid.UUID,
+    dto: ReserveSeatsDTO,
+    service: Annotated[RideService, Depends(get_ride_service)]
+):
+    try:
+        return await service.reserve_seats(offer_id, dto.passenger_id, dto.seats)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
 # --- Ride Requests ---
 
 @router.get("/requests/search", response_model=List[RideRequestDTO])
@@ -79,18 +161,43 @@ async def search_ride_requests(
     start_location: str,
     end_location: str,
     start_time: str, # date string YYYY-MM-DD
+    start_time_time: time | None = None, # HH:MM local departure time
     limit: int = 10,
     offset: int = 0,
+    cursor: str | None = None, # X-Next-Cursor of the previous page
+    fields: Annotated[tuple[str, ...] | None, Depends(request_fields)] = None,
     service: Annotated[RideService, Depends(get_ride_service)] = None
 ):
     dto = RideRequestSearchDTO(
         start_location=start_location,
         end_location=end_location,
         start_time=start_time,
+        start_time_time=start_time_time,
         limit=limit,
-        offset=offset
+        offset=offset,
+        cursor=cursor
     )
-    return await service.search_ride_requests(dto)
+    try:
+        requests = await service.search_ride_requests(dto, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    response = list_response(requests, list_adapter(RideRequestDTO, fields), fields)
+    set_next_cursor(response, requests, limit)
+    return response
+
+@router.get("/requests/nearby", response_model=List[RideRequestDTO])
+async def search_ride_requests_nearby(
+    dto: Annotated[RideRequestNearbySearchDTO, Query()],
+    service: Annotated[RideService, Depends(get_ride_service)]
+):
+    fields = request_fields(dto.fields)
+    try:
+        requests = await service.search_ride_requests_nearby(dto, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    response = list_response(requests, list_adapter(RideRequestDTO, fields), fields)
+    set_next_cursor(response, requests, dto.limit)
+    return response
 
 @router.post("/requests", response_model=RideRequestDTO, status_code=status.HTTP_201_CREATED)
 async def create_ride_request(
@@ -101,18 +208,35 @@ async def create_ride_request(
     new_req = await service.create_ride_request(passenger_id, dto)
     return new_req
 
+@router.post("/requests/bulk", response_model=BulkCreatedDTO, status_code=status.HTTP_201_CREATED)
+async def create_ride_requests_bulk(
+    dto: BulkCreateRideRequestsDTO,
+    service: Annotated[RideService, Depends(get_ride_service)]
+):
+    # Ids come back in the order of dto.requests
+    ids = await service.create_ride_requests_bulk(dto.requests)
+    return BulkCreatedDTO(ids=ids)
+
 @router.get("/requests", response_model=List[RideRequestDTO])
 async def get_ride_requests(
-    service: Annotated[RideService, Depends(get_ride_service)]
+    request: Request,
+    service: Annotated[RideService, Depends(get_ride_service)],
+    include_inactive: bool = False
 ):
-    return await service.get_ride_requests()
+    # Streamed as a JSON array, or as NDJSON with `Accept: application/x-ndjson`
+    return stream_models(service.stream_ride_requests(include_inactive), request.headers.get("accept"))
 
 @router.get("/passengers/{passenger_id}/requests", response_model=List[RideRequestDTO])
 async def get_passenger_requests(
     passenger_id: uuid.UUID,
-    service: Annotated[RideService, Depends(get_ride_service)]
+    service: Annotated[RideService, Depends(get_ride_service)],
+    fields: Annotated[tuple[str, ...] | None, Depends(request_fields)] = None,
+    if_none_match: Annotated[str | None, Header()] = None
 ):
-    return await service.get_passenger_requests(passenger_id)
+    version, requests = await service.get_passenger_requests_if_changed(passenger_id, IfNoneMatch(if_none_match), fields)
+    if requests is None:
+        return not_modified(version)
+    return with_etag(list_response(requests, list_adapter(RideRequestDTO, fields), fields), version)
 
 @router.delete("/requests/{request_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_ride_request(
@@ -146,9 +270,13 @@ async def upload_car_photo(
 @router.get("/drivers/{driver_id}/photos", response_model=List[CarPhotoDTO])
 async def get_driver_photos(
     driver_id: uuid.UUID,
-    service: Annotated[RideService, Depends(get_ride_service)]
+    service: Annotated[RideService, Depends(get_ride_service)],
+    if_none_match: Annotated[str | None, Header()] = None
 ):
-    return await service.get_driver_photos(driver_id)
+    version, photos = await service.get_driver_photos_if_changed(driver_id, IfNoneMatch(if_none_match))
+    if photos is None:
+        return not_modified(version)
+    return with_etag(list_response(photos, CarPhotoListAdapter), version)
 
 @router.delete("/photos/{photo_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_car_photo(
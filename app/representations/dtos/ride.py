@@ -1,8 +1,10 @@
 import uuid
 from datetime import date, time
-from typing import Optional
-from pydantic import BaseModel, ConfigDict
+from functools import lru_cache
+from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, create_model, model_validator
 from app.domain.models.ride import RequestSource
+from app.utils.geo import MAX_RADIUS_KM
 
 
 class BaseRideDTO(BaseModel):
@@ -14,6 +16,18 @@ class BaseRideDTO(BaseModel):
     end_location: str
     request_source: RequestSource
 
+    # Optional coordinates of the pickup and drop-off points, given as lat/lon pairs
+    start_lat: Optional[float] = Field(default=None, ge=-90, le=90)
+    start_lon: Optional[float] = Field(default=None, ge=-180, le=180)
+    end_lat: Optional[float] = Field(default=None, ge=-90, le=90)
+    end_lon: Optional[float] = Field(default=None, ge=-180, le=180)
+
+    @model_validator(mode="after")
+    def check_coordinate_pairs(self):
+        if (self.start_lat is None) != (self.start_lon is None) or (self.end_lat is None) != (self.end_lon is None):
+            raise ValueError("Coordinates must be given as lat/lon pairs")
+        return self
+
 
 # --- Ride Offer DTOs ---
 
@@ -64,31 +78,134 @@ class RideRequestDTO(BaseRideDTO):
     seat_amount: str
 
 
+# --- Sparse fieldsets ---
+
+# Kept in every sparse row whether requested or not: the next page's cursor is built from them
+CURSOR_FIELDS = ("id", "travel_start_date", "travel_start_time")
+
+
+def parse_fields(dto: type[BaseModel], fields: str | None) -> tuple[str, ...] | None:
+    """The names in a `fields=id,price` parameter, in `dto`'s field order; None for all fields."""
+    if not fields:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - dto.model_fields.keys()
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(name for name in dto.model_fields if name in requested)
+
+
+def selected_fields(dto: type[BaseModel], fields: tuple[str, ...] | None) -> tuple[str, ...]:
+    """What a listing selects and validates for `fields`: the requested ones plus the cursor fields."""
+    return tuple(name for name in dto.model_fields if fields is None or name in fields or name in CURSOR_FIELDS)
+
+
+# Whole pages validated from rows and dumped to JSON in one call each, instead of a model_validate per row
+@lru_cache(maxsize=128)
+def list_adapter(dto: type[BaseModel], fields: tuple[str, ...] | None = None) -> TypeAdapter:
+    """Validates a page of `dto`, or of a model with only the selected_fields when `fields` is given."""
+    if fields is None:
+        return TypeAdapter(List[dto])
+    sparse = create_model(
+        f"Sparse{dto.__name__}",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (dto.model_fields[name].annotation, dto.model_fields[name]) for name in selected_fields(dto, fields)},
+    )
+    return TypeAdapter(List[sparse])
+
+
+RideOfferListAdapter = list_adapter(RideOfferDTO)
+RideRequestListAdapter = list_adapter(RideRequestDTO)
+
+
+# --- Bulk DTOs ---
+
+# Upper bound on rides per bulk call, keeps one INSERT well under the bind parameter limit
+BULK_MAX_ITEMS = 1000
+
+
+class BulkRideOfferItemDTO(CreateRideOfferDTO):
+    driver_id: uuid.UUID
+
+
+class BulkRideRequestItemDTO(CreateRideRequestDTO):
+    passenger_id: uuid.UUID
+
+
+class BulkCreateRideOffersDTO(BaseModel):
+    offers: List[BulkRideOfferItemDTO] = Field(min_length=1, max_length=BULK_MAX_ITEMS)
+
+
+class BulkCreateRideRequestsDTO(BaseModel):
+    requests: List[BulkRideRequestItemDTO] = Field(min_length=1, max_length=BULK_MAX_ITEMS)
+
+
+class BulkCreatedDTO(BaseModel):
+    ids: List[uuid.UUID]
+
+
+# --- Reservation DTOs ---
+
+class ReserveSeatsDTO(BaseModel):
+    passenger_id: uuid.UUID
+    seats: int = Field(default=1, ge=1)
+
+
+class RideBookingDTO(BaseModel):
+    id: uuid.UUID
+    offer_id: uuid.UUID
+    passenger_id: uuid.UUID
+    seats: int
+    free_seats: int  # left on the offer after this booking
+
+
 # --- Search DTOs ---
 
 class RideOfferSearchDTO(BaseModel):
     start_location: str
     end_location: str
     seats_needed: int
-    start_time: date # we'll use date for MVP search, or datetime if needed. Requirement said "time".
-                     # Actually, requirement said "offer_start_times >= request_start_time".
-                     # Let's support date and time.
-    start_time_time: Optional[time] = None # Optional, if not provided maybe just date?
-                                           # For simplicity let's stick to date + optional time filter logic
-                                           # or just timestamp. The models use date + time separate columns.
+    start_time: date
+    start_time_time: Optional[time] = None  # narrows the day to departures within 4 hours of this time
     
     limit: int = 10
     offset: int = 0
+    cursor: Optional[str] = None  # opaque keyset cursor, takes precedence over offset
 
 
 class RideRequestSearchDTO(BaseModel):
     start_location: str
     end_location: str
     start_time: date
+    start_time_time: Optional[time] = None  # skips departures before this time on the first day
+
+    limit: int = 10
+    offset: int = 0
+    cursor: Optional[str] = None  # opaque keyset cursor, takes precedence over offset
+
+
+class NearbySearchDTO(BaseModel):
+    """Rides starting within radius_km of the start point and ending within radius_km of the end point."""
+    start_lat: float = Field(ge=-90, le=90)
+    start_lon: float = Field(ge=-180, le=180)
+    end_lat: float = Field(ge=-90, le=90)
+    end_lon: float = Field(ge=-180, le=180)
+    radius_km: float = Field(default=5.0, gt=0, le=MAX_RADIUS_KM)
+    start_time: date
     start_time_time: Optional[time] = None
-    
+
     limit: int = 10
     offset: int = 0
+    cursor: Optional[str] = None
+    fields: Optional[str] = None  # comma-separated response fields, all when omitted
+
+
+class RideOfferNearbySearchDTO(NearbySearchDTO):
+    seats_needed: int
+
+
+class RideRequestNearbySearchDTO(NearbySearchDTO):
+    pass
 
 
 # --- Car Photo DTOs ---
@@ -101,3 +218,6 @@ class CarPhotoDTO(BaseModel):
     id: uuid.UUID
     driver_id: uuid.UUID
     url: str
+
+
+CarPhotoListAdapter = TypeAdapter(List[CarPhotoDTO])
@@ -0,0 +1,124 @@
+import asyncio
+import json
+from typing import Any, AsyncIterable, AsyncIterator, Sequence
+
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, TypeAdapter
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+EVENT_STREAM_MEDIA_TYPE = "text/event-stream"
+
+# Rows are flushed to the socket in chunks of roughly this many bytes
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def wants_ndjson(accept: str | None) -> bool:
+    return bool(accept) and NDJSON_MEDIA_TYPE in accept
+
+
+async def _chunked(parts: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    buffer = bytearray()
+    async for part in parts:
+        buffer += part
+        if len(buffer) >= STREAM_CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+async def ndjson_lines(items: AsyncIterable[BaseModel]) -> AsyncIterator[bytes]:
+    async for item in items:
+        yield item.model_dump_json().encode() + b"\n"
+
+
+async def json_array(items: AsyncIterable[BaseModel]) -> AsyncIterator[bytes]:
+    yield b"["
+    separator = b""
+    async for item in items:
+        yield separator + item.model_dump_json().encode()
+        separator = b","
+    yield b"]"
+
+
+def stream_models(items: AsyncIterable[BaseModel], accept: str | None) -> StreamingResponse:
+    """
+    Streams models as NDJSON when the client asks for it, otherwise as one
+    chunked JSON array, so memory stays flat regardless of the row count.
+    """
+    if wants_ndjson(accept):
+        return StreamingResponse(_chunked(ndjson_lines(items)), media_type=NDJSON_MEDIA_TYPE)
+    return StreamingResponse(_chunked(json_array(items)), media_type="application/json")
+
+
+def list_response(
+    items: Sequence[BaseModel], adapter: TypeAdapter[Any], fields: Sequence[str] | None = None
+) -> Response:
+    """
+    Serializes an already validated page in one pass through `adapter`, keeping
+    only `fields` when given. Returning a Response makes FastAPI skip validating
+    it again against the response_model, which then only documents the endpoint.
+    """
+    include = {"__all__": set(fields)} if fields else None
+    return Response(adapter.dump_json(items, include=include), media_type="application/json")
+
+
+class IfNoneMatch:
+    """
+    The versions named by an If-None-Match header, as given in the weak ETags
+    `etag()` builds. Compared weakly, as RFC 9110 asks for GET; `*` matches any.
+    """
+
+    def __init__(self, header: str | None) -> None:
+        self.any = (header or "").strip() == "*"
+        self.versions = {
+            tag.strip().removeprefix("W/").strip('"')
+            for tag in (header or "").split(",")
+            if tag.strip()
+        }
+
+    def __contains__(self, version: object) -> bool:
+        return self.any or version in self.versions
+
+
+def etag(version: str) -> str:
+    # Weak: the same listing is equivalent whether sent plain or compressed
+    return f'W/"{version}"'
+
+
+def with_etag(response: Response, version: str) -> Response:
+    response.headers["ETag"] = etag(version)
+    # Cacheable by the client, but checked with the server on every use
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def not_modified(version: str) -> Response:
+    return with_etag(Response(status_code=304), version)
+
+
+async def server_sent_events(queue: asyncio.Queue, heartbeat: float) -> AsyncIterator[bytes]:
+    """
+    Frames the events arriving on `queue` as SSE until it yields None. A comment
+    goes out after `heartbeat` idle seconds, keeping proxies from closing the
+    connection and noticing clients that went away.
+    """
+    while True:
+        try:
+            event = await asyncio.wait_for(queue.get(), heartbeat)
+        except TimeoutError:
+            yield b": keep-alive\n\n"
+            continue
+        if event is None:
+            return
+        yield f"event: {event.get('type', 'message')}\ndata: {json.dumps(event)}\n\n".encode()
+
+
+def event_stream(events: AsyncIterable[bytes]) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type=EVENT_STREAM_MEDIA_TYPE,
+        # Nginx would otherwise buffer the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
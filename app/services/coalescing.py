@@ -0,0 +1,46 @@
+from datetime import date
+
+import redis
+
+
+class RouteCoalescer:
+    """
+    Groups matching jobs for the same route and date over a short window.
+
+    The first ride added to an empty group is told to schedule the flush;
+    every ride added before the flush runs joins that same matching pass.
+    """
+
+    def __init__(self, client: redis.Redis, window: float, prefix: str = "gogogo:coalesce") -> None:
+        self.client = client
+        self.window = window
+        self.prefix = prefix
+
+    @staticmethod
+    def group_key(kind: str, start_location: str, end_location: str, travel_date: date) -> str:
+        return f"{kind}:{start_location.lower().strip()}|{end_location.lower().strip()}|{travel_date.isoformat()}"
+
+    def _pending(self, group: str) -> str:
+        return f"{self.prefix}:pending:{group}"
+
+    def _scheduled(self, group: str) -> str:
+        return f"{self.prefix}:scheduled:{group}"
+
+    def add(self, group: str, *ride_ids: str) -> bool:
+        """Adds rides to the group. Returns True if the caller must schedule the flush."""
+        # The flag outlives the window so a lost flush can never block a route for long
+        ttl = max(int(self.window * 10), 30)
+        pipe = self.client.pipeline()
+        pipe.sadd(self._pending(group), *ride_ids)
+        pipe.expire(self._pending(group), ttl)
+        pipe.set(self._scheduled(group), 1, nx=True, ex=ttl)
+        _, _, scheduled = pipe.execute()
+        return bool(scheduled)
+
+    def drain(self, group: str) -> list[str]:
+        """Atomically takes every pending ride and reopens the group."""
+        pipe = self.client.pipeline()
+        pipe.smembers(self._pending(group))
+        pipe.delete(self._pending(group), self._scheduled(group))
+        members, _ = pipe.execute()
+        return sorted(m.decode() if isinstance(m, bytes) else m for m in members)
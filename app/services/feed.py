@@ -0,0 +1,149 @@
+import asyncio
+import json
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+import redis
+import redis.asyncio as aioredis
+from loguru import logger
+
+from app.core.metrics import Counter, Gauge
+
+# An event as published and as delivered: JSON with a "type"
+Event = dict[str, Any]
+
+slow_clients = Counter("feed_slow_clients", "Feed streams ended because the client fell a full queue behind")
+Gauge("feed_subscribers", "Feed streams open in this process", lambda: (
+    [({}, _hub.subscribers)] if _hub is not None else []
+))
+
+
+def user_channel(user_id: uuid.UUID | str) -> str:
+    return f"user:{user_id}"
+
+
+def route_channel(start_location_id: int, end_location_id: int) -> str:
+    return f"route:{start_location_id}|{end_location_id}"
+
+
+class FeedPublisher:
+    """Publishes feed events from the workers; every API process relays them to its clients."""
+
+    def __init__(self, redis_url: str, prefix: str) -> None:
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(redis_url)
+
+    def publish(self, channel: str, event: Event) -> None:
+        self._client.publish(f"{self.prefix}:{channel}", json.dumps(event))
+
+
+class FeedHub:
+    """
+    Fans feed events out to the streaming clients of one API process.
+
+    The process holds a single pattern subscription to every feed channel, however
+    many clients are connected, and hands each event to the bounded queue of every
+    client subscribed to its channel. A client that reads slower than its events
+    arrive gets its stream ended instead of an ever-growing buffer; it reconnects
+    and carries on with live events. Nothing is replayed: the feed is for push
+    latency, and the listing endpoints remain the source of truth.
+    """
+
+    def __init__(self, client: aioredis.Redis, prefix: str, queue_size: int = 100) -> None:
+        self.prefix = prefix
+        self.queue_size = queue_size
+        self._client = client
+        self._queues: dict[str, set[asyncio.Queue]] = {}
+        self._listener: asyncio.Task | None = None
+
+    @property
+    def subscribers(self) -> int:
+        return len({id(q) for queues in self._queues.values() for q in queues})
+
+    @asynccontextmanager
+    async def subscribe(self, *channels: str) -> AsyncIterator[asyncio.Queue]:
+        """A queue receiving the events of `channels`, and None once the stream should end."""
+        queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        for channel in channels:
+            self._queues.setdefault(channel, set()).add(queue)
+        self._ensure_listening()
+        try:
+            yield queue
+        finally:
+            self._remove(queue)
+
+    def dispatch(self, channel: str, event: Event) -> None:
+        for queue in list(self._queues.get(channel, ())):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._remove(queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+                slow_clients.inc()
+
+    def _remove(self, queue: asyncio.Queue) -> None:
+        for channel, queues in list(self._queues.items()):
+            queues.discard(queue)
+            if not queues:
+                del self._queues[channel]
+
+    def _ensure_listening(self) -> None:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen(), name="feed-hub")
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.psubscribe(f"{self.prefix}:*")
+                async for message in pubsub.listen():
+                    channel = message["channel"].decode().removeprefix(f"{self.prefix}:")
+                    try:
+                        event = json.loads(message["data"])
+                    except ValueError as e:
+                        logger.warning(f"Dropping malformed feed event: {e}")
+                        continue
+                    self.dispatch(channel, event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Clients stay connected and only get keep-alives until the subscription is back
+                logger.error(f"Feed subscription lost: {e}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+
+_hub: FeedHub | None = None
+_publisher: FeedPublisher | None = None
+
+
+def get_feed_hub() -> FeedHub:
+    global _hub
+    if _hub is None:
+        from app.configurations.feed import feed_settings
+        from app.configurations.redis import redis_settings
+
+        _hub = FeedHub(
+            aioredis.Redis.from_url(redis_settings.REDIS_URL),
+            prefix=feed_settings.FEED_CHANNEL_PREFIX,
+            queue_size=feed_settings.FEED_QUEUE_SIZE,
+        )
+    return _hub
+
+
+def get_feed_publisher() -> FeedPublisher | None:
+    """The workers' publisher, or None when the feed is disabled."""
+    global _publisher
+    from app.configurations.feed import feed_settings
+
+    if not feed_settings.FEED_ENABLED:
+        return None
+    if _publisher is None:
+        from app.configurations.redis import redis_settings
+
+        _publisher = FeedPublisher(redis_settings.REDIS_URL, feed_settings.FEED_CHANNEL_PREFIX)
+    return _publisher
@@ -0,0 +1,74 @@
+from dataclasses import dataclass
+
+from app.infrastructure.repositories.location import LocationRepository
+from app.utils.normalization import correct_location, known_location, location_key, normalize_location
+
+
+@dataclass(frozen=True)
+class ResolvedLocation:
+    id: int
+    name: str
+
+
+# Alias key -> location, shared by every resolver in the process. Aliases are never
+# removed or repointed, so a committed entry stays correct for the life of the process.
+_resolved: dict[str, ResolvedLocation] = {}
+
+
+class LocationResolver:
+    """
+    Turns free-form place names into location ids.
+
+    Spellings are first normalized (known cities, Cyrillic) and then looked up by
+    `location_key`, so after warm-up the hot path is one dictionary lookup and
+    rides are stored and searched by integer id only. Typo correction is the last
+    resort: a name that is already a known place is never corrected into another. Locations created in the
+    current transaction are kept on this instance until its owner commits; only
+    committed rows go into the shared cache.
+    """
+
+    def __init__(self, repo: LocationRepository, cache: dict[str, ResolvedLocation] | None = None) -> None:
+        self.repo = repo
+        self.cache = _resolved if cache is None else cache
+        self._created: dict[str, ResolvedLocation] = {}
+
+    @staticmethod
+    def canonical(text: str) -> tuple[str, str]:
+        """The name and key a new location for `text` is created under."""
+        name = normalize_location(text).strip()
+        return name, location_key(name)
+
+    async def find(self, text: str) -> ResolvedLocation | None:
+        """The location `text` names, or None when nobody has used that place yet."""
+        name = known_location(text) or text.strip()
+        found = await self._lookup(location_key(name))
+        if found is None:
+            corrected = correct_location(text)
+            if corrected and corrected != name:
+                found = await self._lookup(location_key(corrected))
+        return found
+
+    async def _lookup(self, key: str) -> ResolvedLocation | None:
+        if not key:
+            return None
+        found = self.cache.get(key) or self._created.get(key)
+        if found is None:
+            row = await self.repo.find_by_key(key)
+            if row is not None:
+                found = self.cache[key] = ResolvedLocation(*row)
+        return found
+
+    async def get_or_create(self, text: str) -> ResolvedLocation:
+        found = await self.find(text)
+        if found is not None:
+            return found
+        name, key = self.canonical(text)
+        if not key:
+            raise ValueError("Location must not be empty")
+        created = self._created[key] = ResolvedLocation(*await self.repo.get_or_create(name, key))
+        return created
+
+    def committed(self) -> None:
+        """Shares the locations this instance created, once their transaction has committed."""
+        self.cache.update(self._created)
+        self._created.clear()
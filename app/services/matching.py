@@ -0,0 +1,280 @@
+import bisect
+import json
+import threading
+import time
+from datetime import date, datetime, time as time_of_day, timedelta, timezone
+from operator import attrgetter
+from typing import Any, Callable, Generic, TypeVar
+from uuid import UUID
+
+import redis
+from loguru import logger
+
+from app.representations.dtos.ride import RideOfferDTO, RideRequestDTO
+from app.utils.departure import DepartureWindow, departure, offer_window, request_window, window_dates
+
+
+RideT = TypeVar("RideT", RideOfferDTO, RideRequestDTO)
+RouteKey = tuple[str, str, date]
+
+
+def route_key(start_location: str, end_location: str, travel_date: date) -> RouteKey:
+    return start_location.lower().strip(), end_location.lower().strip(), travel_date
+
+
+class RideBuckets(Generic[RideT]):
+    """
+    Open rides of one kind, bucketed by (start_location, end_location, travel_start_date).
+    Every bucket is kept sorted by (travel_start_time, id), the order the SQL searches use.
+    """
+
+    _sort_key = attrgetter("travel_start_time", "id")
+
+    def __init__(self) -> None:
+        self._buckets: dict[RouteKey, list[RideT]] = {}
+        self._keys: dict[UUID, RouteKey] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def upsert(self, ride: RideT) -> None:
+        self.remove(ride.id)
+        key = route_key(ride.start_location, ride.end_location, ride.travel_start_date)
+        bucket = self._buckets.setdefault(key, [])
+        bisect.insort(bucket, ride, key=self._sort_key)
+        self._keys[ride.id] = key
+
+    def remove(self, ride_id: UUID) -> bool:
+        key = self._keys.pop(ride_id, None)
+        if key is None:
+            return False
+        bucket = self._buckets[key]
+        bucket[:] = [r for r in bucket if r.id != ride_id]
+        if not bucket:
+            del self._buckets[key]
+        return True
+
+    def scan(
+        self,
+        start_location: str,
+        end_location: str,
+        window: DepartureWindow,
+        limit: int,
+        predicate: Callable[[RideT], bool] | None = None,
+    ) -> list[RideT]:
+        departs_from, departs_until = window
+        found: list[RideT] = []
+        day, last_day = window_dates(window)
+        while day <= last_day:
+            for ride in self._buckets.get(route_key(start_location, end_location, day), ()):
+                departs_at = departure(ride.travel_start_date, ride.travel_start_time)
+                if departs_at < departs_from:
+                    continue
+                if departs_at >= departs_until:
+                    break
+                if predicate is None or predicate(ride):
+                    found.append(ride)
+                    if len(found) >= limit:
+                        return found
+            day += timedelta(days=1)
+        return found
+
+    def prune(self, before: date) -> int:
+        stale = [key for key in self._buckets if key[2] < before]
+        removed = 0
+        for key in stale:
+            for ride in self._buckets.pop(key):
+                self._keys.pop(ride.id, None)
+                removed += 1
+        return removed
+
+
+class MatchingIndex:
+    """
+    Worker-resident view of every open offer and request.
+
+    Loaded once from the database, then kept current through `apply` with the
+    events published by `MatchingIndexBus`. Matching is a dictionary lookup per
+    day in the search window plus a scan of an already sorted bucket.
+    """
+
+    def __init__(self) -> None:
+        self.offers: RideBuckets[RideOfferDTO] = RideBuckets()
+        self.requests: RideBuckets[RideRequestDTO] = RideBuckets()
+        self.loaded = False
+        self._lock = threading.Lock()
+        self._pruned_on: date | None = None
+        # Changes that arrive while a snapshot is being read, replayed on top of it
+        self._pending: list[tuple[str, str, Any]] | None = None
+
+    async def load(self, offer_repo, request_repo) -> None:
+        pending: list[tuple[str, str, Any]] = []
+        with self._lock:
+            self._pending = pending
+        try:
+            offers = await offer_repo.get_active_offers()
+            requests = await request_repo.get_active_requests()
+        except BaseException:
+            with self._lock:
+                if self._pending is pending:
+                    self._pending = None
+            raise
+        with self._lock:
+            if self._pending is not pending:
+                # Invalidated or reloaded while reading: this snapshot may be missing changes
+                return
+            for offer in offers:
+                self.offers.upsert(RideOfferDTO.model_validate(offer))
+            for request in requests:
+                self.requests.upsert(RideRequestDTO.model_validate(request))
+            self._pending = None
+            for change in pending:
+                self._change(*change)
+            self.loaded = True
+        logger.info(
+            f"Matching index loaded: {len(self.offers)} offers, {len(self.requests)} requests, "
+            f"{len(pending)} changes replayed"
+        )
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.offers = RideBuckets()
+            self.requests = RideBuckets()
+            self.loaded = False
+            self._pending = None
+
+    def upsert_offer(self, offer: RideOfferDTO) -> None:
+        with self._lock:
+            self._change("offer", "upsert", offer)
+
+    def upsert_request(self, request: RideRequestDTO) -> None:
+        with self._lock:
+            self._change("request", "upsert", request)
+
+    def remove_offer(self, offer_id: UUID) -> None:
+        with self._lock:
+            self._change("offer", "remove", offer_id)
+
+    def remove_request(self, request_id: UUID) -> None:
+        with self._lock:
+            self._change("request", "remove", request_id)
+
+    def _change(self, kind: str, op: str, value: Any) -> None:
+        """Applies one change, or holds it back while a snapshot is loading. Called with the lock held."""
+        if self._pending is not None:
+            self._pending.append((kind, op, value))
+            return
+        buckets = self.offers if kind == "offer" else self.requests
+        if op == "upsert":
+            buckets.upsert(value)
+        else:
+            buckets.remove(value)
+
+    def match_requests(
+        self,
+        start_location: str,
+        end_location: str,
+        start_date: date,
+        limit: int = 10,
+        start_time: time_of_day | None = None,
+    ) -> list[RideRequestDTO]:
+        with self._lock:
+            self._prune()
+            return self.requests.scan(
+                start_location, end_location, request_window(start_date, start_time), limit
+            )
+
+    def match_offers(
+        self,
+        start_location: str,
+        end_location: str,
+        start_date: date,
+        seats_needed: int,
+        limit: int = 10,
+        start_time: time_of_day | None = None,
+    ) -> list[RideOfferDTO]:
+        with self._lock:
+            self._prune()
+            return self.offers.scan(
+                start_location,
+                end_location,
+                offer_window(start_date, start_time),
+                limit,
+                predicate=lambda offer: offer.free_seats >= seats_needed,
+            )
+
+    def apply(self, event: dict[str, Any]) -> None:
+        kind, op = event["kind"], event["op"]
+        if kind == "offer":
+            if op == "upsert":
+                self.upsert_offer(RideOfferDTO.model_validate(event["ride"]))
+            else:
+                self.remove_offer(UUID(event["id"]))
+        elif kind == "request":
+            if op == "upsert":
+                self.upsert_request(RideRequestDTO.model_validate(event["ride"]))
+            else:
+                self.remove_request(UUID(event["id"]))
+
+    def _prune(self) -> None:
+        today = datetime.now(timezone.utc).date()
+        if self._pruned_on != today:
+            self.offers.prune(today)
+            self.requests.prune(today)
+            self._pruned_on = today
+
+
+def upsert_event(kind: str, ride: RideOfferDTO | RideRequestDTO) -> dict[str, Any]:
+    return {"kind": kind, "op": "upsert", "ride": ride.model_dump(mode="json")}
+
+
+def remove_event(kind: str, ride_id: UUID | str) -> dict[str, Any]:
+    return {"kind": kind, "op": "remove", "id": str(ride_id)}
+
+
+class MatchingIndexBus:
+    """
+    Broadcasts index changes to every worker process through Redis pub/sub.
+
+    Each process runs one listener thread that applies the events to its own
+    `MatchingIndex`. If the subscription drops, the index is invalidated so
+    tasks fall back to SQL until it is reloaded.
+    """
+
+    def __init__(self, redis_url: str, channel: str) -> None:
+        self.channel = channel
+        self._client = redis.Redis.from_url(redis_url)
+        self._thread: threading.Thread | None = None
+
+    def publish(self, event: dict[str, Any]) -> None:
+        self._client.publish(self.channel, json.dumps(event))
+
+    def start(self, index: MatchingIndex) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        subscribed = threading.Event()
+        self._thread = threading.Thread(
+            target=self._listen,
+            args=(index, subscribed),
+            name="matching-index-bus",
+            daemon=True,
+        )
+        self._thread.start()
+        subscribed.wait(timeout=5)
+
+    def _listen(self, index: MatchingIndex, subscribed: threading.Event) -> None:
+        while True:
+            try:
+                pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                subscribed.set()
+                for message in pubsub.listen():
+                    try:
+                        index.apply(json.loads(message["data"]))
+                    except Exception as e:
+                        logger.warning(f"Dropping malformed matching index event: {e}")
+            except Exception as e:
+                logger.error(f"Matching index subscription lost: {e}")
+                index.invalidate()
+                subscribed.set()
+                time.sleep(1)
@@ -0,0 +1,70 @@
+import asyncio
+from typing import Any, Callable
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.infrastructure.repositories.outbox import OutboxRepository
+
+# Sends one task to the broker; raises when it cannot
+Publish = Callable[[str, list[Any]], None]
+
+
+class OutboxRelay:
+    """
+    Moves committed task_outbox rows to the Celery broker.
+
+    Each batch is claimed, published and deleted in one transaction. A message is
+    deleted only after the broker accepted it, so delivery is at least once: a
+    relay dying between the two sends that batch again, and tasks must tolerate
+    running twice. When the broker refuses a message, the batch stops there, the
+    failure is recorded on the row and the rest wait for the next pass.
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        publish: Publish,
+        batch_size: int = 100,
+    ) -> None:
+        self.session_maker = session_maker
+        self.publish = publish
+        self.batch_size = batch_size
+
+    async def relay_batch(self) -> tuple[int, bool]:
+        """Publishes up to one batch; returns how many went out and whether the broker failed."""
+        async with self.session_maker() as session:
+            repo = OutboxRepository(session)
+            messages = await repo.claim(self.batch_size)
+            sent: list[int] = []
+            failed = False
+            for message in messages:
+                try:
+                    self.publish(message.task, message.args)
+                except Exception as e:
+                    logger.bind(task=message.task, message_id=message.id).exception("Failed to publish outbox message")
+                    await repo.record_failure(message.id, f"{type(e).__name__}: {e}")
+                    failed = True
+                    break
+                sent.append(message.id)
+            await repo.delete(sent)
+            await session.commit()
+        return len(sent), failed
+
+    async def run(self, poll_interval: float, stop: asyncio.Event | None = None) -> None:
+        """Relays until `stop` is set: straight on while batches come back full, else every poll_interval."""
+        stop = stop or asyncio.Event()
+        while not stop.is_set():
+            try:
+                sent, failed = await self.relay_batch()
+            except Exception:
+                # Database unavailable; the messages are safe in the outbox until it is back
+                logger.exception("Outbox relay pass failed")
+                sent, failed = 0, True
+            if sent:
+                logger.bind(sent=sent).debug("Relayed outbox messages")
+            if failed or sent < self.batch_size:
+                try:
+                    await asyncio.wait_for(stop.wait(), poll_interval)
+                except TimeoutError:
+                    pass
@@ -1,17 +1,30 @@
+import hashlib
 import uuid
-from typing import Sequence, List
+from datetime import date, timedelta
+from typing import AsyncIterator, Container, Sequence, List
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.domain.models.ride import RideOffer, RideRequest, CarPhoto
 from app.representations.dtos.ride import (
-    CreateRideOfferDTO, CreateRideRequestDTO, RideOfferDTO, RideRequestDTO, CarPhotoDTO, UpdateRideRequestDTO, UpdateRideOfferDTO,
-    RideOfferSearchDTO, RideRequestSearchDTO
+    BaseRideDTO, CreateRideOfferDTO, CreateRideRequestDTO, RideOfferDTO, RideRequestDTO, CarPhotoDTO, UpdateRideRequestDTO, UpdateRideOfferDTO,
+    RideOfferSearchDTO, RideRequestSearchDTO, BulkRideOfferItemDTO, BulkRideRequestItemDTO, RideBookingDTO,
+    RideOfferNearbySearchDTO, RideRequestNearbySearchDTO, CarPhotoListAdapter, list_adapter
 )
 from app.infrastructure.repositories.ride import (
     RideOfferRepository, RideRequestRepository, CarPhotoRepository
 )
+from app.infrastructure.repositories.location import LocationRepository
+from app.infrastructure.repositories.outbox import OutboxRepository
+from app.services.locations import LocationResolver, ResolvedLocation
 from app.domain.interfaces.media_service import IMediaService
-from app.utils.normalization import normalize_location
+from app.domain.interfaces.cache import ICache
+from app.infrastructure.connections.database.replica import ReplicaPins
+from app.utils.departure import OFFER_WINDOW_DAYS, REQUEST_WINDOW_DAYS
+from app.utils.pagination import decode_cursor
+
+
+# (start_location_id, end_location_id, travel_start_date)
+Route = tuple[int, int, date]
 
 
 class RideService:
@@ -21,47 +34,159 @@ class RideService:
         offer_repo: RideOfferRepository,
         request_repo: RideRequestRepository,
         photo_repo: CarPhotoRepository,
-        media_service: IMediaService
+        media_service: IMediaService,
+        search_cache: ICache | None = None,
+        replica_pins: ReplicaPins | None = None,
+        location_resolver: LocationResolver | None = None,
+        outbox: OutboxRepository | None = None
     ):
         self.session = session
         self.offer_repo = offer_repo
         self.request_repo = request_repo
         self.photo_repo = photo_repo
         self.media_service = media_service
+        self.search_cache = search_cache
+        self.replica_pins = replica_pins
+        self.locations = location_resolver or LocationResolver(LocationRepository(session))
+        # Celery tasks are queued in the outbox, inside each write's own transaction
+        self.outbox = outbox or OutboxRepository(session)
+
+    # --- Replica routing ---
+
+    @property
+    def _has_replica(self) -> bool:
+        return self.replica_pins is not None
+
+    async def _reads_from_replica(self, *writers: uuid.UUID | str) -> bool:
+        """Replica, unless one of `writers` (users, or search namespaces) wrote recently and the replica may lag behind."""
+        if self.replica_pins is None:
+            return False
+        return not await self.replica_pins.is_pinned(*writers)
+
+    async def _pin_to_primary(self, *writers: uuid.UUID) -> None:
+        if self.replica_pins is not None:
+            await self.replica_pins.pin(*writers)
+
+    # --- Listing versions ---
+
+    @staticmethod
+    def _listing_version(version: str, fields: tuple[str, ...] | None) -> str:
+        """The ETag version of a listing: its rows' version, and which fields it was rendered with."""
+        if fields is None:
+            return version
+        return f"{version}-{hashlib.md5(','.join(fields).encode()).hexdigest()[:8]}"
+
+    # --- Search cache ---
+
+    @staticmethod
+    def _search_namespace(kind: str, start_location_id: int, end_location_id: int, start_date: date) -> str:
+        return f"{kind}:{start_location_id}|{end_location_id}|{start_date.isoformat()}"
+
+    @staticmethod
+    def _route(ride: RideOffer | RideRequest) -> Route:
+        return ride.start_location_id, ride.end_location_id, ride.travel_start_date
+
+    async def _invalidate_searches(self, kind: str, *routes: Route) -> None:
+        """
+        Drops cached searches whose date window contains the routes' travel dates.
+        The namespaces are pinned first: until the replica has caught up, their
+        searches read the primary, so a lagging replica read is not cached again.
+        """
+        if not self.search_cache:
+            return
+        window = OFFER_WINDOW_DAYS if kind == "offers" else REQUEST_WINDOW_DAYS
+        namespaces = {
+            self._search_namespace(kind, start_id, end_id, travel_date - timedelta(days=days))
+            for start_id, end_id, travel_date in routes
+            for days in range(window + 1)
+        }
+        if self.replica_pins is not None:
+            await self.replica_pins.pin(*namespaces)
+        await self.search_cache.invalidate(*namespaces)
+
+    async def _cache_search(self, namespace: str, key: str, value: list, from_replica: bool) -> None:
+        # A route written to while the replica read ran may have been read stale; leave it uncached
+        if from_replica and await self.replica_pins.is_pinned(namespace):
+            return
+        await self.search_cache.set(namespace, key, value)
+
+    # --- Locations ---
+
+    async def _resolve_route(self, start_location: str, end_location: str) -> tuple[ResolvedLocation, ResolvedLocation]:
+        return await self.locations.get_or_create(start_location), await self.locations.get_or_create(end_location)
+
+    async def _find_route(self, start_location: str, end_location: str) -> tuple[ResolvedLocation, ResolvedLocation] | None:
+        """None when either end is a place no ride has used, so nothing can match."""
+        start = await self.locations.find(start_location)
+        end = await self.locations.find(end_location) if start else None
+        return (start, end) if start and end else None
+
+    async def _resolve_items(self, items: Sequence[BaseRideDTO]) -> list[Route]:
+        """Resolves every item's route in place, returning (start id, end id, travel date) per item."""
+        routes = []
+        for item in items:
+            start, end = await self._resolve_route(item.start_location, item.end_location)
+            item.start_location, item.end_location = start.name, end.name
+            routes.append((start.id, end.id, item.travel_start_date))
+        return routes
 
     # --- Ride Offers ---
 
     async def create_ride_offer(self, driver_id: uuid.UUID, dto: CreateRideOfferDTO) -> RideOfferDTO:
-        # Normalize locations
-        dto.start_location = normalize_location(dto.start_location)
-        dto.end_location = normalize_location(dto.end_location)
-        
-        offer = await self.offer_repo.create(driver_id, dto)
+        # Canonical names for display, ids for search
+        start, end = await self._resolve_route(dto.start_location, dto.end_location)
+        dto.start_location, dto.end_location = start.name, end.name
+
+        offer = await self.offer_repo.create(driver_id, dto, start.id, end.id)
+        # Matching runs once this commits; the relay hands it to Celery
+        await self.outbox.add("app.services.tasks.process_ride_offer", str(offer.id))
         await self.session.commit()
+        self.locations.committed()
+        await self._pin_to_primary(driver_id)
         await self.session.refresh(offer)
+        await self._invalidate_searches("offers", self._route(offer))
         
-        # Trigger Celery Task
-        print(f"Attempting to trigger process_ride_offer for {offer.id}")
-        try:
-            from app.services.tasks import process_ride_offer
-            print(f"Imported process_ride_offer: {process_ride_offer}")
-            result = process_ride_offer.delay(str(offer.id))
-            print(f"Task triggered. Result ID: {result.id}")
-        except Exception as e:
-            # Log error but don't fail request
-            print(f"Failed to trigger task: {e}")
-            import traceback
-            traceback.print_exc()
-
         return RideOfferDTO.model_validate(offer)
 
-    async def get_ride_offers(self) -> List[RideOfferDTO]:
-        offers = await self.offer_repo.get_all()
-        return [RideOfferDTO.model_validate(o) for o in offers]
+    async def create_ride_offers_bulk(self, items: Sequence[BulkRideOfferItemDTO]) -> List[uuid.UUID]:
+        routes = await self._resolve_items(items)
+        offer_ids = await self.offer_repo.create_many(items, [(start_id, end_id) for start_id, end_id, _ in routes])
+        # One task for the whole batch, it groups the offers by route before matching
+        await self.outbox.add("app.services.tasks.process_ride_offers", [str(i) for i in offer_ids])
+        await self.session.commit()
+        self.locations.committed()
+        await self._pin_to_primary(*{item.driver_id for item in items})
+        await self._invalidate_searches("offers", *routes)
+
+        return offer_ids
+
+    async def stream_ride_offers(self, include_inactive: bool = False) -> AsyncIterator[RideOfferDTO]:
+        async for offer in self.offer_repo.stream_all(include_inactive=include_inactive, use_replica=self._has_replica):
+            yield RideOfferDTO.model_validate(offer)
 
-    async def get_driver_offers(self, driver_id: uuid.UUID) -> List[RideOfferDTO]:
-        offers = await self.offer_repo.get_by_driver(driver_id)
-        return [RideOfferDTO.model_validate(o) for o in offers]
+    async def get_driver_offers(self, driver_id: uuid.UUID, fields: tuple[str, ...] | None = None) -> List[RideOfferDTO]:
+        offers = await self.offer_repo.get_by_driver(
+            driver_id, fields=fields, use_replica=await self._reads_from_replica(driver_id)
+        )
+        return list_adapter(RideOfferDTO, fields).validate_python(offers)
+
+    async def get_driver_offers_if_changed(
+        self, driver_id: uuid.UUID, known_versions: Container[str], fields: tuple[str, ...] | None = None
+    ) -> tuple[str, List[RideOfferDTO] | None]:
+        """
+        The version of the driver's listing, and the listing itself unless the
+        caller already holds that version. The version is read first, so a write
+        landing in between leaves the caller with a newer listing under an older
+        version, and the next call simply fetches it again.
+        """
+        use_replica = await self._reads_from_replica(driver_id)
+        version = self._listing_version(
+            await self.offer_repo.get_driver_version(driver_id, use_replica=use_replica), fields
+        )
+        if version in known_versions:
+            return version, None
+        offers = await self.offer_repo.get_by_driver(driver_id, fields=fields, use_replica=use_replica)
+        return version, list_adapter(RideOfferDTO, fields).validate_python(offers)
     
     async def delete_ride_offer(self, offer_id: uuid.UUID, driver_id: uuid.UUID) -> None:
         offer = await self.offer_repo.get_by_id(offer_id)
@@ -70,54 +195,131 @@ class RideService:
         if offer.driver_id != driver_id:
             raise ValueError("Not authorized to delete this offer")
         await self.offer_repo.delete(offer)
+        await self.outbox.add("app.services.tasks.evict_ride_offer", str(offer_id))
         await self.session.commit()
+        await self._pin_to_primary(driver_id)
+        await self._invalidate_searches("offers", self._route(offer))
+
+    async def reserve_seats(self, offer_id: uuid.UUID, passenger_id: uuid.UUID, seats: int) -> RideBookingDTO:
+        booking = await self.offer_repo.reserve_seats(offer_id, passenger_id, seats)
+        if booking is None:
+            await self.session.rollback()
+            raise ValueError("Ride offer not found or not enough free seats")
+        await self.outbox.add("app.services.tasks.refresh_ride_offer", str(offer_id))
+        # Commit straight away: the offer row stays locked for every other taker until then
+        await self.session.commit()
+        await self._pin_to_primary(passenger_id, booking.driver_id)
+        await self._invalidate_searches("offers", self._route(booking))
+
+        return RideBookingDTO(
+            id=booking.id,
+            offer_id=booking.offer_id,
+            passenger_id=booking.passenger_id,
+            seats=booking.seats,
+            free_seats=booking.free_seats,
+        )
+
+    async def search_ride_offers(self, dto: RideOfferSearchDTO, fields: tuple[str, ...] | None = None) -> List[RideOfferDTO]:
+        """`fields` narrows the select and the returned rows to those fields, plus the cursor fields."""
+        adapter = list_adapter(RideOfferDTO, fields)
+        after = decode_cursor(dto.cursor) if dto.cursor else None
+        route = await self._find_route(dto.start_location, dto.end_location)
+        if route is None:
+            return []
+        start, end = route
+
+        use_replica = self._has_replica
+        if self.search_cache:
+            namespace = self._search_namespace("offers", start.id, end.id, dto.start_time)
+            key = f"{dto.seats_needed}:{dto.start_time_time}:{dto.limit}:{dto.offset}:{dto.cursor}:{','.join(fields or ())}"
+            cached = await self.search_cache.get(namespace, key)
+            if cached is not None:
+                return adapter.validate_python(cached)
+            use_replica = await self._reads_from_replica(namespace)
 
-    async def search_ride_offers(self, dto: RideOfferSearchDTO) -> List[RideOfferDTO]:
-        start = normalize_location(dto.start_location) if dto.start_location else None
-        end = normalize_location(dto.end_location) if dto.end_location else None
-        
         offers = await self.offer_repo.search_offers(
-            start_location=start,
-            end_location=end,
+            start_location_id=start.id,
+            end_location_id=end.id,
             seats_needed=dto.seats_needed,
             start_date=dto.start_time,
             limit=dto.limit,
-            offset=dto.offset
+            offset=dto.offset,
+            after=after,
+            start_time=dto.start_time_time,
+            fields=fields,
+            use_replica=use_replica
         )
-        return [RideOfferDTO.model_validate(o) for o in offers]
+        result = adapter.validate_python(offers)
+        if self.search_cache:
+            await self._cache_search(namespace, key, adapter.dump_python(result, mode="json"), use_replica)
+        return result
+
+    async def search_ride_offers_nearby(self, dto: RideOfferNearbySearchDTO, fields: tuple[str, ...] | None = None) -> List[RideOfferDTO]:
+        # Not cached: coordinates rarely repeat exactly, and rides have no cell-keyed invalidation
+        offers = await self.offer_repo.search_offers_nearby(
+            start=(dto.start_lat, dto.start_lon),
+            end=(dto.end_lat, dto.end_lon),
+            radius_km=dto.radius_km,
+            seats_needed=dto.seats_needed,
+            start_date=dto.start_time,
+            limit=dto.limit,
+            offset=dto.offset,
+            after=decode_cursor(dto.cursor) if dto.cursor else None,
+            start_time=dto.start_time_time,
+            fields=fields,
+            use_replica=self._has_replica
+        )
+        return list_adapter(RideOfferDTO, fields).validate_python(offers)
 
     # --- Ride Requests ---
 
     async def create_ride_request(self, passenger_id: uuid.UUID, dto: CreateRideRequestDTO) -> RideRequestDTO:
-        # Normalize locations
-        dto.start_location = normalize_location(dto.start_location)
-        dto.end_location = normalize_location(dto.end_location)
+        start, end = await self._resolve_route(dto.start_location, dto.end_location)
+        dto.start_location, dto.end_location = start.name, end.name
 
-        request = await self.request_repo.create(passenger_id, dto)
+        request = await self.request_repo.create(passenger_id, dto, start.id, end.id)
+        await self.outbox.add("app.services.tasks.process_ride_request", str(request.id))
         await self.session.commit()
+        self.locations.committed()
+        await self._pin_to_primary(passenger_id)
         await self.session.refresh(request)
-
-        # Trigger Celery Task
-        print(f"Attempting to trigger process_ride_request for {request.id}")
-        try:
-            from app.services.tasks import process_ride_request
-            print(f"Imported process_ride_request: {process_ride_request}")
-            result = process_ride_request.delay(str(request.id))
-            print(f"Task triggered. Result ID: {result.id}")
-        except Exception as e:
-            print(f"Failed to trigger task: {e}")
-            import traceback
-            traceback.print_exc()
+        await self._invalidate_searches("requests", self._route(request))
 
         return RideRequestDTO.model_validate(request)
 
-    async def get_ride_requests(self) -> List[RideRequestDTO]:
-        requests = await self.request_repo.get_all()
-        return [RideRequestDTO.model_validate(r) for r in requests]
+    async def create_ride_requests_bulk(self, items: Sequence[BulkRideRequestItemDTO]) -> List[uuid.UUID]:
+        routes = await self._resolve_items(items)
+        request_ids = await self.request_repo.create_many(items, [(start_id, end_id) for start_id, end_id, _ in routes])
+        await self.outbox.add("app.services.tasks.process_ride_requests", [str(i) for i in request_ids])
+        await self.session.commit()
+        self.locations.committed()
+        await self._pin_to_primary(*{item.passenger_id for item in items})
+        await self._invalidate_searches("requests", *routes)
+
+        return request_ids
+
+    async def stream_ride_requests(self, include_inactive: bool = False) -> AsyncIterator[RideRequestDTO]:
+        async for request in self.request_repo.stream_all(include_inactive=include_inactive, use_replica=self._has_replica):
+            yield RideRequestDTO.model_validate(request)
     
-    async def get_passenger_requests(self, passenger_id: uuid.UUID) -> List[RideRequestDTO]:
-        requests = await self.request_repo.get_by_passenger(passenger_id)
-        return [RideRequestDTO.model_validate(r) for r in requests]
+    async def get_passenger_requests(self, passenger_id: uuid.UUID, fields: tuple[str, ...] | None = None) -> List[RideRequestDTO]:
+        requests = await self.request_repo.get_by_passenger(
+            passenger_id, fields=fields, use_replica=await self._reads_from_replica(passenger_id)
+        )
+        return list_adapter(RideRequestDTO, fields).validate_python(requests)
+
+    async def get_passenger_requests_if_changed(
+        self, passenger_id: uuid.UUID, known_versions: Container[str], fields: tuple[str, ...] | None = None
+    ) -> tuple[str, List[RideRequestDTO] | None]:
+        """Like get_driver_offers_if_changed, for a passenger's requests."""
+        use_replica = await self._reads_from_replica(passenger_id)
+        version = self._listing_version(
+            await self.request_repo.get_passenger_version(passenger_id, use_replica=use_replica), fields
+        )
+        if version in known_versions:
+            return version, None
+        requests = await self.request_repo.get_by_passenger(passenger_id, fields=fields, use_replica=use_replica)
+        return version, list_adapter(RideRequestDTO, fields).validate_python(requests)
 
     async def delete_ride_request(self, request_id: uuid.UUID, passenger_id: uuid.UUID) -> None:
         request = await self.request_repo.get_by_id(request_id)
@@ -126,20 +328,58 @@ class RideService:
         if request.passenger_id != passenger_id:
             raise ValueError("Not authorized to delete this request")
         await self.request_repo.delete(request)
+        await self.outbox.add("app.services.tasks.evict_ride_request", str(request_id))
         await self.session.commit()
+        await self._pin_to_primary(passenger_id)
+        await self._invalidate_searches("requests", self._route(request))
+
+    async def search_ride_requests(self, dto: RideRequestSearchDTO, fields: tuple[str, ...] | None = None) -> List[RideRequestDTO]:
+        adapter = list_adapter(RideRequestDTO, fields)
+        after = decode_cursor(dto.cursor) if dto.cursor else None
+        route = await self._find_route(dto.start_location, dto.end_location)
+        if route is None:
+            return []
+        start, end = route
 
-    async def search_ride_requests(self, dto: RideRequestSearchDTO) -> List[RideRequestDTO]:
-        start = normalize_location(dto.start_location) if dto.start_location else None
-        end = normalize_location(dto.end_location) if dto.end_location else None
+        use_replica = self._has_replica
+        if self.search_cache:
+            namespace = self._search_namespace("requests", start.id, end.id, dto.start_time)
+            key = f"{dto.start_time_time}:{dto.limit}:{dto.offset}:{dto.cursor}:{','.join(fields or ())}"
+            cached = await self.search_cache.get(namespace, key)
+            if cached is not None:
+                return adapter.validate_python(cached)
+            use_replica = await self._reads_from_replica(namespace)
 
         requests = await self.request_repo.search_requests(
-            start_location=start,
-            end_location=end,
+            start_location_id=start.id,
+            end_location_id=end.id,
             start_date=dto.start_time,
             limit=dto.limit,
-            offset=dto.offset
+            offset=dto.offset,
+            after=after,
+            start_time=dto.start_time_time,
+            fields=fields,
+            use_replica=use_replica
         )
-        return [RideRequestDTO.model_validate(r) for r in requests]
+        result = adapter.validate_python(requests)
+        if self.search_cache:
+            await self._cache_search(namespace, key, adapter.dump_python(result, mode="json"), use_replica)
+        return result
+
+    async def search_ride_requests_nearby(self, dto: RideRequestNearbySearchDTO, fields: tuple[str, ...] | None = None) -> List[RideRequestDTO]:
+        requests = await self.request_repo.search_requests_nearby(
+            start=(dto.start_lat, dto.start_lon),
+            end=(dto.end_lat, dto.end_lon),
+            radius_km=dto.radius_km,
+            start_date=dto.start_time,
+            limit=dto.limit,
+            offset=dto.offset,
+            after=decode_cursor(dto.cursor) if dto.cursor else None,
+            start_time=dto.start_time_time,
+            fields=fields,
+            use_replica=self._has_replica
+        )
+        return list_adapter(RideRequestDTO, fields).validate_python(requests)
 
     # --- Car Photos ---
 
@@ -157,12 +397,26 @@ class RideService:
         # Save to DB
         photo = await self.photo_repo.create(driver_id, url)
         await self.session.commit()
+        await self._pin_to_primary(driver_id)
         await self.session.refresh(photo)
         return CarPhotoDTO.model_validate(photo)
 
     async def get_driver_photos(self, driver_id: uuid.UUID) -> List[CarPhotoDTO]:
-        photos = await self.photo_repo.get_by_driver(driver_id)
-        return [CarPhotoDTO.model_validate(p) for p in photos]
+        photos = await self.photo_repo.get_by_driver(
+            driver_id, use_replica=await self._reads_from_replica(driver_id)
+        )
+        return CarPhotoListAdapter.validate_python(photos)
+
+    async def get_driver_photos_if_changed(
+        self, driver_id: uuid.UUID, known_versions: Container[str]
+    ) -> tuple[str, List[CarPhotoDTO] | None]:
+        """Like get_driver_offers_if_changed, for a driver's car photos."""
+        use_replica = await self._reads_from_replica(driver_id)
+        version = await self.photo_repo.get_driver_version(driver_id, use_replica=use_replica)
+        if version in known_versions:
+            return version, None
+        photos = await self.photo_repo.get_by_driver(driver_id, use_replica=use_replica)
+        return version, CarPhotoListAdapter.validate_python(photos)
     
     async def delete_car_photo(self, photo_id: uuid.UUID, driver_id: uuid.UUID) -> None:
         photo = await self.photo_repo.get_by_id(photo_id)
@@ -175,3 +429,4 @@ class RideService:
         # For now, just remove from DB.
         await self.photo_repo.delete(photo)
         await self.session.commit()
+        await self._pin_to_primary(driver_id)
@@ -1,17 +1,37 @@
-import asyncio
-import os
-import httpx
 from uuid import UUID
 from sqlalchemy import select
 from app.core.celery_app import celery_app
+from app.core.worker_runtime import worker_runtime
+from app.core.logging import log_timing
 # from app.infrastructure.connections.database import get_session_context # This doesn't exist
 # We need the session maker
-from app.infrastructure.connections.database.session import async_session_maker
+from app.infrastructure.connections.database.session import async_session_maker, engine
+from app.infrastructure.connections.database.partitions import maintain_partitions
 from app.services.ride_service import RideService
 from app.infrastructure.repositories.ride import (
     RideOfferRepository, RideRequestRepository, CarPhotoRepository
 )
 from app.domain.interfaces.media_service import IMediaService
+from app.configurations.matching import matching_settings
+from app.configurations.redis import redis_settings
+from app.configurations.notifications import notification_settings
+from app.configurations.partitions import partition_settings
+from app.infrastructure.services.webhook import get_webhook_dispatcher
+from app.services.matching import MatchingIndex, MatchingIndexBus, upsert_event, remove_event
+from app.services.coalescing import RouteCoalescer
+from app.services.feed import get_feed_publisher, route_channel, user_channel
+from app.services.user_cache import get_telegram_user_cache
+from app.services.user_service import telegram_user_dto
+from app.utils.departure import local_today
+from app.domain.models.ride import RideOffer, RideRequest, CarPhoto
+from app.domain.models.user import User, TelegramUser
+from app.representations.dtos.ride import (
+    RideOfferDTO, RideRequestDTO, RideOfferSearchDTO, RideRequestSearchDTO
+)
+from app.representations.dtos.user import TelegramUserDTO
+import redis
+from celery.signals import worker_process_init
+from loguru import logger
 
 # Mock Media Service for Worker (or use real one if env var present)
 class MockMediaService(IMediaService):
@@ -43,281 +63,583 @@ async def get_service():
     service.telegram_user = telegram_user_repo # Monkey patch for local access in this script logic
     
     return service, session
-    
-    return RideService(session, offer_repo, request_repo, photo_repo, media_service), session
-
-def run_async(coro):
-    """Helper to run async code in sync celery task"""
-    loop = asyncio.get_event_loop()
-    if loop.is_running():
-         # Should not happen in worker process standard setup
-         return loop.create_task(coro)
+
+# One index per worker process, kept in sync across processes by the bus
+matching_index = MatchingIndex()
+_index_bus: MatchingIndexBus | None = None
+
+
+def get_index_bus() -> MatchingIndexBus:
+    global _index_bus
+    if _index_bus is None:
+        _index_bus = MatchingIndexBus(redis_settings.REDIS_URL, matching_settings.MATCHING_INDEX_CHANNEL)
+    return _index_bus
+
+
+_coalescer: RouteCoalescer | None = None
+
+# Matches sent per ride, same as the default search page
+MATCH_LIMIT = 10
+
+# Retries of a group matching pass that failed after its rides were drained
+GROUP_MAX_RETRIES = 3
+
+
+def get_coalescer() -> RouteCoalescer | None:
+    """Returns the route coalescer, or None when matching runs per ride."""
+    global _coalescer
+    if matching_settings.MATCHING_COALESCE_WINDOW <= 0:
+        return None
+    if _coalescer is None:
+        _coalescer = RouteCoalescer(
+            redis.Redis.from_url(redis_settings.REDIS_URL),
+            matching_settings.MATCHING_COALESCE_WINDOW,
+        )
+    return _coalescer
+
+
+def publish_index_event(event: dict) -> None:
+    try:
+        get_index_bus().publish(event)
+    except Exception as e:
+        logger.error(f"Failed to publish matching index event: {e}")
+
+
+def publish_feed_events(events: list[tuple[str, dict]]) -> None:
+    """Pushes (channel, event) pairs to the live feed; best effort, like the webhooks."""
+    publisher = get_feed_publisher()
+    if publisher is None or not events:
+        return
+    try:
+        for channel, event in events:
+            publisher.publish(channel, event)
+    except Exception as e:
+        logger.error(f"Failed to publish feed events: {e}")
+
+
+async def ensure_matching_index(service) -> MatchingIndex | None:
+    """Returns the loaded index, or None when matching should fall back to SQL."""
+    if not matching_settings.MATCHING_INDEX_ENABLED:
+        return None
+    if not matching_index.loaded:
+        try:
+            # Subscribe before loading so no change committed during the load is missed
+            get_index_bus().start(matching_index)
+            await matching_index.load(service.offer_repo, service.request_repo)
+        except Exception as e:
+            logger.error(f"Matching index unavailable, falling back to SQL: {e}")
+            return None
+    # A load cut short by a lost subscription leaves the index unloaded
+    return matching_index if matching_index.loaded else None
+
+
+@worker_process_init.connect
+def warm_matching_index(**kwargs):
+    async def _load():
+        service, session = await get_service()
+        try:
+            await ensure_matching_index(service)
+        finally:
+            await session.close()
+
+    worker_runtime.run(_load())
+
+
+def _seats_needed(request: RideRequest) -> int:
+    if request.seat_amount and request.seat_amount.isdigit():
+        return int(request.seat_amount)
+    return 1
+
+
+async def _load_telegram_users(session, user_ids) -> dict:
+    """Telegram accounts by user id, from the user cache first and one query for the rest."""
+    cache = get_telegram_user_cache()
+    if cache is None:
+        found, missing = {}, list(set(user_ids))
     else:
-         return loop.run_until_complete(coro)
+        found, missing = await cache.get_many_by_user_id(user_ids)
+    if missing:
+        result = await session.execute(select(TelegramUser).where(TelegramUser.user_id.in_(missing)))
+        loaded = {t.user_id: telegram_user_dto(t) for t in result.scalars().all()}
+        for user_id in missing:
+            found[user_id] = loaded.get(user_id)
+            if cache is not None:
+                await cache.put(found[user_id], user_id=user_id)
+    return {user_id: account for user_id, account in found.items() if account is not None}
 
-@celery_app.task
-def process_ride_offer(offer_id: str):
+
+def _chat_id(telegram_user: TelegramUserDTO | None) -> int | None:
+    if not telegram_user:
+        return None
+    return telegram_user.chat_id if telegram_user.chat_id else telegram_user.telegram_id
+
+
+async def _load_driver_details(session, driver_ids) -> dict:
+    """Phone, username and car photos per driver, fetched in one query each."""
+    driver_ids = list(set(driver_ids))
+
+    user_res = await session.execute(select(User).where(User.id.in_(driver_ids)))
+    users_map = {u.id: u for u in user_res.scalars().all()}
+
+    tg_map = await _load_telegram_users(session, driver_ids)
+
+    photo_res = await session.execute(select(CarPhoto).where(CarPhoto.driver_id.in_(driver_ids)))
+    photos_map = {}
+    for p in photo_res.scalars().all():
+        photos_map.setdefault(p.driver_id, []).append(p.url)
+
+    details = {}
+    for d_id in driver_ids:
+        driver_user_model = users_map.get(d_id)
+        driver_tg = tg_map.get(d_id)
+        details[d_id] = {
+            "driver_phone": driver_user_model.phone_number if driver_user_model else None,
+            "driver_username": driver_tg.username if driver_tg else None,
+            "car_photos": photos_map.get(d_id, []),
+        }
+    return details
+
+
+def _latest_per_author(rides, author: str) -> list:
+    """Collapses reposts: one ride per author and departure time, the most recent wins."""
+    latest = {}
+    for ride in rides:
+        latest[(getattr(ride, author), ride.travel_start_time)] = ride
+    return sorted(latest.values(), key=lambda r: (r.travel_start_time, r.id))
+
+
+def _backoff(attempt: int) -> int:
+    return min(5 * 2 ** attempt, 300)
+
+
+async def _send_webhooks(webhook_url: str, payloads: list[dict], attempt: int = 0) -> None:
+    """Sends the payloads; those that failed or got a 429/5xx are resent later by resend_webhooks."""
+    with log_timing("Webhooks sent", webhooks=len(payloads), attempt=attempt):
+        results = await get_webhook_dispatcher().post_many(webhook_url, payloads)
+    failed = []
+    for payload, res in zip(payloads, results):
+        if isinstance(res, Exception):
+            logger.bind(error=repr(res)).error("Webhook failed")
+            failed.append(payload)
+        elif res.status_code == 429 or res.is_server_error:
+            logger.bind(status=res.status_code).warning("Webhook failed")
+            failed.append(payload)
+        elif res.is_error:
+            logger.bind(status=res.status_code).warning("Webhook rejected")
+    if not failed:
+        return
+    if attempt >= notification_settings.WEBHOOK_MAX_RETRIES:
+        logger.bind(webhooks=len(failed)).error("Webhooks dropped after retries")
+        return
+    resend_webhooks.apply_async((webhook_url, failed, attempt + 1), countdown=_backoff(attempt))
+
+
+async def _match_offers(service, session, offers: list[RideOffer]) -> None:
     """
-    Search for requests matching this offer and notify bot.
+    One matching pass for offers sharing a route and date: a single request search
+    and a single driver lookup, then a new_offer_found webhook per matched passenger
+    and offer (one new_offers_found per passenger with WEBHOOK_GROUPED_OFFERS).
+    """
+    offers = _latest_per_author(offers, "driver_id")
+    first = offers[0]
+    index = await ensure_matching_index(service)
+
+    dt = RideRequestSearchDTO(
+        start_location=first.start_location,
+        end_location=first.end_location,
+        start_time=first.travel_start_date,
+        limit=MATCH_LIMIT,
+        offset=0
+    )
+    if index:
+        matches = index.match_requests(dt.start_location, dt.end_location, dt.start_time, limit=dt.limit)
+    else:
+        matches = await service.search_ride_requests(dt)
+    logger.bind(
+        route=f"{first.start_location}->{first.end_location}", date=str(first.travel_start_date),
+        matches=len(matches), offers=len(offers), indexed=bool(index),
+    ).info("Requests matched")
+
+    webhook_url = notification_settings.BOT_WEBHOOK_URL
+    if not matches or not (webhook_url or get_feed_publisher()):
+        return
+
+    details = await _load_driver_details(session, [o.driver_id for o in offers])
+    # The offer part is identical for every passenger, build it once
+    offer_payloads = [
+        {**RideOfferDTO.model_validate(o).model_dump(mode='json'), **details[o.driver_id]}
+        for o in offers
+    ]
+
+    # Batch fetch passenger telegram users
+    telegram_users = await _load_telegram_users(session, [m.passenger_id for m in matches])
+    passenger_map = {user_id: _chat_id(tu) for user_id, tu in telegram_users.items()}
+
+    payloads = []
+    for match_request in matches:
+        passenger_chat_id = passenger_map.get(match_request.passenger_id)
+        if not passenger_chat_id and webhook_url:
+            logger.bind(passenger_id=str(match_request.passenger_id)).warning("No Telegram user for passenger")
+
+        payload = {
+            "request_id": str(match_request.id),
+            "passenger_id": str(match_request.passenger_id),
+            "passenger_chat_id": passenger_chat_id,
+        }
+        # The bot handles new_offer_found; the grouped payload is opt-in and versioned
+        if notification_settings.WEBHOOK_GROUPED_OFFERS and len(offer_payloads) > 1:
+            payloads.append({**payload, "type": "new_offers_found", "version": 2, "offers": offer_payloads})
+        else:
+            payloads.extend({**payload, "type": "new_offer_found", "offer": o} for o in offer_payloads)
+
+    # Every matched passenger gets the feed event; the bot can only reach those with a Telegram chat
+    publish_feed_events([(user_channel(p["passenger_id"]), p) for p in payloads])
+    deliverable = [p for p in payloads if p["passenger_chat_id"]]
+    if webhook_url and deliverable:
+        await _send_webhooks(webhook_url, deliverable)
+
+
+async def _match_requests(service, session, requests: list[RideRequest]) -> None:
+    """
+    One matching pass for requests sharing a route and date: an offer search per
+    distinct time window and seat count, one driver lookup, then one webhook per
+    requesting passenger.
+    """
+    requests = _latest_per_author(requests, "passenger_id")
+    first = requests[0]
+    index = await ensure_matching_index(service)
+
+    # Each request searches its own time window, which may run past midnight, so
+    # a late request is not crowded out by the day's earlier offers
+    searches: dict[tuple, list] = {}
+    for req in requests:
+        key = (req.travel_start_time, _seats_needed(req))
+        if key in searches:
+            continue
+        dt = RideOfferSearchDTO(
+            start_location=req.start_location,
+            end_location=req.end_location,
+            seats_needed=key[1],
+            start_time=req.travel_start_date,
+            start_time_time=req.travel_start_time,
+            limit=MATCH_LIMIT
+        )
+        if index:
+            searches[key] = index.match_offers(
+                dt.start_location, dt.end_location, dt.start_time, dt.seats_needed,
+                limit=dt.limit, start_time=dt.start_time_time
+            )
+        else:
+            searches[key] = await service.search_ride_offers(dt)
+    candidates = list({m.id: m for found in searches.values() for m in found}.values())
+    logger.bind(
+        route=f"{first.start_location}->{first.end_location}", date=str(first.travel_start_date),
+        candidates=len(candidates), requests=len(requests), searches=len(searches), indexed=bool(index),
+    ).info("Offers matched")
+
+    webhook_url = notification_settings.BOT_WEBHOOK_URL
+    if not candidates or not (webhook_url or get_feed_publisher()):
+        return
+
+    details = await _load_driver_details(session, [m.driver_id for m in candidates])
+    enriched = {
+        m.id: {**m.model_dump(mode='json'), **details[m.driver_id]}
+        for m in candidates
+    }
+
+    tg_map = await _load_telegram_users(session, [r.passenger_id for r in requests])
+
+    payloads = []
+    for req in requests:
+        matches = searches[(req.travel_start_time, _seats_needed(req))]
+        if not matches:
+            continue
+        passenger_tg = tg_map.get(req.passenger_id)
+        payloads.append({
+            "type": "matches_found_for_request",
+            "request_id": str(req.id),
+            "passenger_id": str(req.passenger_id),
+            "passenger_telegram_id": passenger_tg.telegram_id if passenger_tg else None,
+            "passenger_chat_id": _chat_id(passenger_tg),
+            "matches": [enriched[m.id] for m in matches]
+        })
+
+    publish_feed_events([(user_channel(p["passenger_id"]), p) for p in payloads])
+    if webhook_url and payloads:
+        await _send_webhooks(webhook_url, payloads)
+
+
+def _by_route(rides) -> dict:
+    groups = {}
+    for ride in rides:
+        groups.setdefault((ride.start_location, ride.end_location, ride.travel_start_date), []).append(ride)
+    return groups
+
+
+async def _dispatch_offers(service, session, offers: list[RideOffer]) -> None:
+    """
+    Add the offers to the matching index and announce them on their routes' feeds,
+    then match them route by route, through the coalescer when a coalescing
+    window is configured.
+    """
+    index = await ensure_matching_index(service)
+    active = [(offer, RideOfferDTO.model_validate(offer)) for offer in offers if offer.is_active]
+    if index:
+        for _, offer_dto in active:
+            index.upsert_offer(offer_dto)
+            publish_index_event(upsert_event("offer", offer_dto))
+    publish_feed_events([
+        (route_channel(o.start_location_id, o.end_location_id), {"type": "offer_created", "offer": dto.model_dump(mode="json")})
+        for o, dto in active
+    ])
+
+    coalescer = get_coalescer()
+    for (start, end, day), route_offers in _by_route(offers).items():
+        if coalescer:
+            group = coalescer.group_key("offer", start, end, day)
+            if coalescer.add(group, *(str(o.id) for o in route_offers)):
+                match_offer_group.apply_async((group,), countdown=coalescer.window)
+        else:
+            await _match_offers(service, session, route_offers)
+
+
+async def _dispatch_requests(service, session, requests: list[RideRequest]) -> None:
+    """
+    Add the requests to the matching index and announce them on their routes' feeds,
+    then match them route by route, through the coalescer when a coalescing
+    window is configured.
+    """
+    index = await ensure_matching_index(service)
+    active = [(req, RideRequestDTO.model_validate(req)) for req in requests if req.is_active]
+    if index:
+        for _, request_dto in active:
+            index.upsert_request(request_dto)
+            publish_index_event(upsert_event("request", request_dto))
+    publish_feed_events([
+        (route_channel(r.start_location_id, r.end_location_id), {"type": "request_created", "request": dto.model_dump(mode="json")})
+        for r, dto in active
+    ])
+
+    coalescer = get_coalescer()
+    for (start, end, day), route_requests in _by_route(requests).items():
+        if coalescer:
+            group = coalescer.group_key("request", start, end, day)
+            if coalescer.add(group, *(str(r.id) for r in route_requests)):
+                match_request_group.apply_async((group,), countdown=coalescer.window)
+        else:
+            await _match_requests(service, session, route_requests)
+
+
+@celery_app.task(bind=True)
+def process_ride_offer(self, offer_id: str):
+    """
+    Index and match a single offer.
     """
-    with open("/app/celery_debug.log", "a") as f:
-        f.write(f"[TASK] Processing offer START: {offer_id}\n")
-    
-    print(f"[TASK] Processing offer: {offer_id}")
     async def _process():
-        with open("/app/celery_debug.log", "a") as f:
-            f.write(f"[TASK] Inside _process for offer: {offer_id}\n")
         service, session = await get_service()
         try:
             offer = await service.offer_repo.get_by_id(UUID(offer_id))
             if not offer:
-                print(f"[TASK] Offer not found: {offer_id}")
+                logger.warning("Offer not found")
                 return
 
-            print(f"[TASK] Offer found. Driver ID: {offer.driver_id}")
-            
-            # Get Driver Telegram ID
-            driver_tg = await service.telegram_user.find_by_user_id(offer.driver_id)
-            driver_telegram_id = driver_tg.telegram_id if driver_tg else None
-            driver_chat_id = driver_tg.chat_id if driver_tg and driver_tg.chat_id else driver_telegram_id
-            print(f"[TASK] Driver Telegram ID: {driver_telegram_id}, Chat ID: {driver_chat_id}")
-
-            # Search Requests
-            from app.representations.dtos.ride import RideRequestSearchDTO
-            dt = RideRequestSearchDTO(
-                start_location=offer.start_location,
-                end_location=offer.end_location,
-                start_time=offer.travel_start_date,
-                limit=10,
-                offset=0
-            )
-            print(f"[TASK] Searching requests with: {dt}")
-            matches = await service.search_ride_requests(dt)
-            print(f"[TASK] Found {len(matches)} matches")
-            
-            if matches:
-                webhook_url = os.getenv("BOT_WEBHOOK_URL")
-                print(f"[TASK] Webhook URL: {webhook_url}")
-                
-                if not webhook_url: return
-
-                from app.representations.dtos.ride import RideOfferDTO
-                offer_dto = RideOfferDTO.model_validate(offer)
-
-                # Get Driver Info for Notification
-                # Fetch User for phone number
-                from app.domain.models.user import User
-                user_stmt = select(User).where(User.id == offer.driver_id)
-                user_result = await session.execute(user_stmt)
-                driver_user_model = user_result.scalars().first()
-                driver_phone = driver_user_model.phone_number if driver_user_model else None
-
-                driver_username = driver_tg.username if driver_tg else None
-                
-                # Fetch Car Photos
-                photos = await service.photo_repo.get_by_driver(offer.driver_id)
-                photo_urls = [p.url for p in photos]
-
-                # Iterate through matching requests and notify each passenger
-                # 1. Collect all passenger IDs
-                passenger_ids = [m.passenger_id for m in matches]
-                print(f"[TASK] Found {len(matches)} matching requests. Passenger IDs: {passenger_ids}")
-                with open("/app/celery_debug.log", "a") as f:
-                    f.write(f"[TASK] Found matches: {len(matches)}\n")
-                
-                # 2. Batch fetch passenger telegram users
-                from app.domain.models.user import TelegramUser
-                
-                stmt = select(TelegramUser).where(TelegramUser.user_id.in_(passenger_ids))
-                result = await session.execute(stmt)
-                telegram_users = result.scalars().all()
-                print(f"[TASK] Fetched {len(telegram_users)} Telegram users for passengers")
-                
-                # Map passenger_id to chat_id
-                passenger_map = {}
-                for tu in telegram_users:
-                     chat_id = tu.chat_id if tu.chat_id else tu.telegram_id
-                     passenger_map[tu.user_id] = chat_id
-                
-                print(f"[TASK] Passenger Map: {passenger_map}")
-
-                async with httpx.AsyncClient() as client:
-                    tasks = []
-                    for match_request in matches:
-                        p_id = match_request.passenger_id
-                        passenger_chat_id = passenger_map.get(p_id)
-                        
-                        if not passenger_chat_id:
-                            print(f"[TASK] No Telegram user found for passenger {p_id}")
-                            with open("/app/celery_debug.log", "a") as f:
-                                f.write(f"[TASK] No TG User for {p_id}\n")
-                            continue
-
-                        payload = {
-                            "type": "new_offer_found",
-                            "offer": {
-                                **offer_dto.model_dump(mode='json'),
-                                "driver_phone": driver_phone,
-                                "driver_username": driver_username,
-                                "car_photos": photo_urls
-                            },
-                            "request_id": str(match_request.id),
-                            "passenger_id": str(match_request.passenger_id),
-                            "passenger_chat_id": passenger_chat_id,
-                        }
-                        
-                        logger_msg = f"Sending webhook to {passenger_chat_id} for request {match_request.id}"
-                        print(f"[TASK] {logger_msg}")
-                        tasks.append(client.post(webhook_url, json=payload))
-                    
-                    if tasks:
-                        results = await asyncio.gather(*tasks, return_exceptions=True)
-                        for i, res in enumerate(results):
-                             if isinstance(res, Exception):
-                                 print(f"[TASK] Webhook error: {res}")
-                             else:
-                                 print(f"[TASK] Webhook sent. Status: {res.status_code}")
-                    
-        except Exception as e:
-            print(f"[TASK] Error: {e}")
-            import traceback
-            traceback.print_exc()
+            await _dispatch_offers(service, session, [offer])
+        except Exception:
+            logger.exception("Processing offer failed")
         finally:
             await session.close()
 
-    import asyncio
-    try:
-        asyncio.run(_process())
-    except RuntimeError:
-        # Fallback if a loop is already running (e.g. in some nested context)
-        loop = asyncio.get_event_loop()
-        loop.run_until_complete(_process())
+    with logger.contextualize(task_id=self.request.id, offer_id=offer_id):
+        with log_timing("Offer processed"):
+            worker_runtime.run(_process())
+
+@celery_app.task(bind=True)
+def process_ride_request(self, request_id: str):
+    """
+    Index and match a single request.
+    """
+    async def _process():
+        service, session = await get_service()
+        try:
+            req = await service.request_repo.get_by_id(UUID(request_id))
+            if not req:
+                logger.warning("Request not found")
+                return
+
+            await _dispatch_requests(service, session, [req])
+        except Exception:
+            logger.exception("Processing request failed")
+        finally:
+            await session.close()
+
+    with logger.contextualize(task_id=self.request.id, request_id=request_id):
+        with log_timing("Request processed"):
+            worker_runtime.run(_process())
+
+
+@celery_app.task(bind=True)
+def process_ride_offers(self, offer_ids: list[str]):
+    """
+    Index and match a batch of offers created by one bulk call.
+    """
+    async def _process():
+        service, session = await get_service()
+        try:
+            offers = await service.offer_repo.get_by_ids([UUID(i) for i in offer_ids])
+            if offers:
+                await _dispatch_offers(service, session, list(offers))
+        except Exception:
+            logger.exception("Processing offer batch failed")
+        finally:
+            await session.close()
+
+    with logger.contextualize(task_id=self.request.id, offers=len(offer_ids)):
+        with log_timing("Offer batch processed"):
+            worker_runtime.run(_process())
+
+
+@celery_app.task(bind=True)
+def process_ride_requests(self, request_ids: list[str]):
+    """
+    Index and match a batch of requests created by one bulk call.
+    """
+    async def _process():
+        service, session = await get_service()
+        try:
+            requests = await service.request_repo.get_by_ids([UUID(i) for i in request_ids])
+            if requests:
+                await _dispatch_requests(service, session, list(requests))
+        except Exception:
+            logger.exception("Processing request batch failed")
+        finally:
+            await session.close()
+
+    with logger.contextualize(task_id=self.request.id, requests=len(request_ids)):
+        with log_timing("Request batch processed"):
+            worker_runtime.run(_process())
+
+
+@celery_app.task(bind=True)
+def match_offer_group(self, group: str, offer_ids: list[str] | None = None, attempt: int = 0):
+    """
+    Run one matching pass for every offer collected on a route and date.
+    A failed pass is requeued with the drained offers, which are no longer in the group.
+    """
+    async def _process():
+        ids = offer_ids or get_coalescer().drain(group)
+        if not ids:
+            return
+        service, session = await get_service()
+        try:
+            offers = await service.offer_repo.get_by_ids([UUID(i) for i in ids])
+            if offers:
+                await _match_offers(service, session, list(offers))
+        except Exception:
+            logger.exception("Matching offer group failed")
+            if attempt < GROUP_MAX_RETRIES:
+                match_offer_group.apply_async((group, ids, attempt + 1), countdown=_backoff(attempt))
+            else:
+                logger.bind(offers=ids).error("Offer group dropped after retries")
+        finally:
+            await session.close()
+
+    with logger.contextualize(task_id=self.request.id, route=group):
+        with log_timing("Offer group matched"):
+            worker_runtime.run(_process())
+
+
+@celery_app.task(bind=True)
+def match_request_group(self, group: str, request_ids: list[str] | None = None, attempt: int = 0):
+    """
+    Run one matching pass for every request collected on a route and date.
+    A failed pass is requeued with the drained requests, which are no longer in the group.
+    """
+    async def _process():
+        ids = request_ids or get_coalescer().drain(group)
+        if not ids:
+            return
+        service, session = await get_service()
+        try:
+            requests = await service.request_repo.get_by_ids([UUID(i) for i in ids])
+            if requests:
+                await _match_requests(service, session, list(requests))
+        except Exception:
+            logger.exception("Matching request group failed")
+            if attempt < GROUP_MAX_RETRIES:
+                match_request_group.apply_async((group, ids, attempt + 1), countdown=_backoff(attempt))
+            else:
+                logger.bind(requests=ids).error("Request group dropped after retries")
+        finally:
+            await session.close()
+
+    with logger.contextualize(task_id=self.request.id, route=group):
+        with log_timing("Request group matched"):
+            worker_runtime.run(_process())
+
+
+@celery_app.task(bind=True)
+def resend_webhooks(self, webhook_url: str, payloads: list[dict], attempt: int):
+    """
+    Resend webhooks that failed; _send_webhooks queues this again for what still fails.
+    """
+    with logger.contextualize(task_id=self.request.id, attempt=attempt):
+        worker_runtime.run(_send_webhooks(webhook_url, payloads, attempt))
+
 
 @celery_app.task
-def process_ride_request(request_id: str):
+def evict_ride_offer(offer_id: str):
     """
-    Search for offers matching this request and notify bot.
+    Drop a deactivated offer from the matching index of every worker process.
     """
-    with open("/app/celery_debug.log", "a") as f:
-        f.write(f"[TASK] Processing request START: {request_id}\n")
+    publish_index_event(remove_event("offer", offer_id))
+
 
-    print(f"[TASK] Processing request: {request_id}")
+@celery_app.task(bind=True)
+def refresh_ride_offer(self, offer_id: str):
+    """
+    Republish an offer whose free seats changed, so every worker matches on the new count.
+    """
     async def _process():
         service, session = await get_service()
         try:
-            with open("/app/celery_debug.log", "a") as f:
-                f.write(f"[TASK] Inside _process for request: {request_id}\n")
-
-            requests = await service.request_repo.get_by_id(UUID(request_id))
-            if not requests:
-                print(f"[TASK] Request not found: {request_id}")
-                with open("/app/celery_debug.log", "a") as f:
-                    f.write(f"[TASK] Request not found: {request_id}\n")
-                return
-            req = requests
-            
-            print(f"[TASK] Request found. Passenger ID: {req.passenger_id}")
-
-            # Get Passenger Telegram ID
-            passenger_tg = await service.telegram_user.find_by_user_id(req.passenger_id)
-            passenger_telegram_id = passenger_tg.telegram_id if passenger_tg else None
-            passenger_chat_id = passenger_tg.chat_id if passenger_tg and passenger_tg.chat_id else passenger_telegram_id
-            print(f"[TASK] Passenger Telegram ID: {passenger_telegram_id}, Chat ID: {passenger_chat_id}")
-
-            # Search Offers
-            from app.representations.dtos.ride import RideOfferSearchDTO
-            seats = 1
-            if req.seat_amount and req.seat_amount.isdigit():
-                seats = int(req.seat_amount)
-            
-            dt = RideOfferSearchDTO(
-                start_location=req.start_location,
-                end_location=req.end_location,
-                seats_needed=seats,
-                start_time=req.travel_start_date,
-                limit=10
-            )
-            print(f"[TASK] Searching offers with: {dt}")
-            matches = await service.search_ride_offers(dt)
-            print(f"[TASK] Found {len(matches)} matches")
-            
-            if matches:
-                 webhook_url = os.getenv("BOT_WEBHOOK_URL")
-                 print(f"[TASK] Webhook URL: {webhook_url}")
-                 if not webhook_url: return
-
-                 # Enrich matches with driver info in BATCH
-                 enriched_matches = []
-                 from app.domain.models.user import User, TelegramUser
-                 from app.domain.models.ride import CarPhoto
-
-                 if matches:
-                     driver_ids = list(set([m.driver_id for m in matches]))
-                     
-                     # 1. Fetch Users (Phones)
-                     user_stmt = select(User).where(User.id.in_(driver_ids))
-                     user_res = await session.execute(user_stmt)
-                     users_map = {u.id: u for u in user_res.scalars().all()}
-                     
-                     # 2. Fetch Telegram Users (Usernames)
-                     tg_stmt = select(TelegramUser).where(TelegramUser.user_id.in_(driver_ids))
-                     tg_res = await session.execute(tg_stmt)
-                     tg_map = {t.user_id: t for t in tg_res.scalars().all()}
-                     
-                     # 3. Fetch Photos
-                     # Need a way to fetch photos for multiple drivers.
-                     # Assuming CarPhoto model has driver_id
-                     photo_stmt = select(CarPhoto).where(CarPhoto.driver_id.in_(driver_ids))
-                     photo_res = await session.execute(photo_stmt)
-                     photos_list = photo_res.scalars().all()
-                     
-                     # Group photos by driver_id
-                     photos_map = {}
-                     for p in photos_list:
-                         if p.driver_id not in photos_map:
-                             photos_map[p.driver_id] = []
-                         photos_map[p.driver_id].append(p.url)
-
-                     for m in matches:
-                         d_id = m.driver_id
-                         
-                         driver_user_model = users_map.get(d_id)
-                         driver_phone = driver_user_model.phone_number if driver_user_model else None
-                         
-                         driver_tg = tg_map.get(d_id)
-                         driver_username = driver_tg.username if driver_tg else None
-                         
-                         photo_urls = photos_map.get(d_id, [])
-                         
-                         enriched_match = {
-                             **m.model_dump(mode='json'),
-                             "driver_phone": driver_phone,
-                             "driver_username": driver_username,
-                             "car_photos": photo_urls
-                         }
-                         enriched_matches.append(enriched_match)
-
-                 payload = {
-                    "type": "matches_found_for_request",
-                    "request_id": request_id,
-                    "passenger_id": str(req.passenger_id),
-                    "passenger_telegram_id": passenger_telegram_id,
-                    "passenger_chat_id": passenger_chat_id,
-                    "matches": enriched_matches
-                 }
-                 async with httpx.AsyncClient() as client:
-                    resp = await client.post(webhook_url, json=payload)
-                    print(f"[TASK] Webhook sent. Status: {resp.status_code}")
-        except Exception as e:
-            print(f"[TASK] Error: {e}")
-            import traceback
-            traceback.print_exc()
+            offer = await service.offer_repo.get_by_id(UUID(offer_id))
+            if offer and offer.is_active:
+                publish_index_event(upsert_event("offer", RideOfferDTO.model_validate(offer)))
+            else:
+                publish_index_event(remove_event("offer", offer_id))
+        except Exception:
+            logger.exception("Refreshing offer failed")
         finally:
             await session.close()
 
-    import asyncio
-    try:
-        asyncio.run(_process())
-    except RuntimeError:
-        loop = asyncio.get_event_loop()
-        loop.run_until_complete(_process())
+    with logger.contextualize(task_id=self.request.id, offer_id=offer_id):
+        worker_runtime.run(_process())
+
+
+@celery_app.task
+def evict_ride_request(request_id: str):
+    """
+    Drop a deactivated request from the matching index of every worker process.
+    """
+    publish_index_event(remove_event("request", request_id))
+
+
+@celery_app.task(bind=True)
+def maintain_ride_partitions(self):
+    """
+    Create the coming weeks' ride partitions and archive the ones past retention.
+    Scheduled daily by beat; safe to run again at any time.
+    """
+    async def _process():
+        changes = await maintain_partitions(
+            engine,
+            local_today(),
+            weeks_ahead=partition_settings.PARTITION_WEEKS_AHEAD,
+            retain_weeks=partition_settings.PARTITION_RETAIN_WEEKS,
+            archive_schema=partition_settings.PARTITION_ARCHIVE_SCHEMA,
+        )
+        logger.info(f"Partitions created: {changes['created'] or 'none'}, archived: {changes['archived'] or 'none'}")
+
+    with logger.contextualize(task_id=self.request.id):
+        with log_timing("Ride partitions maintained"):
+            worker_runtime.run(_process())
@@ -0,0 +1,83 @@
+import asyncio
+import uuid
+from typing import Iterable
+
+from pydantic import TypeAdapter
+
+from app.core.metrics import Counter
+from app.domain.interfaces.cache import ICache
+from app.infrastructure.services.cache import get_user_cache
+from app.representations.dtos.user import TelegramUserDTO
+
+hits = Counter("telegram_user_cache_hits", "Telegram user lookups answered from the cache, by lookup key")
+misses = Counter("telegram_user_cache_misses", "Telegram user lookups that went to the database, by lookup key")
+
+_adapter = TypeAdapter(TelegramUserDTO)
+
+# Each namespace holds one record, so dropping an account is a single invalidate call
+_KEY = "record"
+
+
+class TelegramUserCache:
+    """
+    Telegram accounts by telegram_id and by user_id, read on nearly every bot
+    interaction and by the workers for every match they send.
+
+    Absent accounts are cached too, since the bot keeps asking about users until
+    they register. Registering or updating an account invalidates both of its keys.
+    """
+
+    def __init__(self, cache: ICache) -> None:
+        self.cache = cache
+
+    @staticmethod
+    def _telegram_namespace(telegram_id: int) -> str:
+        return f"telegram_user:{telegram_id}"
+
+    @staticmethod
+    def _user_namespace(user_id: uuid.UUID) -> str:
+        return f"telegram_user:user:{user_id}"
+
+    async def _get(self, namespace: str, by: str) -> tuple[bool, TelegramUserDTO | None]:
+        entry = await self.cache.get(namespace, _KEY)
+        if entry is None:
+            misses.inc(by=by)
+            return False, None
+        hits.inc(by=by)
+        return True, None if entry["user"] is None else _adapter.validate_python(entry["user"])
+
+    async def get_by_telegram_id(self, telegram_id: int) -> tuple[bool, TelegramUserDTO | None]:
+        """(cached, account): cached is False on a miss, account is None for an account known not to exist."""
+        return await self._get(self._telegram_namespace(telegram_id), "telegram_id")
+
+    async def get_many_by_user_id(
+        self, user_ids: Iterable[uuid.UUID]
+    ) -> tuple[dict[uuid.UUID, TelegramUserDTO | None], list[uuid.UUID]]:
+        """The cached accounts of `user_ids`, and the ids still to be loaded."""
+        user_ids = list(dict.fromkeys(user_ids))
+        entries = await asyncio.gather(*(self._get(self._user_namespace(u), "user_id") for u in user_ids))
+        cached = {u: account for u, (found, account) in zip(user_ids, entries) if found}
+        return cached, [u for u in user_ids if u not in cached]
+
+    async def put(
+        self,
+        account: TelegramUserDTO | None,
+        telegram_id: int | None = None,
+        user_id: uuid.UUID | None = None,
+    ) -> None:
+        """Caches `account` under both its keys, or its absence under the keys given."""
+        if account is not None:
+            telegram_id, user_id = account.telegram_id, account.user_id
+        entry = {"user": None if account is None else _adapter.dump_python(account, mode="json")}
+        if telegram_id is not None:
+            await self.cache.set(self._telegram_namespace(telegram_id), _KEY, entry)
+        if user_id is not None:
+            await self.cache.set(self._user_namespace(user_id), _KEY, entry)
+
+    async def invalidate(self, telegram_id: int, user_id: uuid.UUID) -> None:
+        await self.cache.invalidate(self._telegram_namespace(telegram_id), self._user_namespace(user_id))
+
+
+def get_telegram_user_cache() -> TelegramUserCache | None:
+    cache = get_user_cache()
+    return TelegramUserCache(cache) if cache is not None else None
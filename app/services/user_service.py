@@ -10,6 +10,8 @@ from app.representations.dtos.user import (
     TelegramUserDTO,
 )
 from app.infrastructure.repositories.user import UserRepository, TelegramUserRepository
+from app.infrastructure.connections.database.replica import ReplicaPins
+from app.services.user_cache import TelegramUserCache
 
 
 class UserService:
@@ -18,10 +20,18 @@ class UserService:
         session: AsyncSession,
         user_repo: UserRepository,
         telegram_user_repo: TelegramUserRepository,
+        replica_pins: Optional[ReplicaPins] = None,
+        user_cache: Optional[TelegramUserCache] = None,
     ):
         self.session: AsyncSession = session
         self.user: UserRepository = user_repo
         self.telegram_user: TelegramUserRepository = telegram_user_repo
+        self.replica_pins: Optional[ReplicaPins] = replica_pins
+        self.user_cache: Optional[TelegramUserCache] = user_cache
+
+    @staticmethod
+    def _pin_key(telegram_id: int) -> str:
+        return f"telegram:{telegram_id}"
 
     async def register_user(self, dto: CreateUserDTO) -> UserDTO:
         existing_user = await self.user.find_by_phone(dto.phone_number)
@@ -76,8 +86,13 @@ class UserService:
         tg_user = await self.telegram_user.create(dto, user_id_to_bind)
         
         await self.session.commit()
+        if self.replica_pins:
+            await self.replica_pins.pin(self._pin_key(dto.telegram_id))
+        if self.user_cache:
+            # Drops the cached "not registered" answers for both keys
+            await self.user_cache.invalidate(dto.telegram_id, user_id_to_bind)
         await self.session.refresh(tg_user)
-        return self._map_to_telegram_user_dto(tg_user)
+        return telegram_user_dto(tg_user)
 
     def _map_to_user_dto(self, user: User) -> UserDTO:
         return UserDTO(
@@ -90,10 +105,20 @@ class UserService:
         )
 
     async def get_telegram_user_by_id(self, telegram_id: int) -> Optional[TelegramUserDTO]:
-        tg_user = await self.telegram_user.find_by_telegram_id(telegram_id)
-        if tg_user:
-            return self._map_to_telegram_user_dto(tg_user)
-        return None
+        if self.user_cache:
+            cached, account = await self.user_cache.get_by_telegram_id(telegram_id)
+            if cached:
+                return account
+
+        # Replica, unless this account changed within the pin window
+        pinned = bool(self.replica_pins) and await self.replica_pins.is_pinned(self._pin_key(telegram_id))
+        use_replica = bool(self.replica_pins) and not pinned
+        tg_user = await self.telegram_user.find_by_telegram_id(telegram_id, use_replica=use_replica)
+        account = telegram_user_dto(tg_user) if tg_user else None
+        # A pinned account just changed; caching it now could keep a stale replica read
+        if self.user_cache and not pinned:
+            await self.user_cache.put(account, telegram_id=telegram_id)
+        return account
 
     async def update_telegram_user(
         self, 
@@ -128,22 +153,27 @@ class UserService:
                     tg_user.user.last_name = last_name
             
         await self.session.commit()
+        if self.replica_pins:
+            await self.replica_pins.pin(self._pin_key(telegram_id))
+        if self.user_cache:
+            await self.user_cache.invalidate(telegram_id, tg_user.user_id)
         await self.session.refresh(tg_user)
-        return self._map_to_telegram_user_dto(tg_user)
-
-    def _map_to_telegram_user_dto(self, tg_user: TelegramUser) -> TelegramUserDTO:
-        return TelegramUserDTO(
-            id=tg_user.id,
-            user_id=tg_user.user_id,
-            telegram_id=tg_user.telegram_id,
-            chat_id=tg_user.chat_id,
-            username=tg_user.username,
-            language_code=tg_user.language_code,
-            role=tg_user.role,
-            language=tg_user.language,
-            phone_number=tg_user.phone_number,
-            first_name=tg_user.first_name,
-            last_name=tg_user.last_name,
-            created_at=tg_user.created_at,
-            updated_at=tg_user.updated_at
-        )
+        return telegram_user_dto(tg_user)
+
+
+def telegram_user_dto(tg_user: TelegramUser) -> TelegramUserDTO:
+    return TelegramUserDTO(
+        id=tg_user.id,
+        user_id=tg_user.user_id,
+        telegram_id=tg_user.telegram_id,
+        chat_id=tg_user.chat_id,
+        username=tg_user.username,
+        language_code=tg_user.language_code,
+        role=tg_user.role,
+        language=tg_user.language,
+        phone_number=tg_user.phone_number,
+        first_name=tg_user.first_name,
+        last_name=tg_user.last_name,
+        created_at=tg_user.created_at,
+        updated_at=tg_user.updated_at
+    )
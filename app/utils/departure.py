@@ -0,0 +1,50 @@
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+# Rides are posted in local wall-clock time; departs_at is generated in this zone
+RIDE_TIMEZONE_NAME = "Asia/Bishkek"
+RIDE_TIMEZONE = ZoneInfo(RIDE_TIMEZONE_NAME)
+
+# Offers leaving up to this long after the requested time match
+OFFER_TIME_WINDOW = timedelta(hours=4)
+
+# Days before a ride's travel date whose searches can still return it
+OFFER_WINDOW_DAYS = 1  # a late-evening time window runs past midnight
+REQUEST_WINDOW_DAYS = 2
+
+DepartureWindow = tuple[datetime, datetime]
+
+
+def local_today() -> date:
+    """Today's date in RIDE_TIMEZONE, the calendar travel_start_date is written in."""
+    return datetime.now(RIDE_TIMEZONE).date()
+
+
+def departure(travel_date: date, travel_time: time) -> datetime:
+    """The ride's departs_at: its local date and time as an aware datetime."""
+    return datetime.combine(travel_date, travel_time, tzinfo=RIDE_TIMEZONE)
+
+
+def offer_window(start_date: date, start_time: time | None = None) -> DepartureWindow:
+    """
+    Half-open departs_at range searched for offers: OFFER_TIME_WINDOW from the
+    requested time, or the whole day when no time is given.
+    """
+    if start_time is None:
+        return departure(start_date, time.min), departure(start_date + timedelta(days=1), time.min)
+    start = departure(start_date, start_time)
+    return start, start + OFFER_TIME_WINDOW
+
+
+def request_window(start_date: date, start_time: time | None = None) -> DepartureWindow:
+    """Half-open departs_at range searched for requests: from the given time to the end of the 2-day window."""
+    return (
+        departure(start_date, start_time or time.min),
+        departure(start_date + timedelta(days=REQUEST_WINDOW_DAYS + 1), time.min),
+    )
+
+
+def window_dates(window: DepartureWindow) -> tuple[date, date]:
+    """First and last travel_start_date a window covers, the partition key range of a search."""
+    departs_from, departs_until = window
+    return departs_from.date(), (departs_until - timedelta(microseconds=1)).date()
@@ -0,0 +1,87 @@
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Geohash length stored on rides. Precision 5 cells are about 4.9 km tall and
+# 3.6 km wide at Bishkek's latitude, so a city-sized radius covers a handful
+GEOHASH_PRECISION = 5
+
+# Largest radius a proximity search accepts; at 25 km one end already spans ~180 cells
+MAX_RADIUS_KM = 25.0
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# Latitude/longitude as a (lat, lon) pair in degrees
+Point = tuple[float, float]
+
+
+def _grid(precision: int) -> tuple[int, int]:
+    """Bits of latitude and longitude in a geohash of this length (longitude takes the odd one)."""
+    bits = precision * 5
+    return bits // 2, bits - bits // 2
+
+
+def _cell_index(value: float, low: float, high: float, bits: int) -> int:
+    index = int((value - low) / (high - low) * (1 << bits))
+    return min(max(index, 0), (1 << bits) - 1)
+
+
+def _encode_index(lat_index: int, lon_index: int, precision: int) -> str:
+    lat_bits, lon_bits = _grid(precision)
+    code, chars = 0, []
+    # Bits interleave from the most significant, starting with longitude
+    for i in range(precision * 5):
+        if i % 2 == 0:
+            lon_bits -= 1
+            code = (code << 1) | (lon_index >> lon_bits & 1)
+        else:
+            lat_bits -= 1
+            code = (code << 1) | (lat_index >> lat_bits & 1)
+        if i % 5 == 4:
+            chars.append(_BASE32[code])
+            code = 0
+    return "".join(chars)
+
+
+def geohash(lat: float, lon: float, precision: int = GEOHASH_PRECISION) -> str:
+    """Standard base32 geohash of the cell containing (lat, lon)."""
+    lat_bits, lon_bits = _grid(precision)
+    return _encode_index(
+        _cell_index(lat, -90.0, 90.0, lat_bits),
+        _cell_index(lon, -180.0, 180.0, lon_bits),
+        precision,
+    )
+
+
+def cells_within(lat: float, lon: float, radius_km: float, precision: int = GEOHASH_PRECISION) -> list[str]:
+    """
+    Every geohash cell that can hold a point within `radius_km` of (lat, lon):
+    the cells overlapping the radius' bounding box. A superset, so callers still
+    check the exact distance, but one an index can look up cell by cell.
+    """
+    lat_bits, lon_bits = _grid(precision)
+    lat_delta = math.degrees(radius_km / EARTH_RADIUS_KM)
+    # Widest at the bounding box edge nearest a pole
+    widest = min(abs(lat) + lat_delta, 89.9)
+    lon_delta = min(lat_delta / math.cos(math.radians(widest)), 180.0)
+
+    lat_low = _cell_index(lat - lat_delta, -90.0, 90.0, lat_bits)
+    lat_high = _cell_index(lat + lat_delta, -90.0, 90.0, lat_bits)
+    # Unclamped, so a box crossing the antimeridian wraps around to the other end of the row
+    columns = 1 << lon_bits
+    lon_low = math.floor((lon - lon_delta + 180.0) / 360.0 * columns)
+    lon_high = math.floor((lon + lon_delta + 180.0) / 360.0 * columns)
+    lon_indexes = sorted({i % columns for i in range(lon_low, min(lon_high, lon_low + columns - 1) + 1)})
+    return [
+        _encode_index(lat_index, lon_index, precision)
+        for lat_index in range(lat_low, lat_high + 1)
+        for lon_index in lon_indexes
+    ]
+
+
+def haversine_km(a: Point, b: Point) -> float:
+    """Great-circle distance between two points in kilometres."""
+    lat1, lon1 = map(math.radians, a)
+    lat2, lon2 = map(math.radians, b)
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(h)))
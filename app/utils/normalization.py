@@ -1,3 +1,6 @@
+import re
+import unicodedata
+from functools import lru_cache
 from typing import Dict
 
 CITY_MAPPING: Dict[str, str] = {
@@ -13,7 +16,7 @@ CITY_MAPPING: Dict[str, str] = {
     "манас": "Manas",
     "талас": "Talas",
     "баткен": "Batken",
-    
+
     # Kyrgyz (Cyrillic)
     "нарын": "Naryn",
     "бишкек": "Bishkek",
@@ -25,21 +28,187 @@ CITY_MAPPING: Dict[str, str] = {
     "талас": "Talas",
     "баткен": "Batken",
     "манас": "Manas",
-    
+
     # Common variations
     "issykkul": "Issyk-Kul",
     "issyk-kul": "Issyk-Kul",
     "ыссык-кол": "Issyk-Kul",
-    "ысык-көл": "Issyk-Kul"
+    "ысык-көл": "Issyk-Kul",
+
+    # Kara-Köl (Jalal-Abad region) folds to the same letters as Karakol (Issyk-Kul
+    # region) and is a typo away from it; listing it keeps the two towns apart
+    "кара-көл": "Kara-Kul",
+    "кара-куль": "Kara-Kul",
+    "кара-кул": "Kara-Kul",
+    "кара-кол": "Kara-Kul",
+    "karakul": "Kara-Kul",
+    "kara-kol": "Kara-Kul",
 }
 
+# Cyrillic (Russian + Kyrgyz letters) to the Latin spelling used by canonical names
+TRANSLITERATION: Dict[str, str] = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e",
+    "ж": "zh", "з": "z", "и": "i", "й": "y", "к": "k", "л": "l", "м": "m",
+    "н": "n", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t", "у": "u",
+    "ф": "f", "х": "kh", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "sch", "ъ": "",
+    "ы": "y", "ь": "", "э": "e", "ю": "yu", "я": "ya", "ө": "o", "ү": "u",
+    "ң": "n",
+}
+
+# Spellings that differ between transliteration schemes, folded to one form
+LATIN_FOLDS = (("dzh", "j"), ("zh", "j"), ("kh", "h"), ("yy", "y"))
+
+_TRANSLATE = str.maketrans(TRANSLITERATION)
+
+
+def fold(text: str) -> str:
+    """
+    Reduces a place name to a comparison key: lowercase Latin letters and
+    digits only, Cyrillic transliterated and diacritics stripped.
+    """
+    text = text.lower().translate(_TRANSLATE)
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if c.isascii() and c.isalnum())
+    for source, target in LATIN_FOLDS:
+        text = text.replace(source, target)
+    return text
+
+
+def location_key(text: str) -> str:
+    """
+    Key a spelling is stored under in location_aliases: its fold(), or the
+    trimmed lowercase text for scripts fold() has no transliteration for.
+    """
+    return fold(text) or text.lower().strip()
+
+
+def spelling(text: str) -> str:
+    """Lowercase text with runs of spaces and hyphens as one hyphen: a spelling as written, script kept."""
+    return "-".join(re.split(r"[\s\-]+", text.lower().strip())).strip("-")
+
+
+def max_typos(key: str, multi_part: bool = False) -> int:
+    """
+    Edit distance tolerated for a key of this length; short names must match
+    exactly. Multi-part names (Kara-Balta, Kara-Suu, Kara-Kul) share whole
+    words with other places, so they allow one edit at most.
+    """
+    if len(key) <= 3:
+        return 0
+    if len(key) <= 6 or multi_part:
+        return 1
+    return 2
+
+
+class _TrieNode:
+    __slots__ = ("children", "cities")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.cities: set[str] = set()
+
+
+class CityMatcher:
+    """
+    Trie of folded city names and aliases. Spellings listed in the mapping and
+    unambiguous folded keys resolve with one dict lookup; anything else runs a
+    Levenshtein search that abandons every branch whose best distance already
+    exceeds the budget.
+    """
+
+    def __init__(self, mapping: Dict[str, str]) -> None:
+        self.root = _TrieNode()
+        self.spellings: Dict[str, str] = {}
+        self.folded: Dict[str, set[str]] = {}
+        self.multi_part = {city for city in mapping.values() if "-" in spelling(city)}
+        for alias, city in mapping.items():
+            self._add(alias, city)
+            self._add(city, city)
+
+    def _add(self, name: str, city: str) -> None:
+        self.spellings[spelling(name)] = city
+        key = fold(name)
+        if not key:
+            return
+        self.folded.setdefault(key, set()).add(city)
+        node = self.root
+        for char in key:
+            node = node.children.setdefault(char, _TrieNode())
+        node.cities.add(city)
+
+    def exact(self, text: str) -> str | None:
+        """The city `text` is a listed spelling of, or folds to without ambiguity."""
+        city = self.spellings.get(spelling(text))
+        if city is not None:
+            return city
+        cities = self.folded.get(fold(text), ())
+        return next(iter(cities)) if len(cities) == 1 else None
+
+    def closest(self, text: str) -> str | None:
+        """The one city within the typo budget of `text`, or None when none or several are."""
+        key = fold(text)
+        multi_part = "-" in spelling(text)
+        budget = max_typos(key, multi_part)
+        if budget == 0:
+            return None
+
+        distances: Dict[str, int] = {}
+        first_row = list(range(len(key) + 1))
+        stack = [(child, char, first_row) for char, child in self.root.children.items()]
+        while stack:
+            node, char, previous = stack.pop()
+            row = [previous[0] + 1]
+            for i in range(1, len(key) + 1):
+                row.append(min(
+                    row[i - 1] + 1,
+                    previous[i] + 1,
+                    previous[i - 1] + (key[i - 1] != char),
+                ))
+            for city in node.cities:
+                if row[-1] <= max_typos(key, multi_part or city in self.multi_part):
+                    distances[city] = min(row[-1], distances.get(city, row[-1]))
+            if min(row) <= budget:
+                stack.extend((child, c, row) for c, child in node.children.items())
+
+        if not distances:
+            return None
+        best_distance = min(distances.values())
+        best = [city for city, distance in distances.items() if distance == best_distance]
+        # Two different cities equally close is a guess, not a match
+        return best[0] if len(best) == 1 else None
+
+    def match(self, text: str) -> str | None:
+        if not fold(text):
+            return None
+        return self.exact(text) or self.closest(text)
+
+
+_matcher = CityMatcher(CITY_MAPPING)
+
+
+def known_location(text: str) -> str | None:
+    """The canonical name of a listed city `text` spells exactly (up to case, accents and script)."""
+    if not text or not fold(text):
+        return None
+    return _matcher.exact(text)
+
+
+@lru_cache(maxsize=4096)
+def correct_location(text: str) -> str | None:
+    """The listed city `text` is a likely typo of. Only for names that are not already a known place."""
+    if not text or not fold(text):
+        return None
+    return _matcher.closest(text)
+
+
+@lru_cache(maxsize=4096)
 def normalize_location(text: str) -> str:
     """
-    Normalizes location text to a canonical English name if found in the mapping.
-    Otherwise returns the original text stripped of whitespace.
+    Normalizes location text to a canonical English name if found in the mapping,
+    exactly or within the typo budget. Otherwise returns the original text
+    stripped of whitespace.
     """
     if not text:
         return text
-        
-    cleaned = text.strip().lower()
-    return CITY_MAPPING.get(cleaned, text.strip())
+
+    return _matcher.match(text) or text.strip()
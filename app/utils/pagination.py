@@ -0,0 +1,23 @@
+import base64
+from datetime import date, time
+from uuid import UUID
+
+Cursor = tuple[date, time, UUID]
+
+
+def encode_cursor(travel_start_date: date, travel_start_time: time, ride_id: UUID) -> str:
+    """
+    Opaque keyset cursor pointing just after the given ride in
+    (travel_start_date, travel_start_time, id) order.
+    """
+    raw = f"{travel_start_date.isoformat()}|{travel_start_time.isoformat()}|{ride_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        day, at, ride_id = raw.split("|")
+        return date.fromisoformat(day), time.fromisoformat(at), UUID(ride_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
@@ -0,0 +1,112 @@
+"""
+Rows per second through a ride listing endpoint, before and after the direct row-to-JSON path.
+
+Before: ORM objects validated one by one with model_validate, returned to FastAPI,
+which validates the list again against response_model and then serializes it.
+After: the plain rows of a column-only select, validated as one list by a
+TypeAdapter and dumped straight to JSON bytes in a Response.
+
+The requests go through the ASGI app in-process, so no database is needed. What
+this leaves out is the ORM hydration a column select avoids on the database side
+(identity map, relationship loading), which only widens the gap.
+
+    python benchmarks/bench_list_responses.py [rows] [requests]
+"""
+import asyncio
+import os
+import sys
+import time as clock
+import uuid
+from collections import namedtuple
+from datetime import date, time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+for key, value in {
+    "ENV_TYPE": "test",
+    "POSTGRES_USER": "bench",
+    "POSTGRES_PASSWORD": "bench",
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_DB": "bench",
+    "CLOUDINARY_CLOUD_NAME": "bench",
+    "CLOUDINARY_API_KEY": "bench",
+    "CLOUDINARY_API_SECRET": "bench",
+}.items():
+    os.environ.setdefault(key, value)
+
+import httpx
+from fastapi import FastAPI
+
+from app.domain.models.ride import RequestSource, RideOffer
+from app.infrastructure.repositories.ride import OFFER_COLUMNS
+from app.representations.dtos.ride import RideOfferDTO, RideOfferListAdapter
+from app.representations.responses import list_response
+
+
+def offer_values(i: int) -> dict:
+    return {
+        "id": uuid.uuid4(),
+        "driver_id": uuid.uuid4(),
+        "travel_start_date": date(2025, 1, 1),
+        "travel_start_time": time(8 + i % 12, i % 60),
+        "start_location": "Bishkek",
+        "end_location": "Osh",
+        "request_source": RequestSource.telegram_app,
+        "start_lat": 42.87,
+        "start_lon": 74.59,
+        "end_lat": 40.51,
+        "end_lon": 72.8,
+        "car_model": "Toyota Camry",
+        "total_seat_amount": 4,
+        "free_seats": 3,
+        "price": 1500,
+    }
+
+
+# Stands in for the Row objects result.all() returns for select(*OFFER_COLUMNS): a tuple with named attributes
+OfferRow = namedtuple("OfferRow", [column.key for column in OFFER_COLUMNS])
+
+
+def build_app(orm_offers: list[RideOffer], rows: list[OfferRow]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/before", response_model=List[RideOfferDTO])
+    async def before():
+        return [RideOfferDTO.model_validate(o) for o in orm_offers]
+
+    @app.get("/after", response_model=List[RideOfferDTO])
+    async def after():
+        return list_response(RideOfferListAdapter.validate_python(rows), RideOfferListAdapter)
+
+    return app
+
+
+async def rows_per_second(client: httpx.AsyncClient, path: str, rows: int, requests: int) -> float:
+    await client.get(path)  # warm up
+    started = clock.perf_counter()
+    for _ in range(requests):
+        response = await client.get(path)
+        response.raise_for_status()
+    return rows * requests / (clock.perf_counter() - started)
+
+
+async def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    values = [offer_values(i) for i in range(rows)]
+    app = build_app([RideOffer(**v) for v in values], [OfferRow(**v) for v in values])
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        old = await rows_per_second(client, "/before", rows, requests)
+        new = await rows_per_second(client, "/after", rows, requests)
+    print(f"{rows} rows x {requests} requests")
+    print(f"{'path':<34}{'rows/s':>12}")
+    print(f"{'model_validate + response_model':<34}{old:>12,.0f}")
+    print(f"{'TypeAdapter + list_response':<34}{new:>12,.0f}")
+    print(f"{'speedup':<34}{new / old:>11.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
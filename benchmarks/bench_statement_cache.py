@@ -0,0 +1,163 @@
+"""
+Per-call Python overhead of the hot repository queries, before and after lambda statements.
+
+Every execute() builds the statement and computes its cache key before SQLAlchemy
+can look the compiled SQL up; that is the work measured here. No database is
+needed: a stand-in session captures the statement instead of running it.
+
+    python benchmarks/bench_statement_cache.py [iterations]
+"""
+import os
+import sys
+import timeit
+import uuid
+from datetime import date, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+for key, value in {
+    "ENV_TYPE": "test",
+    "POSTGRES_USER": "bench",
+    "POSTGRES_PASSWORD": "bench",
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_DB": "bench",
+    "CLOUDINARY_CLOUD_NAME": "bench",
+    "CLOUDINARY_API_KEY": "bench",
+    "CLOUDINARY_API_SECRET": "bench",
+}.items():
+    os.environ.setdefault(key, value)
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import joinedload
+
+from app.domain.models.ride import RideOffer, RideRequest
+from app.domain.models.user import TelegramUser
+from app.infrastructure.repositories.ride import OFFER_COLUMNS, REQUEST_COLUMNS, RideOfferRepository, RideRequestRepository
+from app.infrastructure.repositories.user import TelegramUserRepository
+from app.utils.departure import departure, offer_window, request_window, window_dates
+
+
+class EmptyResult:
+    def scalars(self):
+        return self
+
+    def all(self):
+        return []
+
+    def first(self):
+        return None
+
+    def scalar_one_or_none(self):
+        return None
+
+
+class CapturingSession:
+    async def execute(self, statement):
+        self.statement = statement
+        return EmptyResult()
+
+
+def run(coro) -> None:
+    # The stand-in session never suspends, so one send() runs the coroutine to completion
+    try:
+        coro.send(None)
+    except StopIteration:
+        pass
+
+
+session = CapturingSession()
+offers, requests, telegram_users = (
+    RideOfferRepository(session), RideRequestRepository(session), TelegramUserRepository(session)
+)
+ride_id, after = uuid.uuid4(), (date(2025, 1, 1), time(10, 0), uuid.uuid4())
+
+
+# --- Before: a fresh select() per call, as the repositories used to build them ---
+
+def offer_by_id_select():
+    return select(RideOffer).options(joinedload(RideOffer.driver)).where(RideOffer.id == ride_id)
+
+
+def search_offers_select():
+    departs_from, departs_until = window = offer_window(date(2025, 1, 1), time(8, 0))
+    first_day, last_day = window_dates(window)
+    return select(*OFFER_COLUMNS).where(
+        RideOffer.start_location_id == 1,
+        RideOffer.end_location_id == 2,
+        RideOffer.departs_at >= departs_from,
+        RideOffer.departs_at < departs_until,
+        RideOffer.travel_start_date >= first_day,
+        RideOffer.travel_start_date <= last_day,
+        RideOffer.free_seats >= 2,
+        RideOffer.is_active == True,
+    ).order_by(RideOffer.departs_at.asc(), RideOffer.id.asc()).limit(10).where(
+        tuple_(RideOffer.departs_at, RideOffer.id) > tuple_(departure(after[0], after[1]), after[2])
+    )
+
+
+def search_requests_select():
+    departs_from, departs_until = window = request_window(date(2025, 1, 1))
+    first_day, last_day = window_dates(window)
+    return select(*REQUEST_COLUMNS).where(
+        RideRequest.start_location_id == 1,
+        RideRequest.end_location_id == 2,
+        RideRequest.departs_at >= departs_from,
+        RideRequest.departs_at < departs_until,
+        RideRequest.travel_start_date >= first_day,
+        RideRequest.travel_start_date <= last_day,
+        RideRequest.is_active == True,
+    ).order_by(RideRequest.departs_at.asc(), RideRequest.id.asc()).limit(10).offset(0)
+
+
+def telegram_user_select():
+    return select(TelegramUser).where(TelegramUser.telegram_id == 123456789)
+
+
+# --- After: the repositories' lambda statements ---
+
+def offer_by_id_lambda():
+    run(offers.get_by_id(ride_id))
+    return session.statement
+
+
+def search_offers_lambda():
+    run(offers.search_offers(1, 2, 2, date(2025, 1, 1), after=after, start_time=time(8, 0)))
+    return session.statement
+
+
+def search_requests_lambda():
+    run(requests.search_requests(1, 2, date(2025, 1, 1)))
+    return session.statement
+
+
+def telegram_user_lambda():
+    run(telegram_users.find_by_telegram_id(123456789))
+    return session.statement
+
+
+CASES = [
+    ("offer get_by_id", offer_by_id_select, offer_by_id_lambda),
+    ("search_offers", search_offers_select, search_offers_lambda),
+    ("search_requests", search_requests_select, search_requests_lambda),
+    ("find_by_telegram_id", telegram_user_select, telegram_user_lambda),
+]
+
+
+def per_call_us(build, iterations: int) -> float:
+    def call():
+        build()._generate_cache_key()
+
+    call()  # warm the lambda analysis cache
+    return min(timeit.repeat(call, number=iterations, repeat=5)) / iterations * 1e6
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print(f"{'query':<22}{'select() µs':>14}{'lambda µs':>12}{'speedup':>10}")
+    for name, before, after_ in CASES:
+        old, new = per_call_us(before, iterations), per_call_us(after_, iterations)
+        print(f"{name:<22}{old:>14.1f}{new:>12.1f}{old / new:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
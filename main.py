@@ -1,5 +1,15 @@
-from fastapi import FastAPI
-from app.representations.api.v1 import users, telegram, rides
+from fastapi import FastAPI, Response, status
+from fastapi.responses import JSONResponse
+from app.core import metrics
+from app.core.logging import configure_logging
+from app.configurations.database import postgres_settings
+from app.configurations.compression import compression_settings
+from app.infrastructure.connections.database.session import engine, read_engine
+from app.infrastructure.connections.database.pool import ping
+from app.representations.api.v1 import users, telegram, rides, feed
+from app.representations.compression import CompressionMiddleware
+
+configure_logging("api")
 
 app = FastAPI(
     title="Gogogo Backend",
@@ -7,10 +17,37 @@ app = FastAPI(
     version="1.0.0",
 )
 
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=compression_settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=compression_settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=compression_settings.COMPRESSION_BROTLI_QUALITY,
+)
+
 app.include_router(users.router, prefix="/api/v1")
 app.include_router(telegram.router, prefix="/api/v1")
 app.include_router(rides.router, prefix="/api/v1")
+app.include_router(feed.router, prefix="/api/v1")
 
 @app.get("/health")
 async def health_check():
     return {"status": "ok"}
+
+@app.get("/ready")
+async def readiness_check():
+    # Ready once every database this process queries answers; the replica too, when configured
+    engines = {"primary": engine, "replica": read_engine}
+    checks = {
+        role: await ping(db, postgres_settings.POSTGRES_READY_TIMEOUT)
+        for role, db in engines.items() if db is not None
+    }
+    if any(checks.values()):
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "unavailable", "checks": {role: error or "ok" for role, error in checks.items()}},
+        )
+    return {"status": "ready", "checks": {role: "ok" for role in checks}}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
@@ -0,0 +1,36 @@
+"""
+Outbox relay: publishes the Celery tasks services queue in task_outbox.
+
+Run next to the API and the workers (`python relay.py`); several relays may run
+at once. See app.services.outbox.OutboxRelay.
+"""
+import asyncio
+import signal
+
+from app.core.celery_app import celery_app
+from app.core.logging import configure_logging
+from app.configurations.outbox import outbox_settings
+from app.infrastructure.connections.database.session import async_session_maker, engine
+from app.services.outbox import OutboxRelay
+
+
+def publish(task: str, args: list) -> None:
+    celery_app.send_task(task, args=args)
+
+
+async def main() -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    relay = OutboxRelay(async_session_maker, publish, batch_size=outbox_settings.OUTBOX_BATCH_SIZE)
+    try:
+        await relay.run(outbox_settings.OUTBOX_POLL_INTERVAL, stop)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    configure_logging("relay")
+    asyncio.run(main())
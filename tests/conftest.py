@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+# Settings classes are instantiated at import time; give them a throwaway environment
+# so modules that read configuration can be imported without a .env file.
+for key, value in {
+    "ENV_TYPE": "test",
+    "POSTGRES_USER": "gogogo",
+    "POSTGRES_PASSWORD": "gogogo",
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_DB": "gogogo_test",
+    "CLOUDINARY_CLOUD_NAME": "test",
+    "CLOUDINARY_API_KEY": "test",
+    "CLOUDINARY_API_SECRET": "test",
+}.items():
+    os.environ.setdefault(key, value)
+
+
+@pytest.fixture(autouse=True, scope="session")
+def in_memory_celery_broker():
+    # Services enqueue Celery tasks after committing; keep those messages in memory
+    from app.core.celery_app import celery_app
+
+    celery_app.conf.update(broker_url="memory://", result_backend="cache+memory://")
+    yield
+
+
+class InMemoryLocationRepository:
+    """Stands in for LocationRepository: each new key gets the next id, starting at 1."""
+
+    def __init__(self, *names: str):
+        from app.services.locations import LocationResolver
+
+        self.by_key: dict[str, tuple[int, str]] = {}
+        for name in names:
+            name, key = LocationResolver.canonical(name)
+            self.by_key.setdefault(key, (len(self.by_key) + 1, name))
+
+    async def find_by_key(self, key):
+        return self.by_key.get(key)
+
+    async def get_or_create(self, name, key):
+        return self.by_key.setdefault(key, (len(self.by_key) + 1, name))
+
+
+@pytest.fixture
+def in_memory_locations():
+    return InMemoryLocationRepository
+
+
+@pytest.fixture
+def location_resolver():
+    # Bishkek=1, Osh=2, A=3, B=4, X=5, Y=6
+    from app.services.locations import LocationResolver
+
+    return LocationResolver(InMemoryLocationRepository("Bishkek", "Osh", "A", "B", "X", "Y"), cache={})
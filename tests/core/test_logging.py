@@ -0,0 +1,34 @@
+from loguru import logger
+
+from app.configurations.logging import LoggingSettings
+from app.core.logging import log_timing, lowest_level
+
+
+def test_module_levels_parsing():
+    settings = LoggingSettings(LOG_LEVELS="app.services.tasks=debug, sqlalchemy.engine = WARNING,broken")
+
+    assert settings.module_levels == {
+        "app.services.tasks": "DEBUG",
+        "sqlalchemy.engine": "WARNING",
+    }
+
+
+def test_log_timing_records_fields_and_duration():
+    records = []
+    handler_id = logger.add(lambda m: records.append(m.record), level="INFO")
+    try:
+        with log_timing("Offer processed", offer_id="abc"):
+            pass
+    finally:
+        logger.remove(handler_id)
+
+    assert records[-1]["message"] == "Offer processed"
+    assert records[-1]["extra"]["offer_id"] == "abc"
+    assert records[-1]["extra"]["duration_ms"] >= 0
+
+
+def test_lowest_level_covers_module_overrides():
+    assert lowest_level({"": "INFO"}) == 20
+    assert lowest_level({"": "WARNING", "sqlalchemy.engine": "DEBUG"}) == 10
+    assert lowest_level({"": "INFO", "app": "TRACE"}) == 5
+    assert lowest_level({"": "INFO", "app": "VERBOSE"}) == 0
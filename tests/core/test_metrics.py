@@ -0,0 +1,51 @@
+import pytest
+
+from app.core.metrics import Counter, Gauge, Histogram, Metric, render
+
+
+def test_counter_renders_per_label_set():
+    registry = []
+    hits = Counter("cache_hits", "Cache hits", registry=registry)
+    hits.inc(tier="local")
+    hits.inc(2, tier="redis")
+    hits.inc(tier="local")
+
+    assert render(registry).splitlines() == [
+        "# HELP cache_hits_total Cache hits",
+        "# TYPE cache_hits_total counter",
+        'cache_hits_total{tier="local"} 2',
+        'cache_hits_total{tier="redis"} 2',
+    ]
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = []
+    wait = Histogram("wait_seconds", "Wait", buckets=(0.1, 1.0), registry=registry)
+    for value in (0.05, 0.5, 0.7, 3.0):
+        wait.observe(value, role="primary")
+
+    lines = render(registry).splitlines()
+
+    assert 'wait_seconds_bucket{role="primary",le="0.1"} 1' in lines
+    assert 'wait_seconds_bucket{role="primary",le="1"} 3' in lines
+    assert 'wait_seconds_bucket{role="primary",le="+Inf"} 4' in lines
+    assert 'wait_seconds_sum{role="primary"} 4.25' in lines
+    assert 'wait_seconds_count{role="primary"} 4' in lines
+
+
+def test_gauge_is_read_at_scrape_time():
+    registry, size = [], [3]
+    Gauge("pool_size", "Pool size", lambda: [({}, size[0])], registry=registry)
+    size[0] = 7
+
+    assert "pool_size 7" in render(registry).splitlines()
+
+
+def test_metric_without_samples_cannot_be_created():
+    class Broken(Metric):
+        kind = "gauge"
+
+    registry = []
+    with pytest.raises(TypeError):
+        Broken("broken", "No samples", registry)
+    assert registry == []
@@ -0,0 +1,31 @@
+import asyncio
+
+from app.core.worker_runtime import WorkerRuntime
+
+
+def test_tasks_share_one_event_loop():
+    runtime = WorkerRuntime()
+
+    async def current_loop():
+        return asyncio.get_running_loop()
+
+    first = runtime.run(current_loop())
+    second = runtime.run(current_loop())
+    runtime.stop()
+
+    assert first is second
+
+
+def test_stop_runs_shutdown_hooks_and_closes_loop():
+    runtime = WorkerRuntime()
+    calls = []
+
+    async def hook():
+        calls.append("closed")
+
+    runtime.on_shutdown(hook)
+    loop = runtime.loop
+    runtime.stop()
+
+    assert calls == ["closed"]
+    assert loop.is_closed()
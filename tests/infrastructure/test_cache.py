@@ -0,0 +1,65 @@
+import pytest
+from unittest.mock import patch
+from app.infrastructure.services.cache import InMemoryCache, TieredCache
+
+
+@pytest.mark.asyncio
+async def test_get_returns_value_until_it_expires():
+    cache = InMemoryCache(ttl=10)
+    with patch("app.infrastructure.services.cache.time.monotonic", return_value=100.0):
+        await cache.set("offers:a|b|2025-01-01", "1:10:0:None", [{"id": 1}])
+        assert await cache.get("offers:a|b|2025-01-01", "1:10:0:None") == [{"id": 1}]
+
+    with patch("app.infrastructure.services.cache.time.monotonic", return_value=111.0):
+        assert await cache.get("offers:a|b|2025-01-01", "1:10:0:None") is None
+
+
+@pytest.mark.asyncio
+async def test_invalidate_drops_every_key_in_namespace_only():
+    cache = InMemoryCache(ttl=60)
+    await cache.set("offers:a|b|2025-01-01", "1", "one")
+    await cache.set("offers:a|b|2025-01-01", "2", "two")
+    await cache.set("offers:a|b|2025-01-02", "1", "other day")
+
+    await cache.invalidate("offers:a|b|2025-01-01")
+
+    assert await cache.get("offers:a|b|2025-01-01", "1") is None
+    assert await cache.get("offers:a|b|2025-01-01", "2") is None
+    assert await cache.get("offers:a|b|2025-01-02", "1") == "other day"
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_entry_is_evicted():
+    cache = InMemoryCache(ttl=60, max_entries=2)
+    await cache.set("ns", "a", 1)
+    await cache.set("ns", "b", 2)
+    await cache.get("ns", "a")
+    await cache.set("ns", "c", 3)
+
+    assert await cache.get("ns", "b") is None
+    assert await cache.get("ns", "a") == 1
+    assert await cache.get("ns", "c") == 3
+
+
+@pytest.mark.asyncio
+async def test_tiered_cache_fills_local_tier_from_shared():
+    local, shared = InMemoryCache(ttl=5), InMemoryCache(ttl=300)
+    cache = TieredCache(local, shared)
+    await shared.set("ns", "a", 1)
+
+    assert await cache.get("ns", "a") == 1
+    assert await local.get("ns", "a") == 1
+
+
+@pytest.mark.asyncio
+async def test_tiered_cache_writes_and_invalidates_both_tiers():
+    local, shared = InMemoryCache(ttl=5), InMemoryCache(ttl=300)
+    cache = TieredCache(local, shared)
+    await cache.set("ns", "a", 1)
+    assert await local.get("ns", "a") == 1
+    assert await shared.get("ns", "a") == 1
+
+    await cache.invalidate("ns")
+
+    assert await cache.get("ns", "a") is None
+    assert await shared.get("ns", "a") is None
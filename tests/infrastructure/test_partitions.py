@@ -0,0 +1,29 @@
+from datetime import date
+
+from app.infrastructure.connections.database.partitions import (
+    partition_name, partition_week, week_start, weeks_between,
+)
+
+
+def test_week_start_is_monday():
+    assert week_start(date(2025, 1, 1)) == date(2024, 12, 30)
+    assert week_start(date(2024, 12, 30)) == date(2024, 12, 30)
+    assert week_start(date(2025, 1, 5)) == date(2024, 12, 30)
+
+
+def test_partition_name_round_trips():
+    name = partition_name("ride_offers", date(2025, 1, 3))
+
+    assert name == "ride_offers_w20241230"
+    assert partition_week(name) == date(2024, 12, 30)
+
+
+def test_default_partition_has_no_week():
+    assert partition_week("ride_offers_default") is None
+
+
+def test_weeks_between_is_inclusive():
+    assert weeks_between(date(2025, 1, 1), date(2025, 1, 13)) == [
+        date(2024, 12, 30), date(2025, 1, 6), date(2025, 1, 13),
+    ]
+    assert weeks_between(date(2025, 1, 8), date(2025, 1, 5)) == []
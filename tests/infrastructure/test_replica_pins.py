@@ -0,0 +1,107 @@
+import uuid
+from datetime import date
+
+import pytest
+import redis.asyncio as redis
+from unittest.mock import AsyncMock, MagicMock
+
+from app.infrastructure.connections.database.replica import ReplicaPins
+from app.infrastructure.services.cache import InMemoryCache
+from app.representations.dtos.ride import RideOfferSearchDTO
+from app.services.ride_service import RideService
+
+
+@pytest.mark.asyncio
+async def test_pin_expires_after_window(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr("app.infrastructure.connections.database.replica.time.monotonic", lambda: clock[0])
+    pins = ReplicaPins(seconds=5)
+    user_id = uuid.uuid4()
+
+    await pins.pin(user_id)
+    assert await pins.is_pinned(user_id)
+    assert not await pins.is_pinned(uuid.uuid4())
+
+    clock[0] += 6
+    assert not await pins.is_pinned(user_id)
+
+
+@pytest.mark.asyncio
+async def test_pins_are_shared_through_redis():
+    client = MagicMock()
+    client.exists = AsyncMock(return_value=1)
+    pins = ReplicaPins(seconds=5, client=client)
+
+    # Pinned by another API worker: not known locally, found in Redis
+    assert await pins.is_pinned("other-worker-user")
+    client.exists.assert_awaited_once_with("gogogo:pin:other-worker-user")
+
+
+@pytest.mark.asyncio
+async def test_redis_error_reads_from_primary():
+    client = MagicMock()
+    client.exists = AsyncMock(side_effect=redis.ConnectionError("down"))
+    pins = ReplicaPins(seconds=5, client=client)
+
+    assert await pins.is_pinned("someone")
+
+
+@pytest.mark.asyncio
+async def test_driver_reads_own_writes_from_primary():
+    offer_repo = AsyncMock()
+    offer_repo.get_by_driver.return_value = []
+    pins = ReplicaPins(seconds=5)
+    service = RideService(AsyncMock(), offer_repo, AsyncMock(), AsyncMock(), AsyncMock(), replica_pins=pins)
+    driver_id, other_driver_id = uuid.uuid4(), uuid.uuid4()
+
+    await pins.pin(driver_id)
+    await service.get_driver_offers(driver_id)
+    await service.get_driver_offers(other_driver_id)
+
+    assert offer_repo.get_by_driver.await_args_list[0].kwargs == {"fields": None, "use_replica": False}
+    assert offer_repo.get_by_driver.await_args_list[1].kwargs == {"fields": None, "use_replica": True}
+
+
+@pytest.fixture
+def cached_search_service(location_resolver):
+    offer_repo = AsyncMock()
+    offer_repo.search_offers.return_value = []
+    pins = ReplicaPins(seconds=5)
+    service = RideService(
+        AsyncMock(), offer_repo, AsyncMock(), AsyncMock(), AsyncMock(),
+        search_cache=InMemoryCache(ttl=60), replica_pins=pins, location_resolver=location_resolver,
+    )
+    return service, offer_repo, pins
+
+
+SEARCH = RideOfferSearchDTO(start_location="A", end_location="B", seats_needed=1, start_time=date(2025, 1, 1))
+
+
+@pytest.mark.asyncio
+async def test_search_on_a_changed_route_reads_the_primary(cached_search_service):
+    service, offer_repo, _ = cached_search_service
+
+    # A = 3, B = 4 in the location_resolver fixture
+    await service._invalidate_searches("offers", (3, 4, date(2025, 1, 1)))
+    await service.search_ride_offers(SEARCH)
+    await service.search_ride_offers(SEARCH)
+
+    assert offer_repo.search_offers.await_count == 1
+    assert offer_repo.search_offers.await_args.kwargs["use_replica"] is False
+
+
+@pytest.mark.asyncio
+async def test_replica_read_racing_a_write_is_not_cached(cached_search_service):
+    service, offer_repo, pins = cached_search_service
+
+    async def written_during_read(**kwargs):
+        await pins.pin("offers:3|4|2025-01-01")
+        return []
+
+    offer_repo.search_offers.side_effect = written_during_read
+    await service.search_ride_offers(SEARCH)
+    assert offer_repo.search_offers.await_args.kwargs["use_replica"] is True
+
+    offer_repo.search_offers.side_effect = None
+    await service.search_ride_offers(SEARCH)
+    assert offer_repo.search_offers.await_count == 2
@@ -0,0 +1,181 @@
+import uuid
+from datetime import date, time
+
+import pytest
+from sqlalchemy import create_engine, literal, select
+from sqlalchemy.dialects import postgresql
+
+from app.infrastructure.repositories.ride import RideOfferRepository, RideRequestRepository, CarPhotoRepository, within_radius
+from app.infrastructure.repositories.user import TelegramUserRepository
+from app.representations.dtos.ride import RideOfferDTO, RideRequestDTO
+
+
+class _Result:
+    def scalars(self):
+        return self
+
+    def scalar_one(self):
+        return ""
+
+    def all(self):
+        return []
+
+    def first(self):
+        return None
+
+    def scalar_one_or_none(self):
+        return None
+
+
+class _CapturingSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return _Result()
+
+
+def _cache_keys(session):
+    return [s._generate_cache_key() for s in session.statements]
+
+
+@pytest.mark.asyncio
+async def test_offer_statements_share_cache_key_across_parameters():
+    session = _CapturingSession()
+    repo = RideOfferRepository(session)
+
+    await repo.get_by_id(uuid.uuid4())
+    await repo.get_by_id(uuid.uuid4())
+    await repo.search_offers(1, 2, 1, date(2025, 1, 1))
+    await repo.search_offers(7, 9, 3, date(2025, 2, 1), limit=20, offset=40, start_time=time(9, 0))
+
+    first_get, second_get, first_search, second_search = _cache_keys(session)
+    assert first_get.key == second_get.key
+    assert first_search.key == second_search.key
+    # Same SQL, different bound values
+    first_params, second_params = (s.compile().params for s in session.statements[2:])
+    assert 1 in first_params.values() and 7 in second_params.values()
+
+
+@pytest.mark.asyncio
+async def test_cursor_page_is_a_distinct_cached_statement():
+    session = _CapturingSession()
+    repo = RideRequestRepository(session)
+
+    await repo.search_requests(1, 2, date(2025, 1, 1))
+    await repo.search_requests(1, 2, date(2025, 1, 1), after=(date(2025, 1, 1), time(10, 0), uuid.uuid4()))
+    await repo.search_requests(2, 1, date(2025, 1, 2), after=(date(2025, 1, 2), time(8, 0), uuid.uuid4()))
+
+    offset_page, cursor_page, other_cursor_page = _cache_keys(session)
+    assert offset_page.key != cursor_page.key
+    assert cursor_page.key == other_cursor_page.key
+
+
+@pytest.mark.asyncio
+async def test_telegram_lookup_binds_the_id():
+    session = _CapturingSession()
+
+    await TelegramUserRepository(session).find_by_telegram_id(42)
+
+    compiled = session.statements[0].compile()
+    assert 42 in compiled.params.values()
+
+
+@pytest.mark.asyncio
+async def test_search_binds_partition_key_range():
+    session = _CapturingSession()
+
+    await RideRequestRepository(session).search_requests(1, 2, date(2025, 1, 1))
+
+    params = session.statements[0].compile().params.values()
+    # The 2-day request window covers three travel dates
+    assert date(2025, 1, 1) in params and date(2025, 1, 3) in params
+
+
+@pytest.mark.asyncio
+async def test_listings_select_only_the_response_columns():
+    session = _CapturingSession()
+    offers, requests = RideOfferRepository(session), RideRequestRepository(session)
+
+    await offers.search_offers(1, 2, 1, date(2025, 1, 1))
+    await offers.get_by_driver(uuid.uuid4())
+    await requests.search_requests(1, 2, date(2025, 1, 1))
+    await requests.get_by_passenger(uuid.uuid4())
+
+    expected = [set(RideOfferDTO.model_fields)] * 2 + [set(RideRequestDTO.model_fields)] * 2
+    assert [{c.key for c in s.selected_columns} for s in session.statements] == expected
+    for statement in session.statements:
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        assert "JOIN" not in sql
+
+
+@pytest.mark.asyncio
+async def test_sparse_fields_narrow_the_select():
+    session = _CapturingSession()
+    offers = RideOfferRepository(session)
+
+    await offers.search_offers(1, 2, 1, date(2025, 1, 1), fields=("price",))
+    await offers.search_offers(1, 2, 1, date(2025, 1, 1), fields=("car_model",))
+    await offers.search_offers(1, 2, 1, date(2025, 1, 1), fields=("price",))
+
+    price, car_model, price_again = session.statements
+    assert [c.key for c in price.selected_columns] == ["travel_start_date", "travel_start_time", "id", "price"]
+    assert [c.key for c in car_model.selected_columns][-1] == "car_model"
+    # Each fieldset is its own cached statement
+    keys = _cache_keys(session)
+    assert keys[0].key != keys[1].key and keys[0].key == keys[2].key
+
+
+@pytest.mark.asyncio
+async def test_listing_versions_filter_like_their_listings():
+    session = _CapturingSession()
+    driver_id = uuid.uuid4()
+    offers = RideOfferRepository(session)
+
+    await offers.get_by_driver(driver_id)
+    await offers.get_driver_version(driver_id)
+    await CarPhotoRepository(session).get_driver_version(driver_id)
+
+    listing, version, photos = (str(s.compile(dialect=postgresql.dialect())) for s in session.statements)
+    assert listing.split("WHERE")[1].split("ORDER BY")[0].strip() == version.split("WHERE")[1].strip()
+    assert "md5(coalesce(string_agg(" in version
+    assert "ORDER BY ride_offers.id" in version
+    assert "WHERE car_photos.driver_id = " in photos
+
+
+@pytest.mark.asyncio
+async def test_reservation_is_one_conditional_update():
+    session = _CapturingSession()
+
+    await RideOfferRepository(session).reserve_seats(uuid.uuid4(), uuid.uuid4(), 2)
+
+    sql = str(session.statements[0].compile(dialect=postgresql.dialect()))
+    # Decrement and check happen in the database, in the same statement as the booking insert
+    assert len(session.statements) == 1
+    assert "UPDATE ride_offers SET free_seats=(ride_offers.free_seats - " in sql
+    assert "ride_offers.free_seats >= " in sql
+    assert "INSERT INTO ride_bookings" in sql
+
+
+@pytest.mark.asyncio
+async def test_nearby_search_prunes_by_cell_before_the_exact_distance():
+    session = _CapturingSession()
+
+    await RideOfferRepository(session).search_offers_nearby(
+        (42.8746, 74.5698), (40.5283, 72.7985), 5.0, 1, date(2025, 1, 1)
+    )
+
+    sql = str(session.statements[0].compile(dialect=postgresql.dialect()))
+    assert "ride_offers.start_cell IN (__[POSTCOMPILE_start_cell_1])" in sql
+    assert "ride_offers.end_cell IN (__[POSTCOMPILE_end_cell_1])" in sql
+    assert "sin(radians(ride_offers.start_lat - " in sql
+
+
+@pytest.mark.parametrize(("lat", "within"), [(42.8746 + 0.0440, True), (42.8746 + 0.0460, False)])
+def test_within_radius_matches_haversine(lat, within):
+    # 0.0440 and 0.0460 degrees due north are about 4.89 and 5.12 km
+    engine = create_engine("sqlite://")
+    with engine.connect() as conn:
+        result = conn.execute(select(within_radius(literal(lat), literal(74.5698), (42.8746, 74.5698), 5.0)))
+        assert bool(result.scalar_one()) is within
@@ -0,0 +1,65 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from app.infrastructure.services.webhook import WebhookDispatcher, HostRateLimiter
+
+
+@pytest.mark.asyncio
+async def test_post_many_caps_requests_in_flight():
+    in_flight = 0
+    peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200)
+
+    dispatcher = WebhookDispatcher(max_concurrency=3, transport=httpx.MockTransport(handler))
+    results = await dispatcher.post_many("http://bot/webhook", [{"n": i} for i in range(10)])
+    await dispatcher.close()
+
+    assert [r.status_code for r in results] == [200] * 10
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_post_many_returns_errors_in_place():
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.content == b'{"n":1}':
+            raise httpx.ConnectError("boom")
+        return httpx.Response(200)
+
+    dispatcher = WebhookDispatcher(transport=httpx.MockTransport(handler))
+    results = await dispatcher.post_many("http://bot/webhook", [{"n": 0}, {"n": 1}])
+    await dispatcher.close()
+
+    assert results[0].status_code == 200
+    assert isinstance(results[1], httpx.ConnectError)
+
+
+@pytest.mark.asyncio
+async def test_host_rate_limiter_spaces_requests():
+    limiter = HostRateLimiter(rate=50, burst=1)
+    started = time.monotonic()
+    for _ in range(5):
+        await limiter.acquire()
+
+    assert time.monotonic() - started >= 4 / 50 * 0.9
+
+
+def test_client_from_previous_loop_is_closed():
+    dispatcher = WebhookDispatcher(transport=httpx.MockTransport(lambda request: httpx.Response(200)))
+
+    asyncio.run(dispatcher.post("http://bot/webhook", {"n": 0}))
+    first = dispatcher._client
+    asyncio.run(dispatcher.post("http://bot/webhook", {"n": 1}))
+
+    assert first.is_closed
+    assert dispatcher._client is not first
+    assert not dispatcher._client.is_closed
+    asyncio.run(dispatcher.close())
@@ -0,0 +1,75 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.representations.compression import CompressionMiddleware, negotiate
+
+ROWS = [{"id": i, "start_location": "Bishkek", "end_location": "Osh", "price": 1500} for i in range(200)]
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    @app.get("/rides")
+    async def rides():
+        return ROWS
+
+    @app.get("/small")
+    async def small():
+        return {"status": "ok"}
+
+    return TestClient(app)
+
+
+@pytest.mark.parametrize(("header", "expected"), [
+    ("gzip, deflate, br", "br"),
+    ("gzip;q=1.0, br;q=0.5", "gzip"),
+    ("br;q=0, gzip", "gzip"),
+    ("*", "br"),
+    ("deflate", None),
+    ("", None),
+])
+def test_negotiate_prefers_by_q_value_then_server_order(header, expected):
+    assert negotiate(header, ("br", "gzip")) == expected
+
+
+def test_large_response_is_gzipped(client):
+    response = client.get("/rides", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert int(response.headers["content-length"]) < len(json.dumps(ROWS)) // 4
+    # The test client decodes transparently
+    assert response.json() == ROWS
+
+
+def test_small_response_is_sent_as_is(client):
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.json() == {"status": "ok"}
+
+
+def test_response_is_not_compressed_unless_accepted(client):
+    response = client.get("/rides", headers={"Accept-Encoding": "identity"})
+
+    assert "content-encoding" not in response.headers
+
+
+def test_large_response_is_brotli_when_preferred(client):
+    pytest.importorskip("brotli")
+
+    response = client.get("/rides", headers={"Accept-Encoding": "br, gzip"})
+
+    assert response.headers["content-encoding"] == "br"
+    assert response.json() == ROWS
+
+
+def test_gzip_is_offered_without_brotli(monkeypatch):
+    monkeypatch.setattr("app.representations.compression.brotli", None)
+
+    assert CompressionMiddleware(FastAPI()).encodings == ("gzip",)
@@ -0,0 +1,44 @@
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.infrastructure.dependencies.providers import get_live_feed
+from app.representations.api.v1 import feed as feed_api
+
+
+@pytest.fixture
+def sessions(monkeypatch, in_memory_locations):
+    opened = []
+
+    @asynccontextmanager
+    async def session_maker():
+        opened.append("open")
+        yield object()
+        opened[-1] = "closed"
+
+    repo = in_memory_locations("Bishkek", "Osh")
+    monkeypatch.setattr(feed_api, "async_session_maker", session_maker)
+    monkeypatch.setattr(feed_api, "LocationRepository", lambda session: repo)
+    monkeypatch.setattr("app.services.locations._resolved", {})
+    return opened
+
+
+@pytest.mark.asyncio
+async def test_route_is_resolved_in_a_session_closed_before_streaming(sessions):
+    start, end = await feed_api._find_route("Бишкек", "Osh")
+
+    assert (start.name, end.name) == ("Bishkek", "Osh")
+    assert sessions == ["closed"]
+
+
+def test_unknown_route_is_not_found(sessions):
+    app = FastAPI()
+    app.include_router(feed_api.router)
+    app.dependency_overrides[get_live_feed] = lambda: None
+
+    response = TestClient(app).get("/feed/routes", params={"start_location": "Bishkek", "end_location": "Tokmok"})
+
+    assert response.status_code == 404
+    assert sessions == ["closed"]
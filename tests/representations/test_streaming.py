@@ -0,0 +1,124 @@
+import asyncio
+import json
+import uuid
+from datetime import date, time
+
+import pytest
+from app.representations.dtos.ride import RideRequestDTO, RideRequestListAdapter
+from app.representations.responses import (
+    stream_models, list_response, IfNoneMatch, etag, not_modified, NDJSON_MEDIA_TYPE,
+    server_sent_events, event_stream, EVENT_STREAM_MEDIA_TYPE,
+)
+from app.representations.api.v1.rides import set_next_cursor
+from app.domain.models.ride import RequestSource
+
+
+async def rides(count: int):
+    for i in range(count):
+        yield RideRequestDTO(
+            id=uuid.uuid4(),
+            passenger_id=uuid.uuid4(),
+            travel_start_date=date(2025, 1, 1),
+            travel_start_time=time(10, i % 60),
+            start_location="bishkek",
+            end_location="osh",
+            request_source=RequestSource.telegram_app,
+            seat_amount="1",
+        )
+
+
+async def read_body(response) -> bytes:
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+
+@pytest.mark.asyncio
+async def test_streams_json_array_by_default():
+    response = stream_models(rides(3), "application/json")
+
+    body = json.loads(await read_body(response))
+
+    assert response.media_type == "application/json"
+    assert len(body) == 3
+    assert body[0]["start_location"] == "bishkek"
+
+
+@pytest.mark.asyncio
+async def test_streams_empty_json_array():
+    response = stream_models(rides(0), None)
+
+    assert json.loads(await read_body(response)) == []
+
+
+@pytest.mark.asyncio
+async def test_streams_ndjson_when_requested():
+    response = stream_models(rides(1000), NDJSON_MEDIA_TYPE)
+
+    chunks = [chunk async for chunk in response.body_iterator]
+    lines = b"".join(chunks).splitlines()
+
+    assert response.media_type == NDJSON_MEDIA_TYPE
+    assert len(lines) == 1000
+    assert len(chunks) > 1
+    assert json.loads(lines[-1])["seat_amount"] == "1"
+
+
+@pytest.mark.asyncio
+async def test_list_response_matches_per_model_serialization():
+    page = [ride async for ride in rides(3)]
+
+    response = list_response(page, RideRequestListAdapter)
+    set_next_cursor(response, page, limit=3)
+
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == [ride.model_dump(mode="json") for ride in page]
+    # Headers go on the returned response itself
+    assert "x-next-cursor" in response.headers
+
+
+@pytest.mark.parametrize(("header", "matches"), [
+    ('W/"abc"', True),
+    ('"abc"', True),
+    ('W/"old", W/"abc"', True),
+    ("*", True),
+    ('W/"old"', False),
+    (None, False),
+])
+def test_if_none_match_compares_weakly(header, matches):
+    assert ("abc" in IfNoneMatch(header)) is matches
+
+
+def test_not_modified_repeats_the_etag():
+    response = not_modified("abc")
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag("abc") == 'W/"abc"'
+    assert response.body == b""
+
+
+@pytest.mark.asyncio
+async def test_frames_server_sent_events_until_none():
+    queue = asyncio.Queue()
+    for event in ({"type": "offer_created", "offer": {"id": "1"}}, {"n": 2}, None):
+        queue.put_nowait(event)
+
+    frames = [frame async for frame in server_sent_events(queue, heartbeat=1)]
+
+    assert frames == [
+        b'event: offer_created\ndata: {"type": "offer_created", "offer": {"id": "1"}}\n\n',
+        b'event: message\ndata: {"n": 2}\n\n',
+    ]
+
+
+@pytest.mark.asyncio
+async def test_sends_keep_alive_when_idle():
+    events = server_sent_events(asyncio.Queue(), heartbeat=0.01)
+
+    assert await anext(events) == b": keep-alive\n\n"
+    await events.aclose()
+
+
+def test_event_stream_is_not_buffered():
+    response = event_stream(server_sent_events(asyncio.Queue(), heartbeat=1))
+
+    assert response.media_type == EVENT_STREAM_MEDIA_TYPE
+    assert response.headers["x-accel-buffering"] == "no"
@@ -0,0 +1,35 @@
+from datetime import date
+from unittest.mock import MagicMock
+
+from app.services.coalescing import RouteCoalescer
+
+
+def make_coalescer(pipeline_results):
+    client = MagicMock()
+    client.pipeline.return_value.execute.side_effect = pipeline_results
+    return RouteCoalescer(client, window=2.0), client
+
+
+def test_group_key_normalizes_route():
+    key = RouteCoalescer.group_key("offer", " Bishkek", "OSH ", date(2025, 1, 1))
+
+    assert key == "offer:bishkek|osh|2025-01-01"
+
+
+def test_first_ride_schedules_the_flush():
+    coalescer, client = make_coalescer([[1, True, True], [1, True, None]])
+
+    assert coalescer.add("offer:a|b|2025-01-01", "id-1") is True
+    assert coalescer.add("offer:a|b|2025-01-01", "id-2") is False
+    pipe = client.pipeline.return_value
+    pipe.set.assert_called_with("gogogo:coalesce:scheduled:offer:a|b|2025-01-01", 1, nx=True, ex=30)
+
+
+def test_drain_returns_members_and_reopens_group():
+    coalescer, client = make_coalescer([[{b"id-2", b"id-1"}, 2]])
+
+    assert coalescer.drain("offer:a|b|2025-01-01") == ["id-1", "id-2"]
+    client.pipeline.return_value.delete.assert_called_once_with(
+        "gogogo:coalesce:pending:offer:a|b|2025-01-01",
+        "gogogo:coalesce:scheduled:offer:a|b|2025-01-01",
+    )
@@ -0,0 +1,110 @@
+import asyncio
+import json
+
+import pytest
+
+from app.services import feed as feed_module
+from app.services.feed import FeedHub, FeedPublisher, route_channel, user_channel
+
+
+class FakePubSub:
+    """Delivers whatever is put on `messages` as pattern messages, like redis.asyncio's PubSub."""
+
+    def __init__(self, messages: asyncio.Queue):
+        self.messages = messages
+        self.patterns = []
+        self.closed = False
+
+    async def psubscribe(self, pattern):
+        self.patterns.append(pattern)
+
+    async def listen(self):
+        while True:
+            yield await self.messages.get()
+
+    async def aclose(self):
+        self.closed = True
+
+
+class FakeRedis:
+    def __init__(self):
+        self.messages = asyncio.Queue()
+        self.pubsubs = []
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        pubsub = FakePubSub(self.messages)
+        self.pubsubs.append(pubsub)
+        return pubsub
+
+    def push(self, channel: str, data):
+        self.messages.put_nowait({"channel": channel.encode(), "data": data})
+
+
+@pytest.fixture
+async def hub():
+    hub = FeedHub(FakeRedis(), prefix="feed", queue_size=2)
+    yield hub
+    if hub._listener:
+        hub._listener.cancel()
+
+
+def test_channel_names():
+    assert user_channel("42") == "user:42"
+    assert route_channel(1, 2) == "route:1|2"
+
+
+async def test_relays_events_to_subscribers_of_their_channel(hub):
+    async with hub.subscribe("user:1") as mine, hub.subscribe("user:2") as other:
+        hub._client.push("feed:user:1", json.dumps({"type": "new_offers_found"}))
+
+        assert await asyncio.wait_for(mine.get(), 1) == {"type": "new_offers_found"}
+        assert other.empty()
+        assert hub._client.pubsubs[0].patterns == ["feed:*"]
+
+
+async def test_one_subscription_per_process(hub):
+    async with hub.subscribe("user:1"), hub.subscribe("route:1|2"), hub.subscribe("route:1|2"):
+        await asyncio.sleep(0)
+
+        assert len(hub._client.pubsubs) == 1
+        assert hub.subscribers == 3
+
+
+async def test_skips_malformed_events(hub):
+    async with hub.subscribe("user:1") as queue:
+        hub._client.push("feed:user:1", b"not json")
+        hub._client.push("feed:user:1", json.dumps({"type": "ok"}))
+
+        assert await asyncio.wait_for(queue.get(), 1) == {"type": "ok"}
+
+
+async def test_ends_the_stream_of_a_slow_client(hub):
+    before = feed_module.slow_clients.value()
+    async with hub.subscribe("route:1|2") as queue:
+        for i in range(3):
+            hub.dispatch("route:1|2", {"type": "offer_created", "n": i})
+
+        assert await queue.get() is None
+        assert hub.subscribers == 0
+        assert feed_module.slow_clients.value() == before + 1
+
+        hub.dispatch("route:1|2", {"type": "offer_created"})
+        assert queue.empty()
+
+
+async def test_unsubscribes_on_exit(hub):
+    async with hub.subscribe("user:1", "route:1|2"):
+        assert hub.subscribers == 1
+
+    assert hub.subscribers == 0
+    assert hub._queues == {}
+
+
+def test_publisher_prefixes_the_channel(monkeypatch):
+    published = []
+    publisher = FeedPublisher("redis://localhost:6379/0", "feed")
+    monkeypatch.setattr(publisher, "_client", type("Client", (), {"publish": lambda self, *args: published.append(args)})())
+
+    publisher.publish(user_channel("42"), {"type": "new_offers_found"})
+
+    assert published == [("feed:user:42", '{"type": "new_offers_found"}')]
@@ -0,0 +1,56 @@
+import pytest
+
+from app.services.locations import LocationResolver
+
+
+@pytest.mark.asyncio
+async def test_spellings_of_one_city_resolve_to_one_id(in_memory_locations):
+    resolver = LocationResolver(in_memory_locations("Bishkek"), cache={})
+
+    ids = {(await resolver.find(text)).id for text in ("Bishkek", "бишкек", " BISHKEK ", "Bishkke")}
+
+    assert ids == {1}
+
+
+@pytest.mark.asyncio
+async def test_unknown_place_is_not_found_until_created(in_memory_locations):
+    resolver = LocationResolver(in_memory_locations("Bishkek"), cache={})
+
+    assert await resolver.find("Tokmok") is None
+    created = await resolver.get_or_create("tokmok ")
+
+    assert (created.id, created.name) == (2, "tokmok")
+    assert await resolver.find("TOKMOK") == created
+
+
+@pytest.mark.asyncio
+async def test_created_locations_are_shared_only_after_commit(in_memory_locations):
+    shared = {}
+    resolver = LocationResolver(in_memory_locations(), cache=shared)
+
+    created = await resolver.get_or_create("Tokmok")
+    assert shared == {}
+
+    resolver.committed()
+    assert list(shared.values()) == [created]
+
+
+@pytest.mark.asyncio
+async def test_cached_locations_skip_the_repository(in_memory_locations):
+    shared = {}
+    repo = in_memory_locations("Osh")
+    await LocationResolver(repo, cache=shared).find("Osh")
+    repo.by_key.clear()
+
+    assert (await LocationResolver(repo, cache=shared).find("ош")).id == 1
+
+
+@pytest.mark.asyncio
+async def test_known_place_is_not_corrected_into_a_listed_city(in_memory_locations):
+    repo = in_memory_locations("Balykchy")
+    repo.by_key["balykchi"] = (2, "Balykchi")
+    resolver = LocationResolver(repo, cache={})
+
+    assert (await resolver.find("Balykchi")).id == 2
+    assert (await resolver.find("Balykchy")).id == 1
+    assert (await resolver.find("Balykchu")).id == 1
@@ -0,0 +1,58 @@
+import uuid
+from datetime import time, timedelta
+from types import SimpleNamespace
+
+from app.services import tasks
+from app.services.matching import MatchingIndex
+from tests.services.test_matching_index import TODAY, make_offer
+
+
+def make_request(at, seat_amount="1"):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        passenger_id=uuid.uuid4(),
+        travel_start_date=TODAY,
+        travel_start_time=at,
+        start_location="bishkek",
+        end_location="osh",
+        seat_amount=seat_amount,
+    )
+
+
+async def test_grouped_requests_search_their_own_windows(monkeypatch):
+    index = MatchingIndex()
+    early = [make_offer(at=time(6, minute)) for minute in range(0, 60, 5)]
+    late = make_offer(at=time(23, 30))
+    after_midnight = make_offer(day=TODAY + timedelta(days=1), at=time(0, 30))
+    for offer in (*early, late, after_midnight):
+        index.upsert_offer(offer)
+
+    sent = []
+
+    async def load_driver_details(session, driver_ids):
+        return {d: {} for d in driver_ids}
+
+    async def load_telegram_users(session, user_ids):
+        return {}
+
+    async def send_webhooks(url, payloads):
+        sent.extend(payloads)
+
+    async def ensure_matching_index(service):
+        return index
+
+    monkeypatch.setattr(tasks, "ensure_matching_index", ensure_matching_index)
+    monkeypatch.setattr(tasks, "_load_driver_details", load_driver_details)
+    monkeypatch.setattr(tasks, "_load_telegram_users", load_telegram_users)
+    monkeypatch.setattr(tasks, "_send_webhooks", send_webhooks)
+    monkeypatch.setattr(tasks.notification_settings, "BOT_WEBHOOK_URL", "http://bot/webhook")
+    monkeypatch.setattr(tasks, "publish_feed_events", lambda events: None)
+
+    morning = [make_request(time(6, 0)), make_request(time(6, 0))]
+    night = make_request(time(22, 0))
+    await tasks._match_requests(None, None, [*morning, night])
+
+    matches = {p["request_id"]: [m["id"] for m in p["matches"]] for p in sent}
+    for req in morning:
+        assert matches[str(req.id)] == [str(o.id) for o in early[:tasks.MATCH_LIMIT]]
+    assert matches[str(night.id)] == [str(late.id), str(after_midnight.id)]
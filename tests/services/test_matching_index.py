@@ -0,0 +1,169 @@
+import uuid
+from datetime import date, time, timedelta, datetime, timezone
+
+import pytest
+from unittest.mock import AsyncMock
+from app.services.matching import MatchingIndex, upsert_event, remove_event
+from app.representations.dtos.ride import RideOfferDTO, RideRequestDTO
+from app.domain.models.ride import RequestSource
+
+
+TODAY = datetime.now(timezone.utc).date()
+
+
+def make_offer(start="bishkek", end="osh", day=TODAY, at=time(10, 0), free_seats=3):
+    return RideOfferDTO(
+        id=uuid.uuid4(),
+        driver_id=uuid.uuid4(),
+        travel_start_date=day,
+        travel_start_time=at,
+        start_location=start,
+        end_location=end,
+        request_source=RequestSource.telegram_app,
+        car_model="Toyota",
+        total_seat_amount=4,
+        free_seats=free_seats,
+    )
+
+
+def make_request(start="bishkek", end="osh", day=TODAY, at=time(10, 0)):
+    return RideRequestDTO(
+        id=uuid.uuid4(),
+        passenger_id=uuid.uuid4(),
+        travel_start_date=day,
+        travel_start_time=at,
+        start_location=start,
+        end_location=end,
+        request_source=RequestSource.telegram_app,
+        seat_amount="1",
+    )
+
+
+@pytest.fixture
+def index():
+    return MatchingIndex()
+
+
+def test_match_requests_spans_window_in_date_time_order(index):
+    late = make_request(day=TODAY + timedelta(days=1), at=time(8, 0))
+    early = make_request(at=time(18, 0))
+    earliest = make_request(at=time(6, 0))
+    outside = make_request(day=TODAY + timedelta(days=3))
+    other_route = make_request(end="naryn")
+    for r in (late, early, earliest, outside, other_route):
+        index.upsert_request(r)
+
+    matches = index.match_requests("Bishkek ", "osh", TODAY)
+
+    assert [m.id for m in matches] == [earliest.id, early.id, late.id]
+
+
+def test_match_offers_same_day_and_seats(index):
+    enough = make_offer(free_seats=2)
+    too_few = make_offer(free_seats=1)
+    next_day = make_offer(day=TODAY + timedelta(days=1))
+    for o in (enough, too_few, next_day):
+        index.upsert_offer(o)
+
+    matches = index.match_offers("bishkek", "osh", TODAY, seats_needed=2)
+
+    assert [m.id for m in matches] == [enough.id]
+
+
+def test_match_offers_within_time_window_across_midnight(index):
+    before = make_offer(at=time(21, 0))
+    inside = make_offer(at=time(23, 30))
+    after_midnight = make_offer(day=TODAY + timedelta(days=1), at=time(1, 0))
+    too_late = make_offer(day=TODAY + timedelta(days=1), at=time(2, 0))
+    for o in (before, inside, after_midnight, too_late):
+        index.upsert_offer(o)
+
+    matches = index.match_offers("bishkek", "osh", TODAY, 1, start_time=time(22, 0))
+
+    assert [m.id for m in matches] == [inside.id, after_midnight.id]
+
+
+def test_match_respects_limit(index):
+    for hour in range(12):
+        index.upsert_offer(make_offer(at=time(hour, 0)))
+
+    assert len(index.match_offers("bishkek", "osh", TODAY, 1, limit=10)) == 10
+
+
+def test_upsert_moves_ride_between_buckets(index):
+    offer = make_offer()
+    index.upsert_offer(offer)
+    moved = offer.model_copy(update={"end_location": "naryn"})
+
+    index.upsert_offer(moved)
+
+    assert index.match_offers("bishkek", "osh", TODAY, 1) == []
+    assert [m.id for m in index.match_offers("bishkek", "naryn", TODAY, 1)] == [offer.id]
+    assert len(index.offers) == 1
+
+
+def test_apply_events(index):
+    offer = make_offer()
+    index.apply(upsert_event("offer", offer))
+    assert len(index.offers) == 1
+
+    index.apply(remove_event("offer", offer.id))
+    assert len(index.offers) == 0
+    assert index.match_offers("bishkek", "osh", TODAY, 1) == []
+
+
+def test_past_rides_are_pruned(index):
+    index.upsert_request(make_request(day=TODAY - timedelta(days=1)))
+
+    assert index.match_requests("bishkek", "osh", TODAY - timedelta(days=1)) == []
+    assert len(index.requests) == 0
+
+
+@pytest.mark.asyncio
+async def test_load_from_repositories(index):
+    offer_repo, request_repo = AsyncMock(), AsyncMock()
+    offer_repo.get_active_offers.return_value = [make_offer()]
+    request_repo.get_active_requests.return_value = [make_request(), make_request()]
+
+    await index.load(offer_repo, request_repo)
+
+    assert index.loaded
+    assert len(index.offers) == 1
+    assert len(index.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_changes_during_load_are_replayed_over_the_snapshot(index):
+    removed, booked = make_offer(), make_offer(free_seats=3)
+    offer_repo, request_repo = AsyncMock(), AsyncMock()
+
+    async def snapshot():
+        # The bus delivers these while the rows are still being read
+        index.apply(remove_event("offer", removed.id))
+        index.apply(upsert_event("offer", booked.model_copy(update={"free_seats": 1})))
+        return [removed, booked]
+
+    offer_repo.get_active_offers.side_effect = snapshot
+    request_repo.get_active_requests.return_value = []
+
+    await index.load(offer_repo, request_repo)
+
+    assert [m.id for m in index.match_offers("bishkek", "osh", TODAY, 1)] == [booked.id]
+    assert index.match_offers("bishkek", "osh", TODAY, 2) == []
+
+
+@pytest.mark.asyncio
+async def test_load_invalidated_midway_is_discarded(index):
+    offer_repo, request_repo = AsyncMock(), AsyncMock()
+
+    async def snapshot():
+        index.invalidate()
+        return [make_offer()]
+
+    offer_repo.get_active_offers.side_effect = snapshot
+    request_repo.get_active_requests.return_value = []
+
+    await index.load(offer_repo, request_repo)
+
+    assert not index.loaded
+    assert len(index.offers) == 0
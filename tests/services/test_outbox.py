@@ -0,0 +1,96 @@
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.services import outbox as outbox_module
+from app.services.outbox import OutboxRelay
+
+
+class InMemoryOutbox:
+    """Stands in for OutboxRepository over a shared list of messages."""
+
+    def __init__(self, messages):
+        self.messages = messages
+        self.failures = {}
+
+    async def claim(self, limit):
+        return self.messages[:limit]
+
+    async def delete(self, message_ids):
+        self.messages[:] = [m for m in self.messages if m.id not in message_ids]
+
+    async def record_failure(self, message_id, error):
+        self.failures[message_id] = error
+
+
+@pytest.fixture
+def outbox(monkeypatch):
+    store = InMemoryOutbox([SimpleNamespace(id=i, task=f"task{i}", args=[i]) for i in range(1, 4)])
+    monkeypatch.setattr(outbox_module, "OutboxRepository", lambda session: store)
+    return store
+
+
+@pytest.fixture
+def session():
+    return AsyncMock()
+
+
+def relay(session, publish, batch_size=100):
+    @asynccontextmanager
+    async def session_maker():
+        yield session
+
+    return OutboxRelay(session_maker, publish, batch_size=batch_size)
+
+
+@pytest.mark.asyncio
+async def test_relay_publishes_and_deletes_a_batch(outbox, session):
+    published = []
+
+    assert await relay(session, lambda task, args: published.append((task, args)), batch_size=2).relay_batch() == (2, False)
+
+    assert published == [("task1", [1]), ("task2", [2])]
+    assert [m.id for m in outbox.messages] == [3]
+    session.commit.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_broker_failure_keeps_the_message_and_the_rest(outbox, session):
+    def publish(task, args):
+        if task == "task2":
+            raise ConnectionError("broker down")
+
+    assert await relay(session, publish).relay_batch() == (1, True)
+
+    # Only what the broker accepted is gone; the failure is kept on the row for the next pass
+    assert [m.id for m in outbox.messages] == [2, 3]
+    assert outbox.failures == {2: "ConnectionError: broker down"}
+    session.commit.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_run_drains_the_outbox_until_stopped(outbox, session):
+    stop, published = asyncio.Event(), []
+
+    def publish(task, args):
+        published.append(task)
+        if not outbox.messages[1:]:
+            stop.set()
+
+    await asyncio.wait_for(relay(session, publish, batch_size=1).run(poll_interval=10, stop=stop), 1)
+
+    assert published == ["task1", "task2", "task3"]
+
+
+def test_outboxed_tasks_are_registered():
+    from app.core.celery_app import celery_app
+    import app.services.tasks  # noqa: F401
+
+    for name in (
+        "process_ride_offer", "process_ride_offers", "evict_ride_offer", "refresh_ride_offer",
+        "process_ride_request", "process_ride_requests", "evict_ride_request",
+    ):
+        assert f"app.services.tasks.{name}" in celery_app.tasks
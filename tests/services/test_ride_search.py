@@ -3,8 +3,13 @@ from datetime import date, time
 import pytest
 from unittest.mock import AsyncMock, MagicMock
 from app.services.ride_service import RideService
-from app.representations.dtos.ride import RideOfferSearchDTO, RideRequestSearchDTO, RideOfferDTO, RideRequestDTO
+from pydantic import ValidationError
+from app.representations.dtos.ride import (
+    RideOfferSearchDTO, RideRequestSearchDTO, RideOfferDTO, RideRequestDTO, RideOfferNearbySearchDTO, CreateRideOfferDTO,
+    parse_fields
+)
 from app.domain.models.ride import RideOffer, RideRequest
+from app.utils.pagination import encode_cursor
 
 @pytest.fixture
 def mock_session():
@@ -28,8 +33,11 @@ def mock_media_service():
     return AsyncMock()
 
 @pytest.fixture
-def ride_service(mock_session, mock_offer_repo, mock_request_repo, mock_photo_repo, mock_media_service):
-    return RideService(mock_session, mock_offer_repo, mock_request_repo, mock_photo_repo, mock_media_service)
+def ride_service(mock_session, mock_offer_repo, mock_request_repo, mock_photo_repo, mock_media_service, location_resolver):
+    return RideService(
+        mock_session, mock_offer_repo, mock_request_repo, mock_photo_repo, mock_media_service,
+        location_resolver=location_resolver
+    )
 
 @pytest.mark.asyncio
 async def test_search_ride_offers(ride_service, mock_offer_repo):
@@ -62,12 +70,16 @@ async def test_search_ride_offers(ride_service, mock_offer_repo):
     assert result[0].start_location == "A"
     assert result[0].end_location == "B"
     mock_offer_repo.search_offers.assert_called_once_with(
-        start_location="A",
-        end_location="B",
+        start_location_id=3,
+        end_location_id=4,
         seats_needed=2,
         start_date=date(2025, 1, 1),
         limit=10,
-        offset=0
+        offset=0,
+        after=None,
+        start_time=None,
+        fields=None,
+        use_replica=False
     )
 
 @pytest.mark.asyncio
@@ -97,11 +109,15 @@ async def test_search_ride_requests(ride_service, mock_request_repo):
     assert len(result) == 1
     assert result[0].start_location == "X"
     mock_request_repo.search_requests.assert_called_once_with(
-        start_location="X",
-        end_location="Y",
+        start_location_id=5,
+        end_location_id=6,
         start_date=date(2025, 2, 1),
         limit=10,
-        offset=0
+        offset=0,
+        after=None,
+        start_time=None,
+        fields=None,
+        use_replica=False
     )
 
 @pytest.mark.asyncio
@@ -117,3 +133,98 @@ async def test_search_ride_offers_empty(ride_service, mock_offer_repo):
     result = await ride_service.search_ride_offers(dto)
     
     assert len(result) == 0
+
+@pytest.mark.asyncio
+async def test_search_to_unknown_location_skips_the_database(ride_service, mock_offer_repo):
+    dto = RideOfferSearchDTO(
+        start_location="A",
+        end_location="Nowhere",
+        seats_needed=1,
+        start_time=date(2025, 1, 1)
+    )
+
+    assert await ride_service.search_ride_offers(dto) == []
+    mock_offer_repo.search_offers.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_search_ride_offers_with_cursor(ride_service, mock_offer_repo):
+    last_id = uuid.uuid4()
+    cursor = encode_cursor(date(2025, 1, 1), time(10, 0), last_id)
+    dto = RideOfferSearchDTO(
+        start_location="A",
+        end_location="B",
+        seats_needed=1,
+        start_time=date(2025, 1, 1),
+        cursor=cursor
+    )
+    mock_offer_repo.search_offers.return_value = []
+
+    await ride_service.search_ride_offers(dto)
+
+    assert mock_offer_repo.search_offers.call_args.kwargs["after"] == (date(2025, 1, 1), time(10, 0), last_id)
+
+@pytest.mark.asyncio
+async def test_search_ride_requests_invalid_cursor(ride_service, mock_request_repo):
+    dto = RideRequestSearchDTO(
+        start_location="X",
+        end_location="Y",
+        start_time=date(2025, 2, 1),
+        cursor="not-a-cursor"
+    )
+
+    with pytest.raises(ValueError, match="Invalid pagination cursor"):
+        await ride_service.search_ride_requests(dto)
+    mock_request_repo.search_requests.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_search_ride_offers_nearby(ride_service, mock_offer_repo):
+    dto = RideOfferNearbySearchDTO(
+        start_lat=42.87, start_lon=74.57, end_lat=40.53, end_lon=72.8,
+        radius_km=3, seats_needed=2, start_time=date(2025, 1, 1)
+    )
+    mock_offer_repo.search_offers_nearby.return_value = []
+
+    assert await ride_service.search_ride_offers_nearby(dto) == []
+    mock_offer_repo.search_offers_nearby.assert_called_once_with(
+        start=(42.87, 74.57),
+        end=(40.53, 72.8),
+        radius_km=3,
+        seats_needed=2,
+        start_date=date(2025, 1, 1),
+        limit=10,
+        offset=0,
+        after=None,
+        start_time=None,
+        fields=None,
+        use_replica=False
+    )
+
+def test_ride_coordinates_come_in_pairs():
+    with pytest.raises(ValidationError, match="lat/lon pairs"):
+        CreateRideOfferDTO(
+            travel_start_date=date(2025, 1, 1), travel_start_time=time(10, 0),
+            start_location="A", end_location="B", request_source="mobile_app",
+            car_model="Toyota", total_seat_amount=4, free_seats=3,
+            start_lat=42.87
+        )
+
+
+def test_parse_fields_keeps_dto_order_and_rejects_unknown_names():
+    assert parse_fields(RideOfferDTO, "price, id,travel_start_time") == ("travel_start_time", "id", "price")
+    assert parse_fields(RideOfferDTO, None) is None
+    with pytest.raises(ValueError, match="Unknown fields: driver"):
+        parse_fields(RideOfferDTO, "id,driver")
+
+@pytest.mark.asyncio
+async def test_search_with_fields_returns_sparse_rows(ride_service, mock_offer_repo):
+    dto = RideOfferSearchDTO(start_location="A", end_location="B", seats_needed=1, start_time=date(2025, 1, 1))
+    row = MagicMock(id=uuid.uuid4(), travel_start_date=date(2025, 1, 1), travel_start_time=time(10, 0), price=1500)
+    mock_offer_repo.search_offers.return_value = [row]
+
+    result = await ride_service.search_ride_offers(dto, ("id", "price"))
+
+    assert mock_offer_repo.search_offers.await_args.kwargs["fields"] == ("id", "price")
+    # The cursor fields come along so the next page can still be requested
+    assert result[0].model_dump() == {
+        "id": row.id, "travel_start_date": date(2025, 1, 1), "travel_start_time": time(10, 0), "price": 1500
+    }
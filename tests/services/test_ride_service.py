@@ -4,6 +4,7 @@ from unittest.mock import AsyncMock, MagicMock
 from app.services.ride_service import RideService
 from app.representations.dtos.ride import CreateRideOfferDTO, CreateRideRequestDTO, RequestSource
 from app.domain.models.ride import RideOffer, RideRequest, CarPhoto
+from app.representations.responses import IfNoneMatch
 
 @pytest.fixture
 def mock_session():
@@ -28,11 +29,18 @@ def mock_media_service():
     return AsyncMock()
 
 @pytest.fixture
-def ride_service(mock_session, mock_offer_repo, mock_request_repo, mock_photo_repo, mock_media_service):
-    return RideService(mock_session, mock_offer_repo, mock_request_repo, mock_photo_repo, mock_media_service)
+def mock_outbox():
+    return AsyncMock()
+
+@pytest.fixture
+def ride_service(mock_session, mock_offer_repo, mock_request_repo, mock_photo_repo, mock_media_service, location_resolver, mock_outbox):
+    return RideService(
+        mock_session, mock_offer_repo, mock_request_repo, mock_photo_repo, mock_media_service,
+        location_resolver=location_resolver, outbox=mock_outbox
+    )
 
 @pytest.mark.asyncio
-async def test_create_ride_offer(ride_service, mock_offer_repo, mock_session):
+async def test_create_ride_offer(ride_service, mock_offer_repo, mock_session, mock_outbox):
     driver_id = uuid.uuid4()
     dto = CreateRideOfferDTO(
         travel_start_date="2025-01-01",
@@ -53,16 +61,20 @@ async def test_create_ride_offer(ride_service, mock_offer_repo, mock_session):
         **dto.model_dump()
     )
     mock_offer_repo.create.return_value = mock_offer
+    calls = []
+    mock_outbox.add.side_effect = lambda *args: calls.append(("outbox", *args))
+    mock_session.commit.side_effect = lambda: calls.append(("commit",))
     
     result = await ride_service.create_ride_offer(driver_id, dto)
     
     assert result.driver_id == driver_id
     assert result.car_model == "Toyota"
-    mock_offer_repo.create.assert_called_once()
-    mock_session.commit.assert_called_once()
+    mock_offer_repo.create.assert_called_once_with(driver_id, dto, 3, 4)
+    # Matching is queued in the ride's own transaction, so it commits (or not) with the ride
+    assert calls == [("outbox", "app.services.tasks.process_ride_offer", str(mock_offer.id)), ("commit",)]
 
 @pytest.mark.asyncio
-async def test_create_ride_request(ride_service, mock_request_repo, mock_session):
+async def test_create_ride_request(ride_service, mock_request_repo, mock_session, mock_outbox):
     passenger_id = uuid.uuid4()
     dto = CreateRideRequestDTO(
         travel_start_date="2025-01-01",
@@ -86,8 +98,9 @@ async def test_create_ride_request(ride_service, mock_request_repo, mock_session
     
     assert result.passenger_id == passenger_id
     assert result.seat_amount == "2"
-    mock_request_repo.create.assert_called_once()
+    mock_request_repo.create.assert_called_once_with(passenger_id, dto, 3, 4)
     mock_session.commit.assert_called_once()
+    mock_outbox.add.assert_called_once_with("app.services.tasks.process_ride_request", str(mock_request.id))
 
 @pytest.mark.asyncio
 async def test_upload_car_photo(ride_service, mock_media_service, mock_photo_repo, mock_session):
@@ -114,3 +127,126 @@ async def test_upload_car_photo(ride_service, mock_media_service, mock_photo_rep
     mock_media_service.upload_file.assert_called_once()
     mock_photo_repo.create.assert_called_once_with(driver_id, expected_url)
     mock_session.commit.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_create_ride_offers_bulk(ride_service, mock_offer_repo, mock_session, mock_outbox):
+    from app.representations.dtos.ride import BulkRideOfferItemDTO
+
+    items = [
+        BulkRideOfferItemDTO(
+            driver_id=uuid.uuid4(),
+            travel_start_date="2025-01-01",
+            travel_start_time="10:00:00",
+            start_location="бишкек",
+            end_location="Osh",
+            car_model="Toyota",
+            total_seat_amount=4,
+            free_seats=3,
+            request_source=RequestSource.telegram_app
+        )
+        for _ in range(3)
+    ]
+    ids = [uuid.uuid4() for _ in items]
+    mock_offer_repo.create_many.return_value = ids
+
+    result = await ride_service.create_ride_offers_bulk(items)
+
+    assert result == ids
+    assert all(item.start_location == "Bishkek" for item in items)
+    mock_offer_repo.create_many.assert_called_once_with(items, [(1, 2)] * 3)
+    mock_session.commit.assert_called_once()
+    # One batched job for the whole call
+    mock_outbox.add.assert_called_once_with("app.services.tasks.process_ride_offers", [str(i) for i in ids])
+
+@pytest.mark.asyncio
+async def test_create_ride_requests_bulk(ride_service, mock_request_repo, mock_session, mock_outbox):
+    from app.representations.dtos.ride import BulkRideRequestItemDTO
+
+    items = [
+        BulkRideRequestItemDTO(
+            passenger_id=uuid.uuid4(),
+            travel_start_date="2025-01-01",
+            travel_start_time="10:00:00",
+            start_location="A",
+            end_location="B",
+            seat_amount="1",
+            request_source=RequestSource.telegram_app
+        )
+        for _ in range(2)
+    ]
+    ids = [uuid.uuid4() for _ in items]
+    mock_request_repo.create_many.return_value = ids
+
+    result = await ride_service.create_ride_requests_bulk(items)
+
+    assert result == ids
+    mock_request_repo.create_many.assert_called_once_with(items, [(3, 4)] * 2)
+    mock_session.commit.assert_called_once()
+    mock_outbox.add.assert_called_once_with("app.services.tasks.process_ride_requests", [str(i) for i in ids])
+
+@pytest.mark.asyncio
+async def test_reserve_seats(ride_service, mock_offer_repo, mock_session, mock_outbox):
+    from datetime import date
+
+    offer_id, passenger_id, booking_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    mock_offer_repo.reserve_seats.return_value = MagicMock(
+        id=booking_id, offer_id=offer_id, passenger_id=passenger_id, seats=2, free_seats=1,
+        driver_id=uuid.uuid4(), travel_start_date=date(2025, 1, 1), start_location="bishkek", end_location="osh",
+    )
+    booking = await ride_service.reserve_seats(offer_id, passenger_id, 2)
+
+    assert booking.id == booking_id and booking.free_seats == 1
+    mock_offer_repo.reserve_seats.assert_called_once_with(offer_id, passenger_id, 2)
+    mock_session.commit.assert_called_once()
+    mock_outbox.add.assert_called_once_with("app.services.tasks.refresh_ride_offer", str(offer_id))
+
+@pytest.mark.asyncio
+async def test_reserve_seats_without_enough_seats(ride_service, mock_offer_repo, mock_session, mock_outbox):
+    mock_offer_repo.reserve_seats.return_value = None
+
+    with pytest.raises(ValueError):
+        await ride_service.reserve_seats(uuid.uuid4(), uuid.uuid4(), 5)
+
+    mock_session.commit.assert_not_called()
+    mock_outbox.add.assert_not_called()
+    mock_session.rollback.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_unchanged_photo_listing_is_not_loaded(ride_service, mock_photo_repo):
+    driver_id = uuid.uuid4()
+    mock_photo_repo.get_driver_version.return_value = "v1"
+
+    version, photos = await ride_service.get_driver_photos_if_changed(driver_id, IfNoneMatch('W/"v1"'))
+
+    assert (version, photos) == ("v1", None)
+    mock_photo_repo.get_by_driver.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_changed_photo_listing_is_loaded(ride_service, mock_photo_repo):
+    driver_id = uuid.uuid4()
+    mock_photo_repo.get_driver_version.return_value = "v2"
+    mock_photo_repo.get_by_driver.return_value = [CarPhoto(id=uuid.uuid4(), driver_id=driver_id, url="http://x/1.jpg")]
+
+    version, photos = await ride_service.get_driver_photos_if_changed(driver_id, IfNoneMatch('W/"v1"'))
+
+    assert version == "v2"
+    assert [p.url for p in photos] == ["http://x/1.jpg"]
+
+@pytest.mark.asyncio
+async def test_listing_version_depends_on_fieldset(ride_service, mock_offer_repo):
+    driver_id = uuid.uuid4()
+    mock_offer_repo.get_driver_version.return_value = "v1"
+    mock_offer_repo.get_by_driver.return_value = []
+
+    full, _ = await ride_service.get_driver_offers_if_changed(driver_id, IfNoneMatch(None))
+    sparse, _ = await ride_service.get_driver_offers_if_changed(driver_id, IfNoneMatch(None), ("id", "price"))
+
+    assert full == "v1"
+    assert sparse != full
+
+    # A tag held for the full listing does not answer 304 for a sparse one
+    version, offers = await ride_service.get_driver_offers_if_changed(driver_id, IfNoneMatch(f'W/"{full}"'), ("id", "price"))
+    assert (version, offers) == (sparse, [])
+
+    version, offers = await ride_service.get_driver_offers_if_changed(driver_id, IfNoneMatch(f'W/"{sparse}"'), ("id", "price"))
+    assert (version, offers) == (sparse, None)
@@ -0,0 +1,110 @@
+import uuid
+from datetime import date, time
+import pytest
+from unittest.mock import AsyncMock
+from app.services.ride_service import RideService
+from app.infrastructure.services.cache import InMemoryCache
+from app.representations.dtos.ride import RideOfferSearchDTO, RideRequestSearchDTO
+from app.domain.models.ride import RideOffer, RideRequest
+
+
+@pytest.fixture
+def mock_offer_repo():
+    return AsyncMock()
+
+@pytest.fixture
+def mock_request_repo():
+    return AsyncMock()
+
+@pytest.fixture
+def cache():
+    return InMemoryCache(ttl=60)
+
+@pytest.fixture
+def ride_service(mock_offer_repo, mock_request_repo, cache, location_resolver):
+    return RideService(
+        AsyncMock(), mock_offer_repo, mock_request_repo, AsyncMock(), AsyncMock(),
+        search_cache=cache, location_resolver=location_resolver
+    )
+
+def make_offer(day=date(2025, 1, 1)):
+    return RideOffer(
+        id=uuid.uuid4(),
+        driver_id=uuid.uuid4(),
+        start_location_id=1,
+        end_location_id=2,
+        start_location="Bishkek",
+        end_location="Osh",
+        free_seats=3,
+        travel_start_date=day,
+        travel_start_time=time(10, 0),
+        car_model="Toyota",
+        total_seat_amount=4,
+        request_source="mobile_app"
+    )
+
+def make_request(day):
+    return RideRequest(
+        id=uuid.uuid4(),
+        passenger_id=uuid.uuid4(),
+        start_location_id=1,
+        end_location_id=2,
+        start_location="Bishkek",
+        end_location="Osh",
+        travel_start_date=day,
+        travel_start_time=time(12, 0),
+        seat_amount="1",
+        request_source="telegram_app"
+    )
+
+@pytest.mark.asyncio
+async def test_repeated_search_is_served_from_cache(ride_service, mock_offer_repo):
+    mock_offer_repo.search_offers.return_value = [make_offer()]
+    dto = RideOfferSearchDTO(start_location="Бишкек", end_location="Ош", seats_needed=1, start_time=date(2025, 1, 1))
+    same_route = RideOfferSearchDTO(start_location="bishkek ", end_location="osh", seats_needed=1, start_time=date(2025, 1, 1))
+
+    first = await ride_service.search_ride_offers(dto)
+    second = await ride_service.search_ride_offers(same_route)
+
+    assert second == first
+    mock_offer_repo.search_offers.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_different_seats_are_cached_separately(ride_service, mock_offer_repo):
+    mock_offer_repo.search_offers.return_value = []
+
+    for seats in (1, 2):
+        await ride_service.search_ride_offers(
+            RideOfferSearchDTO(start_location="A", end_location="B", seats_needed=seats, start_time=date(2025, 1, 1))
+        )
+
+    assert mock_offer_repo.search_offers.call_count == 2
+
+@pytest.mark.asyncio
+async def test_deleting_offer_invalidates_its_route_and_date(ride_service, mock_offer_repo):
+    offer = make_offer()
+    mock_offer_repo.search_offers.return_value = [offer]
+    mock_offer_repo.get_by_id.return_value = offer
+    dto = RideOfferSearchDTO(start_location="bishkek", end_location="osh", seats_needed=1, start_time=date(2025, 1, 1))
+    await ride_service.search_ride_offers(dto)
+
+    await ride_service.delete_ride_offer(offer.id, offer.driver_id)
+    await ride_service.search_ride_offers(dto)
+
+    assert mock_offer_repo.search_offers.call_count == 2
+
+@pytest.mark.asyncio
+async def test_deleting_request_invalidates_searches_whose_window_covers_it(ride_service, mock_request_repo, cache):
+    request = make_request(date(2025, 1, 3))
+    mock_request_repo.get_by_id.return_value = request
+    mock_request_repo.search_requests.return_value = []
+    for day in (1, 2, 3, 4):
+        await ride_service.search_ride_requests(
+            RideRequestSearchDTO(start_location="bishkek", end_location="osh", start_time=date(2025, 1, day))
+        )
+
+    await ride_service.delete_ride_request(request.id, request.passenger_id)
+
+    assert await cache.get("requests:1|2|2025-01-01", "None:10:0:None:") is None
+    assert await cache.get("requests:1|2|2025-01-03", "None:10:0:None:") is None
+    assert await cache.get("requests:1|2|2025-01-04", "None:10:0:None:") == []
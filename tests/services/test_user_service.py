@@ -1,7 +1,12 @@
 import uuid
+from datetime import datetime
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock
-from app.services.user_service import UserService
+from app.infrastructure.services.cache import InMemoryCache
+from app.services import user_cache as user_cache_module
+from app.services.user_cache import TelegramUserCache
+from app.services.user_service import UserService, telegram_user_dto
 from app.representations.dtos.user import CreateUserDTO, CreateTelegramUserDTO
 
 @pytest.fixture
@@ -136,3 +141,95 @@ async def test_register_telegram_user_already_registered(user_service, mock_tele
     
     with pytest.raises(ValueError, match="already registered"):
         await user_service.register_telegram_user(dto)
+
+
+def telegram_user(telegram_id=555, user_id=None):
+    return MagicMock(
+        id=uuid.uuid4(), user_id=user_id or uuid.uuid4(), telegram_id=telegram_id, chat_id=None,
+        username="john_tg", language_code="ru", role="passenger", language="ru",
+        phone_number="996555", first_name="John", last_name=None,
+        created_at=datetime(2025, 1, 1), updated_at=datetime(2025, 1, 1),
+    )
+
+
+@pytest.fixture
+def user_cache():
+    return TelegramUserCache(InMemoryCache(ttl=60))
+
+
+@pytest.fixture
+def cached_user_service(mock_session, mock_user_repo, mock_telegram_user_repo, user_cache):
+    return UserService(mock_session, mock_user_repo, mock_telegram_user_repo, user_cache=user_cache)
+
+
+@pytest.mark.asyncio
+async def test_get_telegram_user_is_cached(cached_user_service, mock_telegram_user_repo):
+    mock_telegram_user_repo.find_by_telegram_id.return_value = telegram_user()
+    hits = user_cache_module.hits.value(by="telegram_id")
+
+    first = await cached_user_service.get_telegram_user_by_id(555)
+    second = await cached_user_service.get_telegram_user_by_id(555)
+
+    assert second == first
+    assert second.username == "john_tg"
+    mock_telegram_user_repo.find_by_telegram_id.assert_called_once()
+    assert user_cache_module.hits.value(by="telegram_id") == hits + 1
+
+
+@pytest.mark.asyncio
+async def test_unknown_telegram_user_is_cached_until_registered(
+    cached_user_service, mock_telegram_user_repo, mock_user_repo
+):
+    mock_telegram_user_repo.find_by_telegram_id.return_value = None
+    assert await cached_user_service.get_telegram_user_by_id(555) is None
+    assert await cached_user_service.get_telegram_user_by_id(555) is None
+    mock_telegram_user_repo.find_by_telegram_id.assert_called_once()
+
+    user_id = uuid.uuid4()
+    mock_user_repo.get_by_id.return_value = MagicMock(id=user_id)
+    mock_telegram_user_repo.create.return_value = telegram_user(user_id=user_id)
+    await cached_user_service.register_telegram_user(CreateTelegramUserDTO(telegram_id=555, user_id=user_id))
+
+    mock_telegram_user_repo.find_by_telegram_id.return_value = telegram_user(user_id=user_id)
+    registered = await cached_user_service.get_telegram_user_by_id(555)
+    assert registered.user_id == user_id
+
+
+@pytest.mark.asyncio
+async def test_update_telegram_user_invalidates_cache(cached_user_service, mock_telegram_user_repo):
+    tg_user = telegram_user()
+    mock_telegram_user_repo.find_by_telegram_id.return_value = tg_user
+    await cached_user_service.get_telegram_user_by_id(555)
+
+    tg_user.role = "driver"
+    await cached_user_service.update_telegram_user(555, role="driver")
+
+    assert (await cached_user_service.get_telegram_user_by_id(555)).role == "driver"
+
+
+@pytest.mark.asyncio
+async def test_pinned_telegram_user_is_not_cached(
+    mock_session, mock_user_repo, mock_telegram_user_repo, user_cache
+):
+    pins = AsyncMock()
+    pins.is_pinned.return_value = True
+    service = UserService(mock_session, mock_user_repo, mock_telegram_user_repo, pins, user_cache)
+    mock_telegram_user_repo.find_by_telegram_id.return_value = telegram_user()
+
+    await service.get_telegram_user_by_id(555)
+
+    assert await user_cache.get_by_telegram_id(555) == (False, None)
+    mock_telegram_user_repo.find_by_telegram_id.assert_called_once_with(555, use_replica=False)
+
+
+@pytest.mark.asyncio
+async def test_cache_by_user_id_reports_missing_ids(user_cache):
+    known, absent, unknown = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    account = telegram_user_dto(telegram_user(user_id=known))
+    await user_cache.put(account)
+    await user_cache.put(None, user_id=absent)
+
+    cached, missing = await user_cache.get_many_by_user_id([known, absent, unknown, known])
+
+    assert cached == {known: account, absent: None}
+    assert missing == [unknown]
@@ -0,0 +1,38 @@
+import httpx
+import pytest
+
+from app.services import tasks
+
+
+class FakeDispatcher:
+    def __init__(self, results):
+        self.results = results
+
+    async def post_many(self, url, payloads):
+        return self.results
+
+
+@pytest.fixture
+def resent(monkeypatch):
+    calls = []
+    monkeypatch.setattr(tasks.resend_webhooks, "apply_async", lambda args, countdown: calls.append((args, countdown)))
+    return calls
+
+
+async def test_failed_and_throttled_webhooks_are_resent(monkeypatch, resent):
+    payloads = [{"n": i} for i in range(4)]
+    results = [httpx.Response(200), httpx.ConnectError("boom"), httpx.Response(429), httpx.Response(400)]
+    monkeypatch.setattr(tasks, "get_webhook_dispatcher", lambda: FakeDispatcher(results))
+
+    await tasks._send_webhooks("http://bot/webhook", payloads)
+
+    assert resent == [(("http://bot/webhook", [{"n": 1}, {"n": 2}], 1), 5)]
+
+
+async def test_webhooks_are_dropped_after_the_last_retry(monkeypatch, resent):
+    monkeypatch.setattr(tasks, "get_webhook_dispatcher", lambda: FakeDispatcher([httpx.Response(503)]))
+    attempt = tasks.notification_settings.WEBHOOK_MAX_RETRIES
+
+    await tasks._send_webhooks("http://bot/webhook", [{"n": 0}], attempt=attempt)
+
+    assert resent == []
@@ -0,0 +1,49 @@
+from datetime import date, datetime, time, timedelta, timezone
+
+from app.utils.departure import RIDE_TIMEZONE, departure, local_today, offer_window, request_window, window_dates
+
+
+def test_departure_is_local_wall_clock_time():
+    at = departure(date(2025, 1, 1), time(10, 30))
+
+    assert at == datetime(2025, 1, 1, 10, 30, tzinfo=RIDE_TIMEZONE)
+    assert at.utcoffset() == timedelta(hours=6)
+
+
+def test_offer_window_without_time_is_the_whole_day():
+    assert offer_window(date(2025, 1, 1)) == (
+        departure(date(2025, 1, 1), time(0, 0)),
+        departure(date(2025, 1, 2), time(0, 0)),
+    )
+
+
+def test_offer_window_with_time_spans_four_hours():
+    start, end = offer_window(date(2025, 1, 1), time(22, 0))
+
+    assert start == departure(date(2025, 1, 1), time(22, 0))
+    assert end == departure(date(2025, 1, 2), time(2, 0))
+
+
+def test_request_window_runs_to_the_end_of_the_second_day():
+    start, end = request_window(date(2025, 1, 1), time(9, 0))
+
+    assert start == departure(date(2025, 1, 1), time(9, 0))
+    assert end == departure(date(2025, 1, 4), time(0, 0))
+
+
+def test_window_dates_exclude_the_end_instant():
+    assert window_dates(offer_window(date(2025, 1, 1))) == (date(2025, 1, 1), date(2025, 1, 1))
+    assert window_dates(offer_window(date(2025, 1, 1), time(22, 0))) == (date(2025, 1, 1), date(2025, 1, 2))
+    assert window_dates(request_window(date(2025, 1, 1))) == (date(2025, 1, 1), date(2025, 1, 3))
+
+
+def test_local_today_follows_the_ride_timezone(monkeypatch):
+    class Clock(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            # 20:30 UTC on Jan 1 is already Jan 2 in Bishkek
+            return datetime(2025, 1, 1, 20, 30, tzinfo=timezone.utc).astimezone(tz)
+
+    monkeypatch.setattr("app.utils.departure.datetime", Clock)
+
+    assert local_today() == date(2025, 1, 2)
@@ -0,0 +1,43 @@
+import math
+
+import pytest
+
+from app.utils.geo import GEOHASH_PRECISION, cells_within, geohash, haversine_km
+
+BISHKEK = (42.8746, 74.5698)
+
+
+def _destination(point, distance_km, bearing_deg):
+    """Point distance_km away from `point` along the initial bearing."""
+    lat, lon = map(math.radians, point)
+    angle, bearing = distance_km / 6371.0088, math.radians(bearing_deg)
+    lat2 = math.asin(math.sin(lat) * math.cos(angle) + math.cos(lat) * math.sin(angle) * math.cos(bearing))
+    lon2 = lon + math.atan2(
+        math.sin(bearing) * math.sin(angle) * math.cos(lat), math.cos(angle) - math.sin(lat) * math.sin(lat2)
+    )
+    return math.degrees(lat2), (math.degrees(lon2) + 540) % 360 - 180
+
+
+def test_geohash_matches_the_reference_encoding():
+    assert geohash(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    assert len(geohash(*BISHKEK)) == GEOHASH_PRECISION
+
+
+def test_haversine_of_one_degree_on_the_equator():
+    assert haversine_km((0.0, 0.0), (0.0, 1.0)) == pytest.approx(111.195, abs=0.01)
+
+
+@pytest.mark.parametrize("center", [BISHKEK, (-33.9, 18.4), (64.1, -21.9), (0.0, 179.99)])
+@pytest.mark.parametrize("radius_km", [0.5, 5.0, 25.0])
+def test_cells_within_cover_every_point_in_the_radius(center, radius_km):
+    cells = set(cells_within(*center, radius_km))
+
+    for bearing in range(0, 360, 15):
+        for fraction in (0.5, 0.99):
+            point = _destination(center, radius_km * fraction, bearing)
+            assert geohash(*point) in cells, (point, bearing)
+
+
+def test_cells_within_stay_near_the_radius():
+    # 5 km around Bishkek spans a few cells, not a whole row of the grid
+    assert len(cells_within(*BISHKEK, 5.0)) <= 16
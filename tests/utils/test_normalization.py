@@ -0,0 +1,53 @@
+import pytest
+
+from app.utils.normalization import CityMatcher, fold, normalize_location
+
+
+@pytest.mark.parametrize("text", ["Бишкек ", "bishkek", "Bishkék", "BISHKEK", "Bishkec", "Biskek"])
+def test_spellings_of_one_city_resolve_to_canonical_name(text):
+    assert normalize_location(text) == "Bishkek"
+
+
+@pytest.mark.parametrize("text", ["Джалал-Абад", "Жалал-Абад", "jalal abad", "Jalalabad", "Dzhalal-Abad"])
+def test_transliteration_schemes_fold_together(text):
+    assert normalize_location(text) == "Jalal-Abad"
+
+
+def test_kyrgyz_letters_are_transliterated():
+    assert fold("Ысык-Көл") == "ysykkol"
+    assert normalize_location("Ысык-Көл") == "Issyk-Kul"
+
+
+def test_short_names_require_exact_match():
+    assert normalize_location("Ош") == "Osh"
+    assert normalize_location("Osx") == "Osx"
+
+
+def test_unknown_location_is_returned_stripped():
+    assert normalize_location("  Kara-Balta ") == "Kara-Balta"
+    assert normalize_location("") == ""
+
+
+def test_equally_close_cities_are_not_guessed():
+    matcher = CityMatcher({"abcdx": "First", "abcdy": "Second"})
+
+    assert matcher.match("abcdz") is None
+    assert matcher.match("abcdxx") == "First"
+
+
+@pytest.mark.parametrize("text", ["Кара-Көл", "Кара-Куль", "Karakul", "Kara-Kul", "kara kol"])
+def test_kara_kol_is_not_merged_into_karakol(text):
+    assert normalize_location(text) == "Kara-Kul"
+
+
+@pytest.mark.parametrize("text", ["Каракол", "Karakol", "karakol "])
+def test_karakol_stays_karakol(text):
+    assert normalize_location(text) == "Karakol"
+
+
+def test_multi_part_names_allow_one_typo_only():
+    matcher = CityMatcher({"kara-balta": "Kara-Balta"})
+
+    assert matcher.match("Kara-Balto") == "Kara-Balta"
+    assert matcher.match("Kara-Bolto") is None
+    assert matcher.match("Karabolto") is None